@@ -1,53 +1,179 @@
+import hmac
 import os
-import joblib
-import numpy as np
-from flask import Flask, request, render_template
-from config.path_config import MODEL_OUTPUT_PATH
+import tempfile
+from flask import Flask, request, render_template, jsonify, g, Response
+from config.path_config import MODEL_OUTPUT_PATH, COMPILED_MODEL_DIR
+from src.model_reloader import ModelReloader
+from src.micro_batcher import MicroBatcher
+from src.prediction_cache import PredictionCache
+from src.instrumentation import instrument, record_rows, registry
+from src.serving_metrics import ServingMetrics
+from src.logger import get_logger, RateLimitedLogger
+from src.inference import build_feature_matrix, parse_form, extract_bookings, build_prediction_response, BatchTooLargeError
 
 app = Flask(__name__)
 
+logger_obj = get_logger(__name__)
+# a client sending bad payloads in a loop must not turn into disk I/O on every request
+rejected_logger = RateLimitedLogger(logger_obj, interval_seconds=10.0)
+
+# 'pickle' (joblib LGBMClassifier) or 'native' (lazy, memory-mapped compiled model)
+MODEL_FORMAT = os.environ.get('MODEL_FORMAT', 'pickle')
+
+# Upper bound on rows accepted by a single /predict/batch call
+MAX_BATCH_SIZE = int(os.environ.get('MAX_BATCH_SIZE', 50000))
+
+# Directory shared by every worker process for the /metrics counters
+METRICS_DIR = os.environ.get('METRICS_DIR', os.path.join(tempfile.gettempdir(), 'prediction_metrics'))
+serving_metrics = ServingMetrics(METRICS_DIR)
+
+# Seconds between checks of the model artifact for a new version (0 disables the watcher)
+MODEL_RELOAD_POLL_SECONDS = float(os.environ.get('MODEL_RELOAD_POLL_SECONDS', 5.0))
+# Token expected in the X-Admin-Token header of POST /admin/reload (unset disables the endpoint)
+MODEL_RELOAD_TOKEN = os.environ.get('MODEL_RELOAD_TOKEN')
+
+# Holds the served model, transformer and version; new versions are swapped in without a restart
+model_reloader = ModelReloader(
+    MODEL_FORMAT,
+    on_swap=lambda served: serving_metrics.set_model_info(served.version, served.load_seconds, served.model_format)
+)
+
 # Load the pre-trained model
 try:
-    print(f"Attempting to load model from: {MODEL_OUTPUT_PATH}")
-    model = joblib.load(MODEL_OUTPUT_PATH)
-    print("Model loaded successfully!")
+    print(f"Attempting to load {MODEL_FORMAT} model from: {MODEL_OUTPUT_PATH if MODEL_FORMAT == 'pickle' else COMPILED_MODEL_DIR}")
+    model_reloader.reload()
+    print(f"Model {model_reloader.current.version} loaded successfully!")
 except Exception as e:
     print(f"Error loading model: {e}")
-    # Fallback or exit gracefully so logs show the error
-    model = None
+# the watcher also picks up a model that was missing at startup
+model_reloader.start_watching(MODEL_RELOAD_POLL_SECONDS)
+
+# Coalesce concurrent single-row predictions into batched model calls; each row
+# is scored by the model of the snapshot its request encoded it with, so a swap
+# while it is queued cannot pair the old transformer with the new model
+MICRO_BATCH_MAX_SIZE = int(os.environ.get('MICRO_BATCH_MAX_SIZE', 32))
+MICRO_BATCH_MAX_WAIT_MS = float(os.environ.get('MICRO_BATCH_MAX_WAIT_MS', 2.0))
+batcher = MicroBatcher(
+    predict_fn=lambda features: model_reloader.current.model.predict_proba(features),
+    max_batch_size=MICRO_BATCH_MAX_SIZE,
+    max_wait_ms=MICRO_BATCH_MAX_WAIT_MS
+)
+
+# Cache of predicted probabilities keyed by the exact feature vector and model version
+prediction_cache = PredictionCache(
+    max_entries=int(os.environ.get('PREDICTION_CACHE_SIZE', 100000)),
+    ttl_seconds=float(os.environ.get('PREDICTION_CACHE_TTL_SECONDS', 3600))
+)
+
+@app.before_request
+def start_request_timer():
+    g.request_timer = serving_metrics.start(request.endpoint)
+
+@app.after_request
+def finish_request_timer(response):
+    g.request_timer.finish(response.status_code)
+    return response
+
+@app.teardown_request
+def finish_failed_request_timer(exception):
+    # after_request is skipped when a handler raises
+    if exception is not None and 'request_timer' in g:
+        g.request_timer.finish(500)
+
+def render_page(**context):
+    page = render_template('index.html', **context)
+    g.request_timer.mark('render')
+    return page
 
 @app.route('/', methods=['GET', 'POST'])
+@instrument('app.index', hot_path=True)
 def index():
     if request.method == 'POST':
-        lead_time = int(request.form['lead_time'])
-        no_of_special_requests = int(request.form['no_of_special_requests'])
-        avg_price_per_room = float(request.form['avg_price_per_room'])
-        arrival_month = int(request.form['arrival_month'])
-        arrival_date = int(request.form['arrival_date'])
+        served = model_reloader.current
+        if served is None:
+            return render_page(prediction=None, error='Model is not loaded'), 503
+        try:
+            features = parse_form(request.form, served.transformer)
+        except (KeyError, ValueError) as e:
+            rejected_logger.warning("[app] : Rejected form on %s: %s", request.path, e)
+            return render_page(prediction=None, error=str(e)), 400
+        g.request_timer.mark('parse')
+        record_rows(len(features))
+        g.request_timer.observe_batch_size(len(features))
         
-        market_segment_type = int(request.form['market_segment_type'])
-        no_of_week_nights = int(request.form['no_of_week_nights'])
-        no_of_weekend_nights = int(request.form['no_of_weekend_nights'])
-        
-        room_type_reserved = int(request.form['room_type_reserved'])
-        type_of_meal_plan = int(request.form['type_of_meal_plan'])
-        
-        features = np.array([[
-            lead_time,
-            no_of_special_requests,
-            avg_price_per_room,
-            arrival_month,
-            arrival_date,
-            market_segment_type,
-            no_of_week_nights,
-            no_of_weekend_nights,
-            room_type_reserved,
-            type_of_meal_plan
-        ]])
-        
-        prediction = model.predict(features)
-        return render_template('index.html', prediction=prediction[0])
-    return render_template('index.html', prediction=None)
+        probabilities = prediction_cache.predict_proba(
+            features,
+            lambda misses: batcher.predict(misses[0], served.model.predict_proba).reshape(1, -1),
+            served.version
+        )
+        prediction = served.model.classes_[probabilities[0].argmax()]
+        g.request_timer.mark('predict')
+        return render_page(prediction=prediction)
+    return render_page(prediction=None)
+
+@app.route('/stats/batcher', methods=['GET'])
+def batcher_stats():
+    return jsonify(batcher.stats())
+
+@app.route('/stats/cache', methods=['GET'])
+def cache_stats():
+    return jsonify(prediction_cache.stats())
+
+@app.route('/stats/instrumentation', methods=['GET'])
+def instrumentation_stats():
+    return jsonify(registry.summary())
+
+@app.route('/stats/model', methods=['GET'])
+def model_stats():
+    return jsonify(model_reloader.stats())
+
+@app.route('/admin/reload', methods=['POST'])
+def reload_model():
+    # reloads this worker only; the others pick the new version up through their watchers
+    if not MODEL_RELOAD_TOKEN:
+        return jsonify({'error': 'Reloading is disabled, set MODEL_RELOAD_TOKEN to enable it'}), 403
+    if not hmac.compare_digest(request.headers.get('X-Admin-Token', ''), MODEL_RELOAD_TOKEN):
+        return jsonify({'error': 'Invalid admin token'}), 403
+    try:
+        return jsonify(model_reloader.reload(force=request.args.get('force') == '1'))
+    except Exception as e:
+        return jsonify({'error': str(e), **model_reloader.stats()}), 500
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    return Response(serving_metrics.collect(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/predict/batch', methods=['POST'])
+@instrument('app.predict_batch', hot_path=True)
+def predict_batch():
+    try:
+        bookings = extract_bookings(request.get_json(silent=True), MAX_BATCH_SIZE)
+    except BatchTooLargeError as e:
+        rejected_logger.warning("[app] : Rejected payload on %s: %s", request.path, e)
+        return jsonify({'error': str(e)}), 413
+    except ValueError as e:
+        rejected_logger.warning("[app] : Rejected payload on %s: %s", request.path, e)
+        return jsonify({'error': str(e)}), 400
+    served = model_reloader.current
+    if served is None:
+        return jsonify({'error': 'Model is not loaded'}), 503
+
+    record_rows(len(bookings))
+    g.request_timer.observe_batch_size(len(bookings))
+    try:
+        features = build_feature_matrix(bookings, served.transformer)
+    except (KeyError, TypeError, ValueError) as e:
+        rejected_logger.warning("[app] : Rejected bookings on %s: %s", request.path, e)
+        return jsonify({'error': f"Invalid bookings payload: {e}"}), 400
+    g.request_timer.mark('parse')
+
+    # One vectorized call for all rows that are not cached
+    probabilities = prediction_cache.predict_proba(features, served.model.predict_proba, served.version)
+    g.request_timer.mark('predict')
+    logger_obj.debug("[app] : Scored %d bookings with model %s", len(bookings), served.version)
+    response = jsonify(build_prediction_response(served.model.classes_, probabilities))
+    g.request_timer.mark('render')
+    return response
 
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 8080))
@@ -0,0 +1,194 @@
+import asyncio
+import hmac
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
+from fastapi.templating import Jinja2Templates
+
+from config.path_config import MODEL_OUTPUT_PATH, COMPILED_MODEL_DIR
+from src.model_reloader import ModelReloader
+from src.instrumentation import instrument, record_rows, registry
+from src.serving_metrics import ServingMetrics
+from src.logger import get_logger, RateLimitedLogger
+from src.inference import build_feature_matrix, parse_form, extract_bookings, build_prediction_response, BatchTooLargeError
+
+# Size of the inference pool; LightGBM releases the GIL while predicting,
+# so one thread per core keeps every core busy from a single process
+INFERENCE_WORKERS = int(os.environ.get('INFERENCE_WORKERS', os.cpu_count() or 1))
+
+# 'pickle' (joblib LGBMClassifier) or 'native' (lazy, memory-mapped compiled model)
+MODEL_FORMAT = os.environ.get('MODEL_FORMAT', 'pickle')
+
+# Upper bound on rows accepted by a single /predict/batch call
+MAX_BATCH_SIZE = int(os.environ.get('MAX_BATCH_SIZE', 50000))
+
+# Directory shared by every worker process for the /metrics counters
+METRICS_DIR = os.environ.get('METRICS_DIR', os.path.join(tempfile.gettempdir(), 'prediction_metrics'))
+serving_metrics = ServingMetrics(METRICS_DIR)
+
+# Seconds between checks of the model artifact for a new version (0 disables the watcher)
+MODEL_RELOAD_POLL_SECONDS = float(os.environ.get('MODEL_RELOAD_POLL_SECONDS', 5.0))
+# Token expected in the X-Admin-Token header of POST /admin/reload (unset disables the endpoint)
+MODEL_RELOAD_TOKEN = os.environ.get('MODEL_RELOAD_TOKEN')
+
+# endpoint label of each tracked route in the metrics
+METRIC_ENDPOINTS = {'/': 'index', '/predict/batch': 'predict_batch'}
+
+templates = Jinja2Templates(directory="templates")
+
+logger_obj = get_logger(__name__)
+# a client sending bad payloads in a loop must not turn into disk I/O on every request
+rejected_logger = RateLimitedLogger(logger_obj, interval_seconds=10.0)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load the pre-trained model once; every pool thread shares it, and new
+    # versions are swapped in without a restart
+    app.state.model_reloader = ModelReloader(
+        MODEL_FORMAT,
+        on_swap=lambda served: serving_metrics.set_model_info(served.version, served.load_seconds, served.model_format)
+    )
+    try:
+        print(f"Attempting to load {MODEL_FORMAT} model from: {MODEL_OUTPUT_PATH if MODEL_FORMAT == 'pickle' else COMPILED_MODEL_DIR}")
+        app.state.model_reloader.reload()
+        print(f"Model {app.state.model_reloader.current.version} loaded successfully!")
+    except Exception as e:
+        print(f"Error loading model: {e}")
+    # the watcher also picks up a model that was missing at startup
+    app.state.model_reloader.start_watching(MODEL_RELOAD_POLL_SECONDS)
+
+    app.state.pool = ThreadPoolExecutor(max_workers=INFERENCE_WORKERS, thread_name_prefix="inference")
+    try:
+        yield
+    finally:
+        app.state.model_reloader.stop_watching()
+        app.state.pool.shutdown(wait=True)
+
+
+app = FastAPI(title="Hotel Reservation Prediction", lifespan=lifespan)
+
+
+@app.middleware("http")
+async def time_requests(request: Request, call_next):
+    timer = request.state.request_timer = serving_metrics.start(METRIC_ENDPOINTS.get(request.url.path))
+    try:
+        response = await call_next(request)
+    except Exception:
+        timer.finish(500)
+        raise
+    timer.finish(response.status_code)
+    return response
+
+
+async def run_in_pool(request: Request, fn, *args, **kwargs):
+    """Run a CPU-bound call on the inference pool without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(request.app.state.pool, lambda: fn(*args, **kwargs))
+
+
+def render_page(request: Request, context: dict, status_code: int = 200):
+    page = templates.TemplateResponse(request, 'index.html', context, status_code=status_code)
+    request.state.request_timer.mark('render')
+    return page
+
+
+@app.get('/')
+async def index_get(request: Request):
+    return render_page(request, {'prediction': None})
+
+
+@app.post('/')
+@instrument('asgi_app.index_post', hot_path=True)
+async def index_post(request: Request):
+    served = request.app.state.model_reloader.current
+    if served is None:
+        return JSONResponse({'error': 'Model is not loaded'}, status_code=503)
+
+    try:
+        features = parse_form(await request.form(), served.transformer)
+    except (KeyError, ValueError) as e:
+        rejected_logger.warning("[asgi_app] : Rejected form on %s: %s", request.url.path, e)
+        return render_page(request, {'prediction': None, 'error': str(e)}, status_code=400)
+    request.state.request_timer.mark('parse')
+    record_rows(len(features))
+    request.state.request_timer.observe_batch_size(len(features))
+    # each pool thread scores single-threaded so the pool size sets core usage
+    prediction = await run_in_pool(request, served.model.predict, features, num_threads=1)
+    request.state.request_timer.mark('predict')
+    return render_page(request, {'prediction': prediction[0]})
+
+
+@app.post('/predict/batch')
+@instrument('asgi_app.predict_batch', hot_path=True)
+async def predict_batch(request: Request):
+    try:
+        bookings = extract_bookings(await request.json(), MAX_BATCH_SIZE)
+    except BatchTooLargeError as e:
+        rejected_logger.warning("[asgi_app] : Rejected payload on %s: %s", request.url.path, e)
+        return JSONResponse({'error': str(e)}, status_code=413)
+    except ValueError as e:
+        rejected_logger.warning("[asgi_app] : Rejected payload on %s: %s", request.url.path, e)
+        return JSONResponse({'error': str(e)}, status_code=400)
+
+    served = request.app.state.model_reloader.current
+    if served is None:
+        return JSONResponse({'error': 'Model is not loaded'}, status_code=503)
+
+    record_rows(len(bookings))
+    request.state.request_timer.observe_batch_size(len(bookings))
+    try:
+        features = build_feature_matrix(bookings, served.transformer)
+    except (KeyError, TypeError, ValueError) as e:
+        rejected_logger.warning("[asgi_app] : Rejected bookings on %s: %s", request.url.path, e)
+        return JSONResponse({'error': f"Invalid bookings payload: {e}"}, status_code=400)
+    request.state.request_timer.mark('parse')
+
+    probabilities = await run_in_pool(request, served.model.predict_proba, features, num_threads=1)
+    request.state.request_timer.mark('predict')
+    logger_obj.debug("[asgi_app] : Scored %d bookings with model %s", len(bookings), served.version)
+    # JSONResponse serializes on construction, so the render phase covers the JSON encoding
+    response = JSONResponse(build_prediction_response(served.model.classes_, probabilities))
+    request.state.request_timer.mark('render')
+    return response
+
+
+@app.get('/stats/instrumentation')
+async def instrumentation_stats():
+    return registry.summary()
+
+
+@app.get('/stats/model')
+async def model_stats(request: Request):
+    return request.app.state.model_reloader.stats()
+
+
+@app.post('/admin/reload')
+async def reload_model(request: Request, force: bool = False):
+    # reloads this worker only; the others pick the new version up through their watchers
+    if not MODEL_RELOAD_TOKEN:
+        return JSONResponse({'error': 'Reloading is disabled, set MODEL_RELOAD_TOKEN to enable it'}, status_code=403)
+    if not hmac.compare_digest(request.headers.get('X-Admin-Token', ''), MODEL_RELOAD_TOKEN):
+        return JSONResponse({'error': 'Invalid admin token'}, status_code=403)
+    reloader = request.app.state.model_reloader
+    try:
+        # loading runs off the event loop so requests keep being served on the current model
+        return await asyncio.to_thread(reloader.reload, force)
+    except Exception as e:
+        return JSONResponse({'error': str(e), **reloader.stats()}, status_code=500)
+
+
+@app.get('/metrics')
+async def metrics():
+    return PlainTextResponse(serving_metrics.collect(), media_type='text/plain; version=0.0.4')
+
+
+if __name__ == '__main__':
+    import uvicorn
+
+    port = int(os.environ.get('PORT', 8080))
+    uvicorn.run(app, host='0.0.0.0', port=port)
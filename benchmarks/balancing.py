@@ -0,0 +1,67 @@
+"""Runtime and memory of each balancing strategy at multiples of the training set size.
+
+The processed (encoded, not yet balanced) training split is tiled to each
+scale, with a little noise so tiled rows are not exact duplicates, and
+converted to float32 once. Each strategy then balances it; the reported
+memory is the peak of traced allocations during the call (NumPy reports its
+buffers to tracemalloc), which unlike RSS is not hidden by memory freed
+by an earlier run.
+
+Usage:
+    python -m benchmarks.balancing [--scales 1 10 100] [--strategies smote block_smote]
+"""
+import argparse
+import json
+import time
+import tracemalloc
+
+import numpy as np
+
+from config.path_config import CONFIG_PATH, TRAIN_DATA_PATH, DATA_PROCESSING_DIR
+from src.balancing import Balancer, BALANCING_STRATEGIES
+from src.data_preprocessing import DataProcessor
+
+
+def scaled_dataset(X: np.ndarray, y: np.ndarray, scale: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    X_scaled = np.tile(X, (scale, 1))
+    if scale > 1:
+        X_scaled += rng.normal(0.0, 1e-3, X_scaled.shape).astype(np.float32)
+    return X_scaled, np.tile(y, scale)
+
+
+def main(scales: list, strategies: list, block_size: int) -> dict:
+    df, _ = DataProcessor(CONFIG_PATH, TRAIN_DATA_PATH, TRAIN_DATA_PATH, DATA_PROCESSING_DIR).load_and_process(TRAIN_DATA_PATH)
+    X = df.drop(columns=["booking_status"]).to_numpy(dtype=np.float32)
+    y = df["booking_status"].to_numpy()
+
+    results = {}
+    for scale in scales:
+        X_scaled, y_scaled = scaled_dataset(X, y, scale)
+        results[f"{scale}x"] = {"rows": len(X_scaled), "input_mb": X_scaled.nbytes / 2**20}
+        for strategy in strategies:
+            balancer = Balancer(strategy, block_size=block_size)
+            tracemalloc.start()
+            start = time.perf_counter()
+            X_new, _ = balancer.extra_rows(X_scaled, y_scaled)
+            seconds = time.perf_counter() - start
+            _, peak_bytes = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            results[f"{scale}x"][strategy] = {
+                "seconds": seconds,
+                "peak_allocated_mb": peak_bytes / 2**20,
+                "rows_added": len(X_new),
+            }
+            del X_new
+            print(f"{scale}x {strategy}: {results[f'{scale}x'][strategy]}", flush=True)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", nargs="+", type=int, default=[1, 10, 100])
+    parser.add_argument("--strategies", nargs="+", default=list(BALANCING_STRATEGIES), choices=BALANCING_STRATEGIES)
+    parser.add_argument("--block-size", type=int, default=4096)
+    args = parser.parse_args()
+
+    print(json.dumps(main(args.scales, args.strategies, args.block_size), indent=2))
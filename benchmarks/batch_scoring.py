@@ -0,0 +1,84 @@
+"""Throughput and core scaling of the bulk scoring CLI (src/batch_scoring.py).
+
+A synthetic raw booking file of --scale times raw_data.csv is written as
+CSV or Parquet, then scored with 1, 2, 4, ... workers up to the core count
+(or --workers). For every worker count the rows per second, the speedup
+over one worker and the parallel efficiency (speedup / workers) are
+reported, and every run's predictions must equal the one-worker run's.
+Worker counts up to the number of cores must keep an efficiency of at
+least --min-efficiency; on a single-core machine only the one-worker
+throughput is meaningful and nothing is checked.
+
+Needs the trained model artifacts.
+
+Usage:
+    python -m benchmarks.batch_scoring [--scale 20] [--format csv] [--workers 1 2 4] [--chunk-rows 50000] [--min-efficiency 0.7]
+"""
+import argparse
+import json
+import os
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+from benchmarks.end_to_end import synthetic_bookings
+from config.path_config import CONFIG_PATH, RAW_DATA_PATH
+from src.batch_scoring import BatchScorer
+from utils.common_functions import read_yml_file, load_data
+
+
+def main(scale: int, data_format: str, worker_counts: list, chunk_rows: int, min_efficiency: float) -> dict:
+    schema = read_yml_file(CONFIG_PATH)["data_schema"]
+    rows = len(load_data(RAW_DATA_PATH, columns=["Booking_ID"])) * scale
+    cores = os.cpu_count() or 1
+    results = {"rows": rows, "format": data_format, "cores": cores, "chunk_rows": chunk_rows, "runs": {}}
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        input_path = Path(tmp_dir) / f"bookings.{data_format}"
+        bookings = synthetic_bookings(rows, schema, seed=scale)
+        if data_format == "parquet":
+            bookings.to_parquet(input_path, index=False, row_group_size=chunk_rows)
+        else:
+            bookings.to_csv(input_path, index=False)
+        del bookings
+
+        reference = None
+        for workers in worker_counts:
+            output_path = Path(tmp_dir) / f"scored_{workers}.parquet"
+            report = BatchScorer(input_path, output_path, chunk_rows=chunk_rows, max_workers=workers, dtype=schema).run()
+            scored = pd.read_parquet(output_path)
+            if reference is None:
+                reference = scored
+            run = results["runs"][str(workers)] = {
+                "workers": report["workers"],
+                "seconds": report["seconds"],
+                "rows_per_second": report["rows_per_second"],
+                "matches_one_worker": bool(scored.equals(reference)),
+            }
+            run["speedup"] = run["rows_per_second"] / results["runs"][str(worker_counts[0])]["rows_per_second"]
+            run["efficiency"] = run["speedup"] / (run["workers"] / results["runs"][str(worker_counts[0])]["workers"])
+            print(f"{workers} workers: {json.dumps(run)}", flush=True)
+
+    scaling_runs = [run for run in results["runs"].values() if 1 < run["workers"] <= cores]
+    results["checks"] = {"predictions_identical": all(run["matches_one_worker"] for run in results["runs"].values())}
+    if scaling_runs:
+        results["checks"]["scales_with_cores"] = all(run["efficiency"] >= min_efficiency for run in scaling_runs)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=int, default=20, help="Multiple of raw_data.csv's rows to score")
+    parser.add_argument("--format", choices=("csv", "parquet"), default="csv")
+    parser.add_argument("--workers", nargs="+", type=int, help="Worker counts to run (defaults to powers of two up to the core count)")
+    parser.add_argument("--chunk-rows", type=int, default=50000)
+    parser.add_argument("--min-efficiency", type=float, default=0.7)
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    worker_counts = sorted(args.workers or [2**i for i in range(cores.bit_length()) if 2**i <= cores] + ([cores] if cores & (cores - 1) else []))
+    results = main(args.scale, args.format, worker_counts, args.chunk_rows, args.min_efficiency)
+    print(json.dumps(results, indent=2))
+    if not all(results["checks"].values()):
+        raise SystemExit(1)
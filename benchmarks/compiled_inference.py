@@ -0,0 +1,64 @@
+"""Parity check and latency comparison: compiled tree predictor vs LightGBM.
+
+Usage:
+    python -m benchmarks.compiled_inference [--repeats 200]
+"""
+import argparse
+import json
+import time
+
+import joblib
+import numpy as np
+
+from config.path_config import MODEL_OUTPUT_PATH, PROCESSED_TEST_DATA_PATH
+from src.tree_compiler import CompiledTreeModel
+from utils.common_functions import load_data
+
+
+def time_call(fn, features, repeats: int) -> float:
+    """Return the median latency of fn(features) in milliseconds."""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(features)
+        timings.append((time.perf_counter() - start) * 1000.0)
+    return float(np.median(timings))
+
+
+def main(repeats: int, batch_sizes: list) -> dict:
+    model = joblib.load(MODEL_OUTPUT_PATH)
+    compiled_model = CompiledTreeModel.from_booster(model.booster_, classes=model.classes_)
+
+    test_df = load_data(PROCESSED_TEST_DATA_PATH)
+    features = test_df.drop(columns=["booking_status"]).to_numpy(dtype=np.float32)
+
+    # parity: exact probabilities must match bit for bit on the whole test set,
+    # the vectorized ones to within the last ulp of exp
+    expected = model.predict_proba(features)
+    actual = compiled_model.predict_proba(features, exact=True)
+    if not np.array_equal(expected, actual):
+        raise SystemExit(f"Parity check failed: max abs diff {np.abs(expected - actual).max()}")
+    vectorized_diff = float(np.abs(expected - compiled_model.predict_proba(features)).max())
+    if vectorized_diff > 1e-15:
+        raise SystemExit(f"Vectorized parity check failed: max abs diff {vectorized_diff}")
+
+    results = {"parity": True, "vectorized_max_abs_diff": vectorized_diff,
+               "num_trees": compiled_model.meta["num_trees"], "latency_ms": {}}
+    for batch_size in batch_sizes:
+        batch = np.ascontiguousarray(features[:batch_size])
+        results["latency_ms"][batch_size] = {
+            "lgbm_predict": time_call(model.predict, batch, repeats),
+            "compiled_predict": time_call(compiled_model.predict, batch, repeats),
+            "compiled_predict_proba_exact": time_call(lambda rows: compiled_model.predict_proba(rows, exact=True), batch, repeats),
+            "compiled_predict_proba": time_call(compiled_model.predict_proba, batch, repeats),
+        }
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeats", type=int, default=200)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 64, 512])
+    args = parser.parse_args()
+
+    print(json.dumps(main(args.repeats, args.batch_sizes), indent=2))
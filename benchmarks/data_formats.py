@@ -0,0 +1,62 @@
+"""Parse time and file size of the pipeline datasets stored as CSV vs Parquet.
+
+Usage:
+    python -m benchmarks.data_formats [--repeats 5]
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from config.path_config import CONFIG_PATH, RAW_DATA_PATH, PROCESSED_TRAIN_DATA_PATH
+from utils.common_functions import read_yml_file, load_data, save_data, optimize_dtypes
+
+
+def median_load_ms(path: Path, repeats: int, **kwargs) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        load_data(path, **kwargs)
+        timings.append((time.perf_counter() - start) * 1000.0)
+    return float(np.median(timings))
+
+
+def main(repeats: int) -> dict:
+    config = read_yml_file(CONFIG_PATH)
+    schema = config["data_schema"]
+    processing = config["data_processing"]
+    feature_columns = processing["category_features"] + processing["numerical_features"]
+
+    datasets = {
+        "raw": (load_data(RAW_DATA_PATH, dtype=schema), feature_columns),
+        "processed_train": (optimize_dtypes(load_data(PROCESSED_TRAIN_DATA_PATH)), None),
+    }
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for name, (df, columns) in datasets.items():
+            results[name] = {"rows": len(df)}
+            for data_format in ("csv", "parquet"):
+                path = Path(tmp_dir) / f"{name}.{data_format}"
+                save_data(df, path)
+                # CSV needs the schema to reach the same dtypes that Parquet stores
+                dtype = schema if data_format == "csv" and name == "raw" else None
+                results[name][data_format] = {
+                    "size_bytes": os.path.getsize(path),
+                    "load_all_ms": median_load_ms(path, repeats, dtype=dtype),
+                }
+                if columns is not None:
+                    results[name][data_format]["load_features_ms"] = median_load_ms(path, repeats, columns=columns, dtype=dtype)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    print(json.dumps(main(args.repeats), indent=2))
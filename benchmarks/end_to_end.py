@@ -0,0 +1,253 @@
+"""End-to-end timings of the pipeline stages and of serving, on synthetic bookings.
+
+For every scale (a multiple of the rows in raw_data.csv) a synthetic raw
+dataset with the raw schema is generated, then each stage runs the way the
+pipeline runs it and is timed on its own:
+
+    split           : train/test split of the raw rows (as DataIngestion does)
+    process_data    : fit the feature transformer on train, transform train and test
+    balance_data    : balance the processed training split
+    select_features : rank the features of the balanced split (ranking cache off)
+    train_model     : ModelTrainer's hyperparameter search and refit
+    evaluate_model  : metrics on the processed test split
+
+The trained model is then served through app.py with Flask's test client,
+with the prediction cache disabled: single bookings posted to the form
+endpoint one after another, and /predict/batch at several batch sizes.
+
+Results are written as JSON. Given --baseline (an earlier results file),
+every time or latency that grew, and every throughput that fell, by more
+than --threshold is listed under "regressions" and the exit status is 1.
+
+Usage:
+    python -m benchmarks.end_to_end [--scales 1 10 100] [--n-iter 2 --cv 3] [--baseline old.json] [--output new.json]
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import yaml
+from sklearn.model_selection import train_test_split
+
+from config.path_config import CONFIG_PATH, RAW_DATA_PATH, BENCHMARK_RESULTS_DIR
+from utils.common_functions import read_yml_file, load_data
+
+STAGES = ("split", "process_data", "balance_data", "select_features", "train_model", "evaluate_model")
+
+
+def synthetic_bookings(n_rows: int, schema: dict, template_path: Path = RAW_DATA_PATH, seed: int = 0) -> pd.DataFrame:
+    """Return n_rows bookings with the raw schema, resampled from the template data.
+
+    Rows are drawn with replacement so the columns keep their joint
+    distribution (and the target stays learnable); lead_time and
+    avg_price_per_room are jittered so the copies are not exact duplicates,
+    and every row gets a fresh Booking_ID.
+    """
+    rng = np.random.default_rng(seed)
+    template = load_data(template_path, dtype=schema)
+    df = template.iloc[rng.integers(0, len(template), n_rows)].reset_index(drop=True)
+
+    df["Booking_ID"] = pd.array([f"SYN{i:09d}" for i in range(n_rows)], dtype=schema.get("Booking_ID", "string"))
+    lead_time = df["lead_time"].to_numpy(dtype=np.int64) + rng.integers(-3, 4, n_rows)
+    df["lead_time"] = np.clip(lead_time, 0, None).astype(df["lead_time"].dtype)
+    price = df["avg_price_per_room"].to_numpy(dtype=np.float64) * rng.normal(1.0, 0.02, n_rows)
+    df["avg_price_per_room"] = np.round(np.clip(price, 0, None), 2)
+    return df
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def latency_summary(latencies_ms: list, rows_per_call: int) -> dict:
+    total_seconds = sum(latencies_ms) / 1000.0
+    return {
+        "calls": len(latencies_ms),
+        "p50_ms": float(np.percentile(latencies_ms, 50)),
+        "p95_ms": float(np.percentile(latencies_ms, 95)),
+        "p99_ms": float(np.percentile(latencies_ms, 99)),
+        "rows_per_second": len(latencies_ms) * rows_per_call / total_seconds,
+    }
+
+
+def run_stages(raw: pd.DataFrame, config_path: Path, work_dir: Path, n_iter: int = None, cv: int = None) -> tuple:
+    """Time each pipeline stage on raw; returns (stage timings, model, transformer, raw test rows)."""
+    from src.data_preprocessing import DataProcessor
+    from src.model_training import ModelTrainer
+
+    processor = DataProcessor(config_path, work_dir / "train.csv", work_dir / "test.csv", work_dir)
+    columns = processor.config.get("category_features", []) + processor.config.get("numerical_features", [])
+    stages = {}
+
+    (train_raw, test_raw), stages["split"] = timed(
+        train_test_split, raw, test_size=1 - processor.config_load["data_ingestion"]["train_ratio"], random_state=42)
+
+    def process_splits():
+        train = processor.process_data(train_raw[columns])
+        test = processor.process_data(test_raw[columns], processor.transformer)
+        return train, test
+    (train, test), stages["process_data"] = timed(process_splits)
+    balanced, stages["balance_data"] = timed(processor.balance_data, train)
+    selected, stages["select_features"] = timed(processor.select_features, balanced)
+
+    trainer = ModelTrainer(work_dir / "processed_train.csv", work_dir / "processed_test.csv", work_dir / "model.pkl")
+    trainer.random_search_parms = {**trainer.random_search_parms,
+                                   **({"n_iter": n_iter} if n_iter else {}), **({"cv": cv} if cv else {})}
+    X_train, y_train = selected.drop(columns=["booking_status"]), selected["booking_status"]
+    test = test[selected.columns]
+    X_test, y_test = test.drop(columns=["booking_status"]), test["booking_status"]
+    model, stages["train_model"] = timed(trainer.train_model, X_train, y_train)
+    metrics, stages["evaluate_model"] = timed(trainer.evaluate_model, model, X_test, y_test)
+
+    transformer = processor.transformer
+    transformer.feature_names = X_train.columns.tolist()
+    timings = {stage: {"seconds": stages[stage]} for stage in STAGES}
+    timings["rows"] = {"train": len(train_raw), "balanced": len(balanced), "test": len(test_raw)}
+    timings["accuracy"] = float(metrics["accuracy"].iloc[0])
+    return timings, model, transformer, test_raw
+
+
+def serve(model, transformer, test_raw: pd.DataFrame, single_requests: int, batch_sizes: list, batch_repeats: int) -> dict:
+    """Latency and throughput of app.py for the given model, without the prediction cache."""
+    import app as app_module
+    from src.model_reloader import ServedModel
+    from src.prediction_cache import PredictionCache
+
+    app_module.model_reloader.stop_watching()
+    app_module.model_reloader.swap(ServedModel(model, transformer, "benchmark", "pickle"))
+    app_module.prediction_cache = PredictionCache(max_entries=0)
+    client = app_module.app.test_client()
+    # raw values as JSON-native types, the way clients send them
+    bookings = json.loads(test_raw[transformer.feature_names].to_json(orient="records"))
+
+    latencies = []
+    for booking in (bookings[i % len(bookings)] for i in range(single_requests)):
+        start = time.perf_counter()
+        response = client.post("/", data={col: str(value) for col, value in booking.items()})
+        latencies.append((time.perf_counter() - start) * 1000.0)
+        if response.status_code != 200:
+            raise SystemExit(f"Single prediction failed with {response.status_code}: {response.get_data(as_text=True)[:200]}")
+    results = {"single": latency_summary(latencies, 1), "batch": {}}
+
+    for batch_size in batch_sizes:
+        payload = {"bookings": (bookings * (batch_size // len(bookings) + 1))[:batch_size]}
+        latencies = []
+        for _ in range(batch_repeats):
+            start = time.perf_counter()
+            response = client.post("/predict/batch", json=payload)
+            latencies.append((time.perf_counter() - start) * 1000.0)
+            if response.status_code != 200:
+                raise SystemExit(f"Batch prediction failed with {response.status_code}: {response.get_json()}")
+        results["batch"][str(batch_size)] = latency_summary(latencies, batch_size)
+    return results
+
+
+def flatten(results: dict, prefix: str = "") -> dict:
+    flat = {}
+    for key, value in results.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{prefix}{key}/"))
+        elif isinstance(value, (int, float)):
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+
+def find_regressions(results: dict, baseline: dict, threshold: float) -> list:
+    """List the timings/latencies that grew and the throughputs that fell by more than threshold."""
+    current, previous = flatten(results["scales"]), flatten(baseline.get("scales", {}))
+    regressions = []
+    for key, value in current.items():
+        old = previous.get(key)
+        if not old:
+            continue
+        if key.endswith(("seconds", "_ms")) and not key.endswith("per_second"):
+            regressed = value > old * (1 + threshold)
+        elif key.endswith("per_second"):
+            regressed = value < old / (1 + threshold)
+        else:
+            continue
+        if regressed:
+            regressions.append({"metric": key, "baseline": old, "current": value, "change": value / old - 1})
+    return regressions
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def main(args) -> dict:
+    config = read_yml_file(args.config)
+    # a cached ranking would skip the work select_features is timed for
+    config["data_processing"]["feature_selection"] = {**config["data_processing"].get("feature_selection", {}), "cache": False}
+    base_rows = len(load_data(RAW_DATA_PATH, columns=["Booking_ID"]))
+
+    results = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "settings": {"n_iter": args.n_iter, "cv": args.cv, "single_requests": args.single_requests,
+                     "batch_sizes": args.batch_sizes, "batch_repeats": args.batch_repeats},
+        "scales": {},
+    }
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        config_path = Path(tmp_dir) / "config.yml"
+        with open(config_path, "w") as f:
+            yaml.safe_dump(config, f)
+        for scale in args.scales:
+            work_dir = Path(tmp_dir) / f"{scale}x"
+            work_dir.mkdir()
+            raw = synthetic_bookings(base_rows * scale, config["data_schema"], seed=scale)
+            stages, model, transformer, test_raw = run_stages(raw, config_path, work_dir, args.n_iter, args.cv)
+            del raw
+            results["scales"][f"{scale}x"] = {
+                "raw_rows": base_rows * scale,
+                "stages": stages,
+                "serving": serve(model, transformer, test_raw, args.single_requests, args.batch_sizes, args.batch_repeats),
+            }
+            print(f"{scale}x: {json.dumps(results['scales'][f'{scale}x'])}", flush=True)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            results["regressions"] = find_regressions(results, json.load(f), args.threshold)
+        results["baseline"] = str(args.baseline)
+        results["threshold"] = args.threshold
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", nargs="+", type=int, default=[1, 10, 100])
+    parser.add_argument("--config", type=Path, default=CONFIG_PATH)
+    parser.add_argument("--n-iter", type=int, help="Override the search's n_iter (defaults to config/model_parms.py)")
+    parser.add_argument("--cv", type=int, help="Override the search's CV folds")
+    parser.add_argument("--single-requests", type=int, default=200)
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=[32, 512, 4096])
+    parser.add_argument("--batch-repeats", type=int, default=20)
+    parser.add_argument("--baseline", type=Path, help="Earlier results file to flag regressions against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Relative change that counts as a regression")
+    parser.add_argument("--output", type=Path, help="Defaults to artifacts/benchmarks/end_to_end_<timestamp>.json")
+    args = parser.parse_args()
+
+    results = main(args)
+    output = args.output or BENCHMARK_RESULTS_DIR / f"end_to_end_{datetime.now():%Y%m%d_%H%M%S}.json"
+    os.makedirs(Path(output).parent, exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {output}")
+    if results.get("regressions"):
+        print(json.dumps(results["regressions"], indent=2))
+        raise SystemExit(1)
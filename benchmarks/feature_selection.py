@@ -0,0 +1,58 @@
+"""Selection time and stability of each feature selection method.
+
+Builds the balanced training split the processing stage feeds to feature
+selection, then for every method reports the uncached and cached
+selection time, the chosen features, their overlap with the original
+random_forest choice, and the stability of the choice across reseeded
+80% subsamples (mean pairwise Jaccard of the top-k sets).
+
+Usage:
+    python -m benchmarks.feature_selection [--methods random_forest lgbm_gain] [--seeds 5]
+"""
+import argparse
+import json
+import tempfile
+from pathlib import Path
+
+from config.path_config import CONFIG_PATH, TRAIN_DATA_PATH, DATA_PROCESSING_DIR
+from src.data_preprocessing import DataProcessor
+from src.feature_selection import FeatureSelector, SELECTION_METHODS
+
+
+def main(methods: list, seeds: int) -> dict:
+    processor = DataProcessor(CONFIG_PATH, TRAIN_DATA_PATH, TRAIN_DATA_PATH, DATA_PROCESSING_DIR)
+    df = processor.balance_data(processor.load_and_process(TRAIN_DATA_PATH)[0])
+    X, y = df.drop(columns=["booking_status"]), df["booking_status"]
+    selection = processor.config.get("feature_selection", {})
+    num_features = processor.config.get("num_of_fearures_to_select", 10)
+
+    results = {"rows": len(X), "columns": X.shape[1], "num_features": num_features}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for method in methods:
+            selector = FeatureSelector(method, num_features, max_samples=selection.get("max_samples", 0.2),
+                                       n_estimators=selection.get("n_estimators", 100), n_jobs=selection.get("n_jobs", -1),
+                                       cache_path=Path(tmp_dir) / f"{method}.json")
+            selected = selector.select(X, y)
+            uncached_seconds = selector.last_report["selection_seconds"]
+            selector.select(X, y)
+            results[method] = {
+                "selection_seconds": uncached_seconds,
+                "cached_selection_seconds": selector.last_report["selection_seconds"],
+                "selected_features": selected,
+                **selector.stability(X, y, seeds=tuple(range(seeds))),
+            }
+
+    if "random_forest" in results:
+        reference = set(results["random_forest"]["selected_features"])
+        for method in methods:
+            results[method]["overlap_with_random_forest"] = len(reference & set(results[method]["selected_features"])) / num_features
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--methods", nargs="+", default=list(SELECTION_METHODS), choices=SELECTION_METHODS)
+    parser.add_argument("--seeds", type=int, default=5, help="Subsample/seed repetitions for the stability score")
+    args = parser.parse_args()
+
+    print(json.dumps(main(args.methods, args.seeds), indent=2))
@@ -0,0 +1,117 @@
+"""The HTML form's real option values, posted to both servers with and without the model's transformer.
+
+The <select> options are read from templates/index.html. Starting from
+FORM_BOOKING, every option of every select is posted in turn to the Flask
+app (app.py) and the FastAPI app (asgi_app.py), once with the served
+model's FeatureTransformer and once with the transformer removed, as for a
+model saved before the sidecar existed. Every post must return 200, and
+parse_form must build the same features both ways (after reordering to the
+transformer's feature order), so the fallback codes match the encoding the
+model was trained with.
+
+Needs the trained model artifacts, including the feature transformer.
+
+Usage:
+    python -m benchmarks.form_inputs
+"""
+import argparse
+import json
+import os
+from html.parser import HTMLParser
+from pathlib import Path
+
+import numpy as np
+
+from benchmarks.serving_metrics import FORM_BOOKING
+from src.inference import FEATURE_COLUMNS, parse_form
+from src.model_reloader import ServedModel
+
+TEMPLATE_PATH = Path(__file__).resolve().parent.parent / "templates" / "index.html"
+
+
+class _SelectOptions(HTMLParser):
+    """Collects {select name: [option values]} from a template."""
+
+    def __init__(self):
+        super().__init__()
+        self.options, self.__select = {}, None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "select":
+            self.__select = attrs["name"]
+            self.options[self.__select] = []
+        elif tag == "option" and self.__select is not None:
+            self.options[self.__select].append(attrs["value"])
+
+    def handle_endtag(self, tag):
+        if tag == "select":
+            self.__select = None
+
+
+def template_forms() -> list:
+    """Return FORM_BOOKING with each option of each <select> in turn, as posted form fields."""
+    parser = _SelectOptions()
+    parser.feed(TEMPLATE_PATH.read_text())
+    base = {col: str(value) for col, value in FORM_BOOKING.items()}
+    return [{**base, name: value} for name, values in parser.options.items() for value in values]
+
+
+def post_forms(post, swap, served, forms: list) -> dict:
+    """Post every form with and without the served transformer; return the status codes of each."""
+    statuses = {}
+    for label, transformer in (("transformer", served.transformer), ("no_transformer", None)):
+        swap(ServedModel(served.model, transformer, served.version, served.model_format))
+        statuses[label] = [post(form) for form in forms]
+    swap(served)
+    return statuses
+
+
+def main() -> dict:
+    os.environ.setdefault("MODEL_RELOAD_POLL_SECONDS", "0")
+    import app as app_module
+    import asgi_app
+    from fastapi.testclient import TestClient
+
+    served = app_module.model_reloader.current
+    if served is None or served.transformer is None:
+        raise SystemExit("app.py could not load the model with its transformer; train it first")
+    forms = template_forms()
+    results, checks = {"forms": len(forms)}, {}
+
+    # the fallback codes must be the ones the transformer encodes to
+    order = [FEATURE_COLUMNS.index(col) for col in served.transformer.feature_names]
+
+    def encodes_alike(form):
+        try:
+            return np.array_equal(parse_form(form, served.transformer), parse_form(form, None)[:, order])
+        except (KeyError, ValueError):
+            return False
+
+    mismatched = [form for form in forms if not encodes_alike(form)]
+    results["encoding_mismatches"] = mismatched
+    checks["fallback_matches_transformer"] = not mismatched
+
+    flask_client = app_module.app.test_client()
+    results["flask"] = post_forms(lambda form: flask_client.post("/", data=form).status_code,
+                                  app_module.model_reloader.swap, served, forms)
+    with TestClient(asgi_app.app) as asgi_client:
+        reloader = asgi_app.app.state.model_reloader
+        results["asgi"] = post_forms(lambda form: asgi_client.post("/", data=form).status_code,
+                                     reloader.swap, reloader.current, forms)
+
+    for server in ("flask", "asgi"):
+        for label, statuses in results[server].items():
+            checks[f"{server}_{label}_all_200"] = all(status == 200 for status in statuses)
+            print(f"{server} {label}: {json.dumps({status: statuses.count(status) for status in set(statuses)})}", flush=True)
+    return {"results": results, "checks": checks}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.parse_args()
+
+    results = main()
+    print(json.dumps(results, indent=2))
+    if not all(results["checks"].values()):
+        raise SystemExit(1)
@@ -0,0 +1,111 @@
+"""Cached, ranged GCS download (src/gcs_download.py) against a local stand-in bucket.
+
+A --size-mb object is written to a temporary bucket directory served by
+src/local_storage.py, with --latency seconds per request and
+--bandwidth-mb MB/s per connection to mimic GCS. Then:
+
+single   : the object as one stream (parallel threshold above its size)
+parallel : the object as --chunk-mb ranges on --threads threads
+cached   : the same download again; nothing may be transferred
+resume   : a fresh download whose connection fails after half of the
+           ranges, then a second call that must fetch only the rest
+changed  : the object is rewritten, so the next call downloads it again
+
+Every completed download must match the object's md5. Reports seconds,
+MB/s and bytes transferred of each step, and the parallel speedup.
+
+Usage:
+    python -m benchmarks.gcs_download [--size-mb 64] [--chunk-mb 4] [--threads 8] [--latency 0.05] [--bandwidth-mb 50]
+"""
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+from src.custom_exception import CustomException
+from src.gcs_download import CachedBlobDownloader
+from src.local_storage import LocalStorageClient
+
+BUCKET, OBJECT = "bench-bucket", "bookings.csv"
+
+
+def _md5(path: Path) -> str:
+    digest = hashlib.md5()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def main(size_mb: int, chunk_mb: int, threads: int, latency: float, bandwidth_mb: float) -> dict:
+    results, checks = {}, {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp_dir = Path(tmp_dir)
+        source = tmp_dir / "buckets" / BUCKET / OBJECT
+        os.makedirs(source.parent)
+        with open(source, "wb") as f:
+            f.write(os.urandom(size_mb * 2**20))
+
+        def downloader(name, threshold_mb, **client_args):
+            client = LocalStorageClient(tmp_dir / "buckets", latency_seconds=latency,
+                                        bandwidth_bytes_per_second=bandwidth_mb * 2**20, **client_args)
+            return client, CachedBlobDownloader(client, tmp_dir / f"{name}_manifest.json", chunk_bytes=chunk_mb * 2**20,
+                                                max_workers=threads, parallel_threshold_bytes=threshold_mb * 2**20,
+                                                max_retries=0)
+
+        def record(step, report, destination):
+            results[step] = {key: report[key] for key in ("outcome", "seconds", "mb_per_second", "bytes_transferred")}
+            checks[f"{step}_md5_matches"] = _md5(destination) == _md5(source)
+            print(f"{step}: {json.dumps(results[step])}", flush=True)
+
+        # one stream, then ranges, into separate destinations
+        _, single = downloader("single", threshold_mb=size_mb + 1)
+        record("single", single.download(BUCKET, OBJECT, tmp_dir / "single.csv"), tmp_dir / "single.csv")
+        _, parallel = downloader("parallel", threshold_mb=0)
+        record("parallel", parallel.download(BUCKET, OBJECT, tmp_dir / "parallel.csv"), tmp_dir / "parallel.csv")
+        record("cached", parallel.download(BUCKET, OBJECT, tmp_dir / "parallel.csv"), tmp_dir / "parallel.csv")
+
+        # half of the ranges arrive, then the connection drops
+        chunks = -(-size_mb // chunk_mb)
+        client, failing = downloader("resume", threshold_mb=0, fail_after_requests=chunks // 2)
+        try:
+            failing.download(BUCKET, OBJECT, tmp_dir / "resume.csv")
+            checks["interrupted_download_failed"] = False
+        except CustomException:
+            checks["interrupted_download_failed"] = True
+        transferred_before = client.bytes_served
+        client.fail_after_requests = None
+        record("resume", failing.download(BUCKET, OBJECT, tmp_dir / "resume.csv"), tmp_dir / "resume.csv")
+        results["resume"]["bytes_before_failure"] = transferred_before
+
+        # rewriting the object makes it a new generation
+        with open(source, "r+b") as f:
+            f.write(os.urandom(1024))
+        record("changed", parallel.download(BUCKET, OBJECT, tmp_dir / "parallel.csv"), tmp_dir / "parallel.csv")
+
+    size = size_mb * 2**20
+    results["parallel_speedup"] = results["single"]["seconds"] / results["parallel"]["seconds"]
+    checks["cached_transfers_nothing"] = results["cached"]["outcome"] == "cached" and results["cached"]["bytes_transferred"] == 0
+    checks["resume_fetches_only_missing"] = (results["resume"]["outcome"] == "resumed"
+                                             and results["resume"]["bytes_transferred"] + results["resume"]["bytes_before_failure"] == size)
+    checks["changed_object_downloaded"] = results["changed"]["outcome"] == "downloaded"
+    checks["parallel_faster_than_single"] = results["parallel_speedup"] > 1
+    return {"size_mb": size_mb, "chunk_mb": chunk_mb, "threads": threads, "latency_seconds": latency,
+            "bandwidth_mb_per_connection": bandwidth_mb, "results": results, "checks": checks}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-mb", type=int, default=64)
+    parser.add_argument("--chunk-mb", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds added to every request")
+    parser.add_argument("--bandwidth-mb", type=float, default=50, help="MB/s of each connection")
+    args = parser.parse_args()
+
+    results = main(args.size_mb, args.chunk_mb, args.threads, args.latency, args.bandwidth_mb)
+    print(json.dumps(results, indent=2))
+    if not all(results["checks"].values()):
+        raise SystemExit(1)
@@ -0,0 +1,86 @@
+"""Compare hyperparameter search engines on the processed training set.
+
+Variants:
+    baseline  : RandomizedSearchCV with n_jobs=-1 at both the CV and LightGBM level (the original setup)
+    split     : RandomizedSearchCV with cores split between CV jobs and LightGBM threads
+    prebinned : randomized search on folds binned once and reused by every candidate
+    halving   : successive halving with early stopping on the prebinned folds
+
+Each variant runs ModelTrainer's search and refit and reports search time,
+trees built, best CV accuracy and test accuracy. baseline, split and
+prebinned sample the same candidates on the same folds, so their CV
+accuracies should agree.
+
+Usage:
+    python -m benchmarks.hyperparameter_search [--variants baseline prebinned] [--cv-jobs N] [--lgbm-threads N]
+"""
+import argparse
+import json
+import time
+
+import lightgbm as lgb
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import RandomizedSearchCV
+
+from config.path_config import PROCESSED_TRAIN_DATA_PATH, PROCESSED_TEST_DATA_PATH, MODEL_OUTPUT_PATH
+from src.model_training import ModelTrainer
+
+VARIANTS = ["baseline", "split", "prebinned", "halving"]
+
+
+def baseline_search(trainer: ModelTrainer, X_train, y_train):
+    """The search as it was before the thread split: n_jobs=-1 everywhere, binning on every fit."""
+    parms = trainer.random_search_parms
+    start = time.perf_counter()
+    search = RandomizedSearchCV(
+        estimator=lgb.LGBMClassifier(random_state=parms['random_state'], n_jobs=-1, verbose=-1),
+        param_distributions=trainer.parms_distribution,
+        n_iter=parms['n_iter'],
+        random_state=parms['random_state'],
+        cv=parms['cv'],
+        n_jobs=-1,
+        scoring=parms['scoring'],
+    )
+    search.fit(X_train, y_train)
+    trainer.search_summary = {
+        "search_best_cv_accuracy": search.best_score_,
+        "search_seconds": time.perf_counter() - start,
+    }
+    return search.best_estimator_
+
+
+def main(variants: list, thread_parms: dict) -> dict:
+    trainer = ModelTrainer(PROCESSED_TRAIN_DATA_PATH, PROCESSED_TEST_DATA_PATH, MODEL_OUTPUT_PATH)
+    X_train, y_train, X_test, y_test = trainer.load_and_split_data()
+    trainer.thread_parms = thread_parms
+
+    results = {}
+    for variant in variants:
+        trainer.search_mode = "halving" if variant == "halving" else "random"
+        trainer.random_search_parms = {**trainer.random_search_parms, "prebinned": variant == "prebinned"}
+
+        start = time.perf_counter()
+        if variant == "baseline":
+            model = baseline_search(trainer, X_train, y_train)
+        else:
+            model = trainer.train_model(X_train, y_train)
+        results[variant] = {
+            **trainer.search_summary,
+            "total_seconds": time.perf_counter() - start,
+            "test_accuracy": accuracy_score(y_test, model.predict(X_test)),
+        }
+
+    if "baseline" in results:
+        for variant, result in results.items():
+            result["speedup_vs_baseline"] = results["baseline"]["search_seconds"] / result["search_seconds"]
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--variants", nargs="+", default=["baseline", "prebinned"], choices=VARIANTS)
+    parser.add_argument("--cv-jobs", type=int, default=None, help="Folds trained concurrently (default: derived)")
+    parser.add_argument("--lgbm-threads", type=int, default=None, help="LightGBM threads per fold (default: derived)")
+    args = parser.parse_args()
+
+    print(json.dumps(main(args.variants, {"cv_jobs": args.cv_jobs, "lgbm_threads": args.lgbm_threads}), indent=2))
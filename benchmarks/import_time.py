@@ -0,0 +1,138 @@
+"""Import time of the pipeline stages and the web servers, against a startup budget.
+
+Every target is imported in a fresh interpreter with `python -X importtime`
+(--repeats times after one warm-up run that writes the bytecode caches;
+the fastest run counts). Reports, per target, the cumulative import time of
+the module, the wall time of the whole process and the slowest imports by
+self time. Checks that
+
+budget    : each import stays within its budget (ms, scaled by --budget-scale)
+forbidden : no stage or server loads a heavy library it only needs inside a
+            function (mlflow, lightgbm, scikit-learn, scipy and the GCS
+            client for the pipeline modules; those and pandas and yaml for
+            the servers at MODEL_FORMAT=native)
+image     : every repo module a server loads is copied into the serving
+            image by the Dockerfile
+
+The servers load the model while they are imported, so the image check
+needs the trained model artifacts (without them the compiled-model module
+is never reached).
+
+Usage:
+    python -m benchmarks.import_time [--repeats 5] [--budget-scale 1.0] [--top 5]
+"""
+import argparse
+import json
+import os
+import re
+import shlex
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+TRAINING_LIBRARIES = ("mlflow", "lightgbm", "sklearn", "scipy", "google.cloud.storage", "joblib")
+SERVING_ENV = {"MODEL_FORMAT": "native", "MODEL_RELOAD_POLL_SECONDS": "0"}
+
+# target -> (module, extra environment, budget in ms, modules it must not load)
+TARGETS = {
+    "data_ingestion": ("src.data_ingestion", {}, 1000, TRAINING_LIBRARIES),
+    "data_preprocessing": ("src.data_preprocessing", {}, 1000, TRAINING_LIBRARIES),
+    "model_training": ("src.model_training", {}, 1000, TRAINING_LIBRARIES),
+    "training_pipeline": ("pipeline.training_pipeline", {}, 1200, TRAINING_LIBRARIES),
+    "flask_app": ("app", SERVING_ENV, 600, TRAINING_LIBRARIES + ("pandas", "yaml")),
+    "asgi_app": ("asgi_app", SERVING_ENV, 1000, TRAINING_LIBRARIES + ("pandas", "yaml")),
+}
+SERVERS = ("flask_app", "asgi_app")
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def import_trace(module: str, env: dict) -> dict:
+    """_summary_
+    This function imports module in a fresh interpreter with -X importtime
+    and parses the trace it writes to stderr.
+
+    Returns:
+        dict: cumulative_ms of the module, wall_ms of the process and
+        modules, {name: (self_ms, cumulative_ms)} of everything imported.
+    """
+    start = time.perf_counter()
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=ROOT,
+                               env={**os.environ, **env}, capture_output=True, text=True)
+    wall_ms = (time.perf_counter() - start) * 1000
+    if completed.returncode != 0:
+        raise SystemExit(f"import {module} failed:\n{completed.stderr[-2000:]}")
+    modules = {}
+    for line in completed.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            modules[match.group(4)] = (int(match.group(1)) / 1000, int(match.group(2)) / 1000)
+    return {"cumulative_ms": modules[module][1], "wall_ms": wall_ms, "modules": modules}
+
+
+def dockerfile_sources(path: Path = ROOT / "Dockerfile") -> set:
+    """Return the repo paths the COPY instructions of the Dockerfile copy into the image."""
+    text = path.read_text().replace("\\\n", " ")
+    sources = set()
+    for line in text.splitlines():
+        words = shlex.split(line.strip())
+        if words and words[0].upper() == "COPY":
+            sources.update(word.rstrip("/") for word in words[1:-1] if not word.startswith("--"))
+    return sources
+
+
+def module_path(module: str) -> str:
+    """Return the repo path a module is loaded from, e.g. src/logger.py or src/__init__.py."""
+    path = module.replace(".", "/")
+    return f"{path}/__init__.py" if (ROOT / path).is_dir() else f"{path}.py"
+
+
+def main(repeats: int, budget_scale: float, top: int) -> dict:
+    results, checks = {}, {}
+    copied = dockerfile_sources()
+    for name, (module, env, budget_ms, forbidden) in TARGETS.items():
+        import_trace(module, env)
+        traces = [import_trace(module, env) for _ in range(repeats)]
+        best = min(traces, key=lambda trace: trace["cumulative_ms"])
+        imported = best["modules"]
+
+        loaded_forbidden = sorted(library for library in forbidden
+                                  if any(m == library or m.startswith(library + ".") for m in imported))
+        slowest = sorted(imported.items(), key=lambda item: item[1][0], reverse=True)[:top]
+        results[name] = {
+            "module": module,
+            "cumulative_ms": best["cumulative_ms"],
+            "wall_ms": min(trace["wall_ms"] for trace in traces),
+            "budget_ms": budget_ms * budget_scale,
+            "modules_imported": len(imported),
+            "forbidden_loaded": loaded_forbidden,
+            "slowest_self_ms": {m: self_ms for m, (self_ms, _) in slowest},
+        }
+        checks[f"{name}_within_budget"] = best["cumulative_ms"] <= budget_ms * budget_scale
+        checks[f"{name}_no_heavy_imports"] = not loaded_forbidden
+
+        if name in SERVERS:
+            repo_modules = [m for m in imported if m.split(".")[0] in ("src", "config") or m == module]
+            missing = sorted(module_path(m) for m in repo_modules if module_path(m) not in copied
+                             and str(Path(module_path(m)).parent) not in copied)
+            results[name]["missing_from_image"] = missing
+            checks[f"{name}_modules_in_image"] = not missing
+        print(f"{name}: {json.dumps(results[name])}", flush=True)
+
+    return {"repeats": repeats, "budget_scale": budget_scale, "results": results, "checks": checks}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--budget-scale", type=float, default=1.0, help="Multiplier of every budget, for slower machines")
+    parser.add_argument("--top", type=int, default=5, help="Slowest imports reported per target")
+    args = parser.parse_args()
+
+    results = main(args.repeats, args.budget_scale, args.top)
+    print(json.dumps(results, indent=2))
+    if not all(results["checks"].values()):
+        raise SystemExit(1)
@@ -0,0 +1,174 @@
+"""Incremental retraining (ModelTrainer.train_model_incremental) against a full retrain.
+
+The raw training split is shuffled and the last --new-fraction of its rows
+held back as "newly ingested". The rest goes through processing as the
+pipeline runs it (cleaning, the feature transformer, the configured
+balancing and the saved model's feature selection) into a temporary
+directory. A model with the saved model's hyperparameters is trained on
+it and saved there with its training state. Then all raw rows are
+processed and balanced again with the same transformer, so the balancing
+rows are regenerated as on a real rerun, and for each strategy:
+
+continue : boost extra_rounds more trees on the new rows only
+refit    : re-estimate the existing leaves from the new rows
+
+runs train_model_incremental on the processed rows, which also fits the
+same hyperparameters from scratch on all of them for comparison. Reports
+the wall time and test metrics of both. Each strategy must run
+incrementally, find exactly the held-out rows that processing kept as
+new (none of the regenerated balancing rows), finish faster than the
+full retrain and stay within --max-accuracy-gap of its test accuracy, and
+its pickle must load in a fresh interpreter that cannot import pandas or
+any repo module the serving image (the Dockerfile) leaves out.
+Finally the held-out rows' lead_time is tripled before processing, and
+the drift check must then ask for a full retrain.
+
+Needs the raw splits and the trained model artifacts.
+
+Usage:
+    python -m benchmarks.incremental_training [--new-fraction 0.1] [--max-accuracy-gap 0.01]
+"""
+import argparse
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import joblib
+import lightgbm as lgb
+import numpy as np
+
+from benchmarks.import_time import ROOT, dockerfile_sources
+from config.model_parms import INCREMENTAL_PARAMS
+from config.path_config import CONFIG_PATH, TRAIN_DATA_PATH, TEST_DATA_PATH, FEATURE_TRANSFORMER_PATH, MODEL_OUTPUT_PATH
+from src.data_preprocessing import DataProcessor
+from src.feature_transformer import FeatureTransformer
+from src.incremental_training import row_hashes, new_row_mask
+from src.model_training import ModelTrainer
+from utils.common_functions import load_data, save_data
+
+
+def process_train(processor: DataProcessor, raw_rows, columns: list, work_dir: Path, transformer=None):
+    """Process and balance raw training rows as DataProcessor.process does; returns (transformer, real rows)."""
+    raw_path = work_dir / f"raw_train{TRAIN_DATA_PATH.suffix}"
+    save_data(raw_rows, raw_path)
+    processed, transformer = processor.load_and_process(raw_path, transformer)
+    balanced = processor.balance_data(processed)
+    processor.save_processed_data(balanced[columns], work_dir / f"processed_train{TRAIN_DATA_PATH.suffix}")
+    processor.save_balancing_report(len(processed), len(balanced) - len(processed), work_dir / "balancing.json")
+    return transformer, len(processed)
+
+
+def loads_in_serving_image(model_path: Path) -> bool:
+    """Unpickle model_path in a fresh interpreter that can only import the repo modules the serving image copies."""
+    copied = sorted(dockerfile_sources())
+    script = (
+        "import importlib.abc, joblib, sys\n"
+        "class Block(importlib.abc.MetaPathFinder):\n"
+        "    def find_spec(self, name, path, target=None):\n"
+        "        if name.split('.')[0] == 'pandas' or (name.split('.')[0] in ('src', 'config', 'utils')\n"
+        f"                and not any(p in {copied!r} for p in (name.replace('.', '/') + '.py', name.replace('.', '/') + '/__init__.py'))):\n"
+        "            raise ImportError(f'{name} is not in the serving image')\n"
+        "sys.meta_path.insert(0, Block())\n"
+        f"joblib.load({str(model_path)!r})\n"
+    )
+    return subprocess.run([sys.executable, "-c", script], cwd=ROOT, capture_output=True).returncode == 0
+
+
+def main(new_fraction: float, max_accuracy_gap: float) -> dict:
+    results, checks = {}, {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp_dir = Path(tmp_dir)
+        processor = DataProcessor(CONFIG_PATH, TRAIN_DATA_PATH, TEST_DATA_PATH, tmp_dir)
+        features = FeatureTransformer.load(FEATURE_TRANSFORMER_PATH).feature_names
+        columns = features + ["booking_status"]
+
+        raw = load_data(TRAIN_DATA_PATH)
+        raw = raw.iloc[np.random.default_rng(42).permutation(len(raw))].reset_index(drop=True)
+        history_raw = raw[:int(len(raw) * (1 - new_fraction))]
+
+        # the transformer is fitted on the history once; refitting it would itself force a full retrain
+        transformer, history_rows = process_train(processor, history_raw, columns, tmp_dir)
+        transformer.feature_names = features
+        transformer.save(tmp_dir / "feature_transformer.json")
+        test_processed, _ = processor.load_and_process(TEST_DATA_PATH, transformer)
+        processor.save_processed_data(test_processed[columns], tmp_dir / f"processed_test{TRAIN_DATA_PATH.suffix}")
+
+        trainer = ModelTrainer(
+            train_data_path=tmp_dir / f"processed_train{TRAIN_DATA_PATH.suffix}",
+            test_data_path=tmp_dir / f"processed_test{TRAIN_DATA_PATH.suffix}",
+            model_output_path=tmp_dir / "lgbm_model.pkl",
+            feature_transformer_path=tmp_dir / "feature_transformer.json",
+            model_transformer_path=tmp_dir / "model_feature_transformer.json",
+            training_state_path=tmp_dir / "lgbm_model.training.json",
+            trained_rows_path=tmp_dir / "lgbm_model.rows.npy",
+            balancing_report_path=tmp_dir / "balancing.json",
+        )
+        X_history, y_history, X_test, y_test = trainer.load_and_split_data()
+        params = joblib.load(MODEL_OUTPUT_PATH).get_params()
+        previous = lgb.LGBMClassifier(**params).fit(X_history, y_history)
+        previous_metrics = trainer.evaluate_model(previous, X_test, y_test)
+        results["previous"] = previous_metrics.iloc[0].to_dict()
+
+        def restore_previous():
+            trainer.save_model(previous)
+            shutil.copy(trainer.feature_transformer_path, trainer.model_transformer_path)
+            trainer.save_training_state(previous, X_history[:history_rows], y_history[:history_rows], previous_metrics, X_test, y_test)
+
+        restore_previous()
+        _, all_rows = process_train(processor, raw, columns, tmp_dir, transformer)
+        X_train, y_train, _, _ = trainer.load_and_split_data()
+        # processing drops duplicates in order, so the held-out rows it kept are the real rows after the history's;
+        # those equal to a history row on the selected features are not new to the model
+        real = X_train[:all_rows].assign(booking_status=y_train[:all_rows].to_numpy())
+        history_keys = set(real[:history_rows].itertuples(index=False))
+        expected_new = sum(row not in history_keys for row in real[history_rows:].itertuples(index=False))
+        results["rows"] = {"history_real": history_rows, "history_processed": len(X_history), "real": all_rows,
+                           "processed": len(X_train), "expected_new": expected_new, "test": len(X_test),
+                           # what comparing every processed row, balancing rows included, would call new
+                           "new_when_hashing_balanced_rows": int(new_row_mask(X_train, y_train, row_hashes(X_history, y_history)).sum())}
+
+        for strategy in ("continue", "refit"):
+            # every strategy starts from the same previous model
+            restore_previous()
+            trainer.incremental_parms = {**INCREMENTAL_PARAMS, 'enabled': True, 'strategy': strategy, 'compare_with_full_retrain': True}
+            trainer.incremental_summary = {}
+            model, _ = trainer.train_model_incremental(X_train, y_train, X_test, y_test)
+            summary = results[strategy] = {"mode": trainer.training_mode, "reason": trainer.full_retrain_reason, **trainer.incremental_summary}
+            print(f"{strategy}: {json.dumps(summary)}", flush=True)
+
+            checks[f"{strategy}_ran_incrementally"] = summary["mode"] == "incremental"
+            checks[f"{strategy}_new_rows_are_held_out_rows"] = summary.get("incremental.new_rows") == expected_new
+            trainer.save_model(model)
+            checks[f"{strategy}_pickle_loads_in_serving_image"] = loads_in_serving_image(trainer.model_output)
+            if summary["mode"] == "incremental":
+                summary["speedup"] = summary["full_retrain.seconds"] / summary["incremental.seconds"]
+                checks[f"{strategy}_faster_than_full_retrain"] = summary["speedup"] > 1
+                checks[f"{strategy}_accuracy_close_to_full_retrain"] = (
+                    summary["full_retrain.accuracy"] - summary["incremental.accuracy"] <= max_accuracy_gap)
+
+        # a shifted feature in the new rows must trigger a full retrain
+        restore_previous()
+        drifted_raw = raw.copy()
+        drifted_raw.loc[len(history_raw):, "lead_time"] *= 3
+        _, drifted_rows = process_train(processor, drifted_raw, columns, tmp_dir, transformer)
+        X_drifted, y_drifted, _, _ = trainer.load_and_split_data()
+        _, reason = trainer.incremental_plan(X_drifted[:drifted_rows], y_drifted[:drifted_rows])
+        results["drift_reason"] = reason
+        checks["drift_forces_full_retrain"] = isinstance(reason, str) and "drifted" in reason
+
+    return {"new_fraction": new_fraction, "results": results, "checks": checks}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--new-fraction", type=float, default=0.1, help="Share of the raw training rows treated as new")
+    parser.add_argument("--max-accuracy-gap", type=float, default=0.01)
+    args = parser.parse_args()
+
+    results = main(args.new_fraction, args.max_accuracy_gap)
+    print(json.dumps(results, indent=2))
+    if not all(results["checks"].values()):
+        raise SystemExit(1)
@@ -0,0 +1,172 @@
+"""Cost of logging on the caller: synchronous file writes against the queue-backed writer (src/logger.py).
+
+per call    : --calls calls of each kind, timed in the calling thread, with
+              the root logger in "sync" mode (how src/logger.py wrote every
+              record before) and in "queue" mode at INFO:
+                info_fstring      logger.info(f"...") (message built by the caller)
+                info_deferred     logger.info("... %d", ...)
+                debug_fstring     logger.debug(f"...") while DEBUG is disabled
+                debug_deferred    logger.debug("... %d", ...) while DEBUG is disabled
+                rate_limited      RateLimitedLogger(...).warning("... %d", ...)
+              In queue mode the writer is paused while the caller is timed
+              (with a single core it would otherwise run in the caller's
+              time slices) and the time it then needs to drain the queue is
+              reported separately. Every mode must have written exactly the
+              expected number of lines.
+per request : app.py's Flask test client posts one-booking /predict/batch
+              requests, which log one debug line each, with DEBUG on in
+              sync and queue mode, both on a normal and on a slow disk
+              (every write stalls --disk-delay-ms), and at INFO (the line
+              disabled). It also posts invalid payloads, whose rejection
+              warning is written every time or rate-limited. Blocks of the
+              configurations alternate; reports the p50 latency of each.
+
+Needs the trained model artifacts for the per-request part (app.py loads
+them at import).
+
+Usage:
+    python -m benchmarks.logging_overhead [--calls 20000] [--requests 2000] [--disk-delay-ms 1.0]
+"""
+import argparse
+import json
+import logging
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.serving_metrics import FORM_BOOKING
+import src.logger as logger_module
+from src.logger import configure_logging, flush_logs, get_logger, RateLimitedLogger
+
+
+class _SlowStream:
+    """File stream whose writes stall first, like a busy or network disk."""
+
+    def __init__(self, stream, delay_seconds: float):
+        self.stream = stream
+        self.delay_seconds = delay_seconds
+
+    def write(self, data):
+        time.sleep(self.delay_seconds)
+        return self.stream.write(data)
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+def _file_handler_of(mode: str) -> logging.FileHandler:
+    return logger_module._listener.handlers[0] if mode == "queue" else logging.getLogger().handlers[0]
+
+
+def _count_lines(path: str) -> int:
+    with open(path, "rb") as f:
+        return sum(1 for _ in f)
+
+
+def per_call(calls: int, tmp_dir: str) -> dict:
+    logger = get_logger("benchmarks.logging_overhead")
+    value = 0.123456
+    kinds = {
+        "info_fstring": (lambda i: logger.info(f"[Bench] : row {i} scored {value:.3f}"), calls),
+        "info_deferred": (lambda i: logger.info("[Bench] : row %d scored %.3f", i, value), calls),
+        "debug_fstring": (lambda i: logger.debug(f"[Bench] : row {i} scored {value:.3f}"), 0),
+        "debug_deferred": (lambda i: logger.debug("[Bench] : row %d scored %.3f", i, value), 0),
+    }
+    results = {}
+    for mode in ("sync", "queue"):
+        results[mode] = {}
+        for kind, (call, expected_lines) in {**kinds, "rate_limited": (None, 1)}.items():
+            log_file = os.path.join(tmp_dir, f"{mode}_{kind}.log")
+            configure_logging(mode=mode, level="INFO", log_file=log_file)
+            if kind == "rate_limited":
+                limited = RateLimitedLogger(logger, interval_seconds=60.0)
+                call = lambda i: limited.warning("[Bench] : row %d rejected", i)
+            if mode == "queue":
+                logger_module._listener.stop()
+            start = time.perf_counter()
+            for i in range(calls):
+                call(i)
+            caller_seconds = time.perf_counter() - start
+            if mode == "queue":
+                logger_module._listener.start()
+            flush_logs()
+            drain_seconds = time.perf_counter() - start - caller_seconds
+            configure_logging(mode="sync", level="INFO", log_file=os.path.join(tmp_dir, "between.log"))
+            results[mode][kind] = {
+                "us_per_call": caller_seconds / calls * 1e6,
+                "drain_us_per_call": drain_seconds / calls * 1e6,
+                "lines_written_as_expected": _count_lines(log_file) == expected_lines,
+            }
+            print(f"{mode} {kind}: {json.dumps(results[mode][kind])}", flush=True)
+    return results
+
+
+def per_request(requests: int, tmp_dir: str, disk_delay_ms: float, blocks: int = 10) -> dict:
+    import app as app_module
+
+    if app_module.model_reloader.current is None:
+        raise SystemExit("app.py could not load the model; train it first")
+    client = app_module.app.test_client()
+    rate_limited = app_module.rejected_logger
+    every_time = RateLimitedLogger(app_module.logger_obj, interval_seconds=0.0)
+    scored, rejected = {"bookings": [FORM_BOOKING]}, {"bookings": []}
+    scenarios = {
+        "scored_sync_debug": ("sync", "DEBUG", rate_limited, scored, 0.0),
+        "scored_queue_debug": ("queue", "DEBUG", rate_limited, scored, 0.0),
+        "scored_sync_debug_slow_disk": ("sync", "DEBUG", rate_limited, scored, disk_delay_ms),
+        "scored_queue_debug_slow_disk": ("queue", "DEBUG", rate_limited, scored, disk_delay_ms),
+        "scored_queue_info": ("queue", "INFO", rate_limited, scored, 0.0),
+        "rejected_sync_every_time": ("sync", "INFO", every_time, rejected, 0.0),
+        "rejected_queue_every_time": ("queue", "INFO", every_time, rejected, 0.0),
+        "rejected_queue_rate_limited": ("queue", "INFO", rate_limited, rejected, 0.0),
+    }
+    latencies = {name: [] for name in scenarios}
+    for block in range(blocks):
+        for name, (mode, level, rejected_logger, payload, delay_ms) in scenarios.items():
+            configure_logging(mode=mode, level=level, log_file=os.path.join(tmp_dir, f"{name}.log"))
+            if delay_ms:
+                handler = _file_handler_of(mode)
+                handler.stream = _SlowStream(handler.stream, delay_ms / 1000)
+            app_module.rejected_logger = rejected_logger
+            # keeps DEBUG lines of other loggers (werkzeug, the batcher) out of the measured requests
+            logging.getLogger("werkzeug").setLevel(logging.INFO)
+            for _ in range(requests // blocks):
+                start = time.perf_counter()
+                client.post("/predict/batch", json=payload)
+                latencies[name].append((time.perf_counter() - start) * 1e6)
+            flush_logs()
+    app_module.rejected_logger = rate_limited
+    configure_logging()
+
+    results = {name: {"p50_us": float(np.median(values)), "mean_us": float(np.mean(values))} for name, values in latencies.items()}
+    for name, result in results.items():
+        print(f"{name}: {json.dumps(result)}", flush=True)
+    return results
+
+
+def main(calls: int, requests: int, disk_delay_ms: float) -> dict:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        calls_results = per_call(calls, tmp_dir)
+        requests_results = per_request(requests, tmp_dir, disk_delay_ms)
+    checks = {f"{mode}_{kind}_lines": result["lines_written_as_expected"]
+              for mode, kinds in calls_results.items() for kind, result in kinds.items()}
+    checks["queue_info_cheaper_for_caller"] = calls_results["queue"]["info_deferred"]["us_per_call"] < calls_results["sync"]["info_deferred"]["us_per_call"]
+    checks["queue_hides_slow_disk"] = (requests_results["scored_queue_debug_slow_disk"]["p50_us"]
+                                       < requests_results["scored_sync_debug_slow_disk"]["p50_us"] - disk_delay_ms * 500)
+    checks["disabled_deferred_cheaper_than_fstring"] = calls_results["queue"]["debug_deferred"]["us_per_call"] < calls_results["queue"]["debug_fstring"]["us_per_call"]
+    return {"calls": calls, "requests": requests, "disk_delay_ms": disk_delay_ms, "per_call": calls_results, "per_request": requests_results, "checks": checks}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=20000)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--disk-delay-ms", type=float, default=1.0, help="Stall of every write in the slow disk scenarios")
+    args = parser.parse_args()
+
+    results = main(args.calls, args.requests, args.disk_delay_ms)
+    print(json.dumps(results, indent=2))
+    if not all(results["checks"].values()):
+        raise SystemExit(1)
@@ -0,0 +1,171 @@
+"""Cost of hot-reloading the serving model, in one process and across worker processes.
+
+serving   : app.py's Flask test client posts 32-row batches from several
+            threads, first with no reloads and then while the model is
+            reloaded (forced, so the same artifact is loaded again) every
+            --interval seconds; reports request p50/p99 and the longest
+            gap between two completed requests (a stall shows up there)
+            for both windows, failed requests, and the load, warm-up, swap
+            and lock-held times of the reloads
+memory    : peak RSS during the reload window above the steady state, next
+            to the size of one loaded model
+processes : --workers forked processes reload at the same moment; their
+            load windows must not overlap, so the host holds at most one
+            extra model at a time
+
+Needs the trained model artifacts (app.py loads them at import).
+
+Usage:
+    python -m benchmarks.model_reload [--seconds 5] [--interval 0.5] [--threads 4] [--workers 4]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from src.instrumentation import PeakMemorySampler, current_rss_bytes
+from src.model_reloader import ModelReloader
+
+BOOKING = {
+    "lead_time": 45, "no_of_special_requests": 1, "avg_price_per_room": 110.5, "arrival_month": 7,
+    "arrival_date": 14, "market_segment_type": "Online", "no_of_week_nights": 2, "no_of_weekend_nights": 1,
+    "room_type_reserved": "Room_Type 1", "type_of_meal_plan": "Meal Plan 1",
+}
+
+
+def load_traffic(app_module, seconds: float, threads: int, reload_interval: float = None) -> dict:
+    """Post batches from threads for seconds, reloading every reload_interval when given."""
+    stop = threading.Event()
+    latencies, completions, failures, reloads = [], [], [], []
+
+    def client_loop():
+        client = app_module.app.test_client()
+        while not stop.is_set():
+            start = time.perf_counter()
+            response = client.post("/predict/batch", json={"bookings": [BOOKING] * 32})
+            end = time.perf_counter()
+            latencies.append((end - start) * 1000.0)
+            completions.append(end)
+            if response.status_code != 200:
+                failures.append(response.status_code)
+
+    workers = [threading.Thread(target=client_loop) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        if reload_interval is None:
+            time.sleep(0.05)
+            continue
+        time.sleep(reload_interval)
+        reloads.append(app_module.model_reloader.reload(force=True))
+    stop.set()
+    for worker in workers:
+        worker.join()
+
+    completions.sort()
+    result = {
+        "requests": len(latencies),
+        "failed_requests": len(failures),
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p99_ms": float(np.percentile(latencies, 99)),
+        "max_gap_between_completions_ms": float(np.diff(completions).max() * 1000.0),
+    }
+    if reloads:
+        result["reloads"] = len(reloads)
+        for field in ("load_seconds", "warmup_seconds", "swap_seconds", "locked_seconds", "total_seconds"):
+            values = [reload[field] for reload in reloads]
+            result[f"{field}_p50"] = float(np.median(values))
+            result[f"{field}_max"] = float(max(values))
+    return result
+
+
+def model_size_mb() -> float:
+    """RSS added by loading the served model once, measured in a fresh forked child."""
+    def measure(queue):
+        reloader = ModelReloader(os.environ.get("MODEL_FORMAT", "pickle"), lock_path=os.path.join(tempfile.gettempdir(), "size.lock"))
+        before = current_rss_bytes()
+        reloader.reload()
+        queue.put((current_rss_bytes() - before) / 2**20)
+
+    context = multiprocessing.get_context("fork")
+    queue = context.Queue()
+    process = context.Process(target=measure, args=(queue,))
+    process.start()
+    size = queue.get()
+    process.join()
+    return size
+
+
+def _reload_worker(lock_path: str, barrier, queue) -> None:
+    reloader = ModelReloader(os.environ.get("MODEL_FORMAT", "pickle"), lock_path=lock_path)
+    barrier.wait()
+    start = time.time()
+    result = reloader.reload(force=True)
+    # the load window is the time this worker held the reload lock
+    window_start = start + result["lock_wait_seconds"]
+    queue.put((window_start, window_start + result["locked_seconds"], result["lock_wait_seconds"]))
+
+
+def staggered_reloads(workers: int) -> dict:
+    context = multiprocessing.get_context("fork")
+    barrier, queue = context.Barrier(workers), context.Queue()
+    with tempfile.TemporaryDirectory() as lock_dir:
+        processes = [context.Process(target=_reload_worker, args=(os.path.join(lock_dir, "reload.lock"), barrier, queue))
+                     for _ in range(workers)]
+        for process in processes:
+            process.start()
+        windows = sorted(queue.get() for _ in processes)
+        for process in processes:
+            process.join()
+    overlaps = sum(1 for previous, current in zip(windows, windows[1:]) if current[0] < previous[1])
+    return {
+        "workers": workers,
+        "load_windows_overlapping": overlaps,
+        "lock_wait_seconds": [round(window[2], 4) for window in windows],
+        "staggered": overlaps == 0,
+    }
+
+
+def main(seconds: float, interval: float, threads: int, workers: int) -> dict:
+    import app as app_module
+
+    if app_module.model_reloader.current is None:
+        raise SystemExit("app.py could not load the model; train it first")
+    app_module.model_reloader.stop_watching()
+    # every request should reach the model
+    app_module.prediction_cache.max_entries = 0
+
+    results = {"serving": {}}
+    load_traffic(app_module, 0.5, threads)
+    with PeakMemorySampler() as steady:
+        results["serving"]["steady"] = load_traffic(app_module, seconds, threads)
+    with PeakMemorySampler() as reloading:
+        results["serving"]["reloading"] = load_traffic(app_module, seconds, threads, reload_interval=interval)
+    results["memory"] = {
+        "model_size_mb": model_size_mb(),
+        "steady_peak_rss_mb": steady.peak_rss_bytes / 2**20,
+        "reloading_peak_rss_mb": reloading.peak_rss_bytes / 2**20,
+        "reload_extra_rss_mb": (reloading.peak_rss_bytes - steady.peak_rss_bytes) / 2**20,
+    }
+    results["processes"] = staggered_reloads(workers)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--interval", type=float, default=0.5, help="Seconds between reloads in the reloading window")
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    results = main(args.seconds, args.interval, args.threads, args.workers)
+    print(json.dumps(results, indent=2))
+    if results["serving"]["reloading"]["failed_requests"] or not results["processes"]["staggered"]:
+        raise SystemExit("Requests failed during reloads or worker reloads overlapped")
@@ -0,0 +1,73 @@
+"""Cold-start time and per-worker memory for the pickle and native model formats.
+
+Each format is loaded by several fresh worker processes at once, the way
+autoscaled instances start. Every worker reports the time from interpreter
+start to its first prediction plus its RSS and PSS; PSS divides shared pages
+between the processes mapping them, so memory-mapped model pages show up
+as a lower PSS than RSS.
+
+Usage:
+    python -m benchmarks.model_startup [--workers 4]
+"""
+import argparse
+import json
+import subprocess
+import sys
+
+import numpy as np
+
+WORKER_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import numpy as np
+from src.model_artifacts import load_model
+from src.inference import FEATURE_COLUMNS
+model = load_model(sys.argv[1])
+model.predict(np.zeros((1, len(FEATURE_COLUMNS)), dtype=np.float32))
+elapsed_ms = (time.perf_counter() - start) * 1000.0
+
+def read_kb(path, key):
+    with open(path) as f:
+        for line in f:
+            if line.startswith(key):
+                return int(line.split()[1])
+    return None
+
+print(json.dumps({
+    "cold_start_ms": elapsed_ms,
+    "rss_kb": read_kb("/proc/self/status", "VmRSS:"),
+    "pss_kb": read_kb("/proc/self/smaps_rollup", "Pss:"),
+    "modules_loaded": len(sys.modules),
+}))
+sys.stdout.flush()
+sys.stdin.read()
+"""
+
+
+def run_workers(model_format: str, workers: int) -> dict:
+    """Start `workers` processes together and collect their reports while all are alive."""
+    processes = [
+        subprocess.Popen([sys.executable, "-W", "ignore", "-c", WORKER_SCRIPT, model_format],
+                         stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+        for _ in range(workers)
+    ]
+    # read every report before releasing any worker so PSS reflects shared mappings
+    reports = [json.loads(process.stdout.readline()) for process in processes]
+    for process in processes:
+        process.communicate("")
+
+    summary = {"workers": workers}
+    for key in ("cold_start_ms", "rss_kb", "pss_kb", "modules_loaded"):
+        values = [report[key] for report in reports if report[key] is not None]
+        if values:
+            summary[f"median_{key}"] = float(np.median(values))
+    return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--formats", nargs="+", default=["pickle", "native"])
+    args = parser.parse_args()
+
+    print(json.dumps({fmt: run_workers(fmt, args.workers) for fmt in args.formats}, indent=2))
@@ -0,0 +1,170 @@
+"""Peak RSS of in-memory vs sharded (out-of-core) processing and training as the input grows.
+
+The raw training and test splits are tiled to each scale, shifting
+avg_price_per_room a little per copy so the copies survive de-duplication.
+Every (mode, scale, stage) runs in a fresh interpreter and reports its
+ru_maxrss, so no run inherits another's heap; the import-only RSS of a
+worker is reported as the baseline and subtracted. Processing uses
+random_oversample balancing and uncached lgbm_gain selection, and training
+searches one fixed candidate, so the numbers track data handling rather
+than search cost.
+
+Sharded processing reads one chunk of --shard-rows rows at a time and
+should stay flat: it fails the check if its peak at the largest scale
+exceeds the smallest by more than --tolerance. Sharded training cannot be
+flat, since LightGBM keeps per-row state (labels, binned features,
+gradients and scores) next to a bin-construction sample of at most 200k
+rows; it is checked on the memory added per extra training row between
+the two largest scales, which must stay under --max-bytes-per-row.
+
+Usage:
+    python -m benchmarks.out_of_core_memory [--scales 1 4 16] [--shard-rows 20000] [--tolerance 1.5] [--max-bytes-per-row 128]
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+import yaml
+
+from config.path_config import CONFIG_PATH, TRAIN_DATA_PATH, TEST_DATA_PATH
+from utils.common_functions import read_yml_file
+
+MODES = ("in_memory", "sharded")
+STAGES = ("imports", "processing", "training")
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def tile_split(source: Path, target: Path, scale: int) -> int:
+    """Write scale shifted copies of source to target, one copy in memory at a time."""
+    df = pd.read_csv(source)
+    for copy in range(scale):
+        shifted = df.assign(avg_price_per_room=df["avg_price_per_room"] + copy * 1e-3)
+        shifted.to_csv(target, mode="w" if copy == 0 else "a", header=copy == 0, index=False)
+    return len(df) * scale
+
+
+def write_config(work_dir: Path, mode: str, shard_rows: int) -> Path:
+    config = read_yml_file(CONFIG_PATH)
+    config["data_processing"].update({
+        "storage_mode": mode,
+        "shard_rows": shard_rows,
+        "balancing": {**config["data_processing"].get("balancing", {}), "strategy": "random_oversample"},
+        "feature_selection": {**config["data_processing"].get("feature_selection", {}), "method": "lgbm_gain", "cache": False},
+    })
+    path = work_dir / f"config_{mode}.yml"
+    with open(path, "w") as f:
+        yaml.safe_dump(config, f)
+    return path
+
+
+def worker(stage: str, mode: str, work_dir: Path, shard_rows: int) -> dict:
+    from src.data_preprocessing import DataProcessor
+    from src.model_training import ModelTrainer
+    # the stages import these when they run; load them here so the baseline still covers them
+    import lightgbm
+    import sklearn.model_selection
+
+    result = {"imports_rss_mb": peak_rss_mb()}
+    if stage == "processing":
+        processor = DataProcessor(work_dir / f"config_{mode}.yml", work_dir / "train.csv", work_dir / "test.csv", work_dir / mode)
+        if mode == "sharded":
+            processor.process_sharded(work_dir / mode / "train", work_dir / mode / "test", work_dir / mode / "transformer.json")
+        else:
+            # the in-memory stages of process(), writing to the work directory
+            train_processed = processor.load_and_process(processor.train_path)
+            test_processed = processor.load_and_process(processor.test_path, train_processed[1])
+            train_data = processor.select_features(processor.balance_processed(train_processed))
+            processor.save_processed_data(train_data, work_dir / mode / "train.csv")
+            processor.save_processed_data(test_processed[0][train_data.columns], work_dir / mode / "test.csv")
+    elif stage == "training":
+        suffix = "" if mode == "sharded" else ".csv"
+        trainer = ModelTrainer(work_dir / mode / f"train{suffix}", work_dir / mode / f"test{suffix}", work_dir / mode / "model.pkl")
+        trainer.parms_distribution = {"n_estimators": [200], "num_leaves": [31], "learning_rate": [0.1]}
+        trainer.random_search_parms = {**trainer.random_search_parms, "n_iter": 1, "cv": 2}
+        trainer.search_mode = "random"
+        # the search sample is capped at one shard so every scale searches on the same amount of data
+        trainer.out_of_core_parms = {**trainer.out_of_core_parms, "search_sample_rows": shard_rows}
+        if trainer.out_of_core:
+            model = trainer.train_model_out_of_core()
+            metrics = trainer.evaluate_model_out_of_core(model)[0]
+        else:
+            X_train, y_train, X_test, y_test = trainer.load_and_split_data()
+            model = trainer.train_model(X_train, y_train)
+            metrics = trainer.evaluate_model(model, X_test, y_test)
+        result["accuracy"] = float(metrics["accuracy"].iloc[0])
+    result["peak_rss_mb"] = peak_rss_mb()
+    return result
+
+
+def run_worker(stage: str, mode: str, work_dir: Path, shard_rows: int) -> dict:
+    output = subprocess.run([sys.executable, "-m", "benchmarks.out_of_core_memory", "--worker", stage, mode, str(work_dir), str(shard_rows)],
+                            check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(scales: list, shard_rows: int, tolerance: float, max_bytes_per_row: float) -> dict:
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for scale in scales:
+            work_dir = Path(tmp_dir) / f"{scale}x"
+            work_dir.mkdir()
+            rows = tile_split(TRAIN_DATA_PATH, work_dir / "train.csv", scale)
+            tile_split(TEST_DATA_PATH, work_dir / "test.csv", scale)
+            scale_results = results[f"{scale}x"] = {"train_rows": rows}
+            for mode in MODES:
+                write_config(work_dir, mode, shard_rows)
+                scale_results[mode] = {}
+                for stage in STAGES[1:]:
+                    run = run_worker(stage, mode, work_dir, shard_rows)
+                    scale_results[mode][stage] = {
+                        "peak_rss_mb": run["peak_rss_mb"],
+                        "above_imports_mb": run["peak_rss_mb"] - run["imports_rss_mb"],
+                        **({"accuracy": run["accuracy"]} if "accuracy" in run else {}),
+                    }
+                print(f"{scale}x {mode}: {scale_results[mode]}", flush=True)
+
+    smallest, previous, largest = (results[f"{scale}x"] for scale in (scales[0], scales[-2], scales[-1]))
+    growth = {
+        mode: {stage: largest[mode][stage]["above_imports_mb"] / max(smallest[mode][stage]["above_imports_mb"], 1.0)
+               for stage in STAGES[1:]}
+        for mode in MODES
+    }
+    added_rows = largest["train_rows"] - previous["train_rows"]
+    bytes_per_row = {mode: (largest[mode]["training"]["peak_rss_mb"] - previous[mode]["training"]["peak_rss_mb"]) * 2**20 / added_rows
+                     for mode in MODES}
+    results["growth_largest_vs_smallest"] = growth
+    results["training_bytes_per_added_row"] = bytes_per_row
+    results["checks"] = {
+        "sharded_processing_flat": bool(growth["sharded"]["processing"] <= tolerance),
+        "sharded_training_bytes_per_row": bool(bytes_per_row["sharded"] <= max_bytes_per_row),
+    }
+    return results
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--worker":
+        print(json.dumps(worker(sys.argv[2], sys.argv[3], Path(sys.argv[4]), int(sys.argv[5]))))
+        sys.exit(0)
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", nargs="+", type=int, default=[1, 4, 16])
+    parser.add_argument("--shard-rows", type=int, default=20000)
+    parser.add_argument("--tolerance", type=float, default=1.5, help="Allowed largest/smallest ratio of sharded processing RSS above imports")
+    parser.add_argument("--max-bytes-per-row", type=float, default=128, help="Allowed sharded training RSS per added training row")
+    args = parser.parse_args()
+    if len(args.scales) < 2:
+        parser.error("--scales needs at least two scales")
+
+    results = main(sorted(args.scales), args.shard_rows, args.tolerance, args.max_bytes_per_row)
+    print(json.dumps(results, indent=2))
+    if not all(results["checks"].values()):
+        sys.exit(1)
@@ -0,0 +1,133 @@
+"""Cost of recording /metrics data on the prediction hot path, and a multi-process count check.
+
+recording  : one request's worth of metric updates (start, parse/predict/render
+             marks, batch size, finish) in a tight loop, in microseconds
+served     : p50 latency of form and /predict/batch requests through app.py's
+             Flask test client with metrics on and off, interleaved in blocks
+             so drift affects both equally; the recording cost is also
+             reported as a fraction of the served p50
+processes  : several forked workers record requests into one metrics
+             directory, some exit, and a fresh process archives them; the
+             collected request count must equal the total recorded
+
+Needs the trained model artifacts (app.py loads them at import).
+
+Usage:
+    python -m benchmarks.serving_metrics [--requests 2000] [--workers 4]
+"""
+import argparse
+import json
+import multiprocessing
+import re
+import tempfile
+import time
+
+import numpy as np
+
+from src.serving_metrics import ServingMetrics
+
+FORM_BOOKING = {
+    "lead_time": 45, "no_of_special_requests": 1, "avg_price_per_room": 110.5, "arrival_month": 7,
+    "arrival_date": 14, "market_segment_type": "Online", "no_of_week_nights": 2, "no_of_weekend_nights": 1,
+    "room_type_reserved": "Room_Type 1", "type_of_meal_plan": "Meal Plan 1",
+}
+
+
+def record_one(metrics: ServingMetrics, endpoint: str = "predict_batch") -> None:
+    timer = metrics.start(endpoint)
+    timer.observe_batch_size(32)
+    timer.mark("parse")
+    timer.mark("predict")
+    timer.mark("render")
+    timer.finish(200)
+
+
+def recording_cost_us(directory: str, requests: int, repeats: int = 5) -> float:
+    metrics = ServingMetrics(directory)
+    record_one(metrics)
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(requests):
+            record_one(metrics)
+        timings.append((time.perf_counter() - start) / requests * 1e6)
+    return float(np.median(timings))
+
+
+def served_latency(directory: str, requests: int, blocks: int = 10) -> dict:
+    import app as app_module
+
+    if app_module.model_reloader.current is None:
+        raise SystemExit("app.py could not load the model; train it first")
+    client = app_module.app.test_client()
+    enabled, disabled = ServingMetrics(directory), ServingMetrics(directory, enabled=False)
+    calls = {
+        "form": lambda: client.post("/", data={col: str(value) for col, value in FORM_BOOKING.items()}),
+        "predict_batch_32": lambda: client.post("/predict/batch", json={"bookings": [FORM_BOOKING] * 32}),
+    }
+    results = {}
+    for name, call in calls.items():
+        latencies = {"on": [], "off": []}
+        for block in range(blocks * 2):
+            mode = "on" if block % 2 == 0 else "off"
+            app_module.serving_metrics = enabled if mode == "on" else disabled
+            for _ in range(requests // blocks):
+                start = time.perf_counter()
+                call()
+                latencies[mode].append((time.perf_counter() - start) * 1e6)
+        app_module.serving_metrics = enabled
+        results[name] = {
+            "p50_us_metrics_on": float(np.median(latencies["on"])),
+            "p50_us_metrics_off": float(np.median(latencies["off"])),
+        }
+        results[name]["p50_difference_us"] = results[name]["p50_us_metrics_on"] - results[name]["p50_us_metrics_off"]
+    return results
+
+
+def _worker(directory: str, requests: int) -> None:
+    metrics = ServingMetrics(directory)
+    for _ in range(requests):
+        record_one(metrics, "index")
+
+
+def count_across_processes(directory: str, workers: int, requests: int) -> dict:
+    context = multiprocessing.get_context("fork")
+    processes = [context.Process(target=_worker, args=(directory, requests)) for _ in range(workers)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    # a replacement worker archives the files of the ones that exited
+    replacement = context.Process(target=_worker, args=(directory, requests))
+    replacement.start()
+    replacement.join()
+
+    exposition = ServingMetrics(directory).collect()
+    counted = float(re.search(r'prediction_requests_total\{endpoint="index",status="2xx"\} (\S+)', exposition).group(1))
+    in_flight = float(re.search(r"^prediction_in_flight_requests (\S+)$", exposition, re.M).group(1))
+    expected = (workers + 1) * requests
+    return {"expected_requests": expected, "collected_requests": counted, "in_flight": in_flight,
+            "consistent": counted == expected and in_flight == 0}
+
+
+def main(requests: int, workers: int) -> dict:
+    with tempfile.TemporaryDirectory() as recording_dir, tempfile.TemporaryDirectory() as served_dir, \
+            tempfile.TemporaryDirectory() as process_dir:
+        results = {"recording_us_per_request": recording_cost_us(recording_dir, requests * 10)}
+        results["served"] = served_latency(served_dir, requests)
+        for name, served in results["served"].items():
+            served["recording_share_of_p50"] = results["recording_us_per_request"] / served["p50_us_metrics_off"]
+        results["processes"] = count_across_processes(process_dir, workers, requests)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    results = main(args.requests, args.workers)
+    print(json.dumps(results, indent=2))
+    if not results["processes"]["consistent"]:
+        raise SystemExit("Metrics collected across processes do not add up")
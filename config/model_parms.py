@@ -13,6 +13,60 @@ RANDOM_SEAECH_PARAMS = {
     'cv' : 5,
     'verbose' : 2,
     'random_state' : 42,
-    'n_jobs' : -1,
-    'scoring' : 'accuracy'
-}
\ No newline at end of file
+    'scoring' : 'accuracy',
+    # bin each CV fold once and reuse it for every candidate instead of RandomizedSearchCV
+    'prebinned' : True,
+}
+
+# How cores are split between CV folds trained concurrently and LightGBM's own threads.
+# None derives the value from the core count so that cv_jobs * lgbm_threads <= cores.
+THREAD_PARAMS = {
+    'cv_jobs' : None,
+    'lgbm_threads' : None,
+}
+
+# 'random' : randomized search (see 'prebinned' above), every candidate trains all n_estimators on every fold
+# 'halving': successive halving over boosting rounds with early stopping
+SEARCH_MODE = 'random'
+
+HALVING_SEARCH_PARAMS = {
+    'n_candidates' : 9,
+    'min_boost_rounds' : 50,
+    'max_boost_rounds' : 1000,
+    'eta' : 3,
+    'early_stopping_rounds' : 30,
+    'cv' : 5,
+    'random_state' : 42,
+}
+
+# Out-of-core training (data_processing.storage_mode: sharded): the search runs on a
+# sample of at most search_sample_rows rows, then the final model streams every shard
+OUT_OF_CORE_PARAMS = {
+    'search_sample_rows' : 200000,
+    'batch_size' : 65536,
+}
+
+# Incremental retraining: warm-start from the saved model on the real (pre-balancing)
+# training rows it has not seen, balanced on their own. 'continue' boosts extra_rounds
+# more trees on them at learning_rate_scale times the model's learning rate; 'refit'
+# re-estimates the existing leaves from them, keeping refit_decay_rate of the old values. The
+# full retrain with the search runs instead when there is no compatible previous model,
+# when the new rows' largest feature PSI exceeds max_feature_psi, when the previous
+# model's accuracy on them falls more than max_accuracy_drop below its accuracy on the
+# test rows it was not trained on, when they exceed max_new_row_fraction of the training
+# set, when the model would exceed max_total_trees, or when the warm-started model's test
+# accuracy ends up more than max_accuracy_drop below the previous one's.
+# compare_with_full_retrain also fits the same hyperparameters from scratch on all rows
+# and logs the wall time and metrics of both to MLflow.
+INCREMENTAL_PARAMS = {
+    'enabled' : False,
+    'strategy' : 'continue',
+    'extra_rounds' : 20,
+    'learning_rate_scale' : 0.1,
+    'refit_decay_rate' : 0.9,
+    'max_feature_psi' : 0.2,
+    'max_accuracy_drop' : 0.02,
+    'max_new_row_fraction' : 0.5,
+    'max_total_trees' : 2000,
+    'compare_with_full_retrain' : True,
+}
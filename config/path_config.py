@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 """
@@ -11,22 +12,48 @@ from pathlib import Path
 BASE_DIR = Path(__file__).resolve().parent.parent
 MODEL_DIR = BASE_DIR / "models"
 
+# storage format of the split and processed datasets: "csv" or "parquet"
+# (the raw download stays CSV, which is what the bucket holds)
+DATA_FORMAT = os.environ.get("DATA_FORMAT", "csv")
+
 RAW_DIR = BASE_DIR / Path("artifacts/raw")
 RAW_DATA_PATH = RAW_DIR / Path("raw_data.csv")
-TRAIN_DATA_PATH = RAW_DIR / Path("train_data.csv")
-TEST_DATA_PATH = RAW_DIR / Path("test_data.csv")
+TRAIN_DATA_PATH = RAW_DIR / Path(f"train_data.{DATA_FORMAT}")
+TEST_DATA_PATH = RAW_DIR / Path(f"test_data.{DATA_FORMAT}")
+# generation/ETag of every downloaded object, so unchanged objects are not fetched again
+DOWNLOAD_MANIFEST_PATH = RAW_DIR / Path("download_manifest.json")
 CONFIG_PATH = BASE_DIR / Path("config/config.yml")
+STAGE_CACHE_PATH = BASE_DIR / Path("artifacts/stage_cache.json")
+PIPELINE_REPORT_PATH = BASE_DIR / Path("artifacts/pipeline_report.json")
+# JSON results of benchmarks/end_to_end.py, one file per run
+BENCHMARK_RESULTS_DIR = BASE_DIR / Path("artifacts/benchmarks")
+# cProfile dumps of the calls selected with $PROFILE_STAGES (see src/instrumentation.py)
+PROFILE_DIR = BASE_DIR / Path("artifacts/profiles")
 
 """
 ######################################## DATA PROCESSING PATHS ########################################
 
 """
 DATA_PROCESSING_DIR = BASE_DIR / Path("artifacts/data_processing")
-PROCESSED_TRAIN_DATA_PATH = DATA_PROCESSING_DIR / Path("processed_train_data.csv")
-PROCESSED_TEST_DATA_PATH = DATA_PROCESSING_DIR / Path("processed_test_data.csv")  
+PROCESSED_TRAIN_DATA_PATH = DATA_PROCESSING_DIR / Path(f"processed_train_data.{DATA_FORMAT}")
+PROCESSED_TEST_DATA_PATH = DATA_PROCESSING_DIR / Path(f"processed_test_data.{DATA_FORMAT}")  
+FEATURE_TRANSFORMER_PATH = DATA_PROCESSING_DIR / Path("feature_transformer.json")
+FEATURE_RANKING_PATH = DATA_PROCESSING_DIR / Path("feature_ranking.json")
+# how many leading rows of the processed training split are real (balancing appends the rest)
+BALANCING_REPORT_PATH = DATA_PROCESSING_DIR / Path("balancing.json")
+# shard directories written and read when data_processing.storage_mode is "sharded"
+PROCESSED_TRAIN_SHARD_DIR = DATA_PROCESSING_DIR / Path("train_shards")
+PROCESSED_TEST_SHARD_DIR = DATA_PROCESSING_DIR / Path("test_shards")
 
 """
 ######################################## MODEL TRAINING PATHS ########################################
 
 """
-MODEL_OUTPUT_PATH = BASE_DIR / Path("artifacts/models/lgbm_model.pkl")
\ No newline at end of file
+MODEL_OUTPUT_PATH = BASE_DIR / Path("artifacts/models/lgbm_model.pkl")
+COMPILED_MODEL_DIR = BASE_DIR / Path("artifacts/models/lgbm_compiled")
+NATIVE_MODEL_PATH = BASE_DIR / Path("artifacts/models/lgbm_model.txt")
+MODEL_METADATA_PATH = BASE_DIR / Path("artifacts/models/lgbm_model.meta.json")
+MODEL_TRANSFORMER_PATH = BASE_DIR / Path("artifacts/models/feature_transformer.json")
+# what the last training run recorded about the saved model, read by incremental retraining
+TRAINING_STATE_PATH = BASE_DIR / Path("artifacts/models/lgbm_model.training.json")
+TRAINED_ROWS_PATH = BASE_DIR / Path("artifacts/models/lgbm_model.rows.npy")
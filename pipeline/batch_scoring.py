@@ -0,0 +1,41 @@
+import argparse
+import json
+import os
+from src.batch_scoring import BatchScorer
+from src.model_artifacts import MODEL_FORMATS
+from utils.common_functions import read_yml_file
+from config.path_config import *
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Score a raw booking CSV/Parquet file with the saved model, chunk by chunk, across a process pool.")
+    parser.add_argument("input", help="raw booking file with the training schema (CSV or Parquet)")
+    parser.add_argument("output", help="predictions file; .parquet writes Parquet, anything else CSV")
+    parser.add_argument("--model-format", choices=MODEL_FORMATS, default=os.environ.get("MODEL_FORMAT", "pickle"))
+    parser.add_argument("--chunk-rows", type=int, help="rows per scoring task (defaults to batch_scoring.chunk_rows)")
+    parser.add_argument("--workers", type=int, help="scoring processes (defaults to batch_scoring.max_workers, else one per core)")
+    parser.add_argument("--report", help="also write the throughput report to this JSON file")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    config = read_yml_file(Path(CONFIG_PATH))
+    scoring_config = config.get("batch_scoring", {})
+    
+    scorer = BatchScorer(
+        input_path=args.input,
+        output_path=args.output,
+        model_format=args.model_format,
+        chunk_rows=args.chunk_rows or scoring_config.get("chunk_rows", 100000),
+        max_workers=args.workers or scoring_config.get("max_workers"),
+        id_column=scoring_config.get("id_column", "Booking_ID"),
+        # parse raw columns with the same dtypes as training
+        dtype=config.get("data_schema")
+    )
+    report = scorer.run()
+    print(json.dumps(report, indent=2))
+    
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(report, f, indent=2)
@@ -1,15 +1,59 @@
+import argparse
+import json
+import os
 from src.data_ingestion import DataIngestion
 from src.data_preprocessing import DataProcessor
 from src.model_training import ModelTrainer
+from src.stage_cache import StageCache, stage_fingerprint, module_sources
+from src.dag_runner import DagRunner
+from src.instrumentation import PROFILE_STAGES_ENV
 from utils.common_functions import read_yml_file
 from config.path_config import *
 
+# pipeline stages in execution order
+STAGES = ["ingestion", "processing", "training"]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run the training pipeline, skipping stages whose inputs are unchanged.")
+    parser.add_argument("--force", action="store_true", help="re-run every stage")
+    parser.add_argument("--from-stage", choices=STAGES, help="re-run this stage and every stage after it")
+    parser.add_argument("--profile", nargs="+", metavar="CALL",
+                        help="dump cProfile stats of these instrumented calls (e.g. ModelTrainer.train_model, or 'all') to artifacts/profiles")
+    return parser.parse_args()
+
 
 if __name__ == "__main__":
-    # Step 1: Data Ingestion
+    args = parse_args()
+    if args.profile:
+        # read by src/instrumentation.py, and inherited by the processing pool workers
+        os.environ[PROFILE_STAGES_ENV] = ",".join(args.profile)
+    forced = set(STAGES) if args.force else set(STAGES[STAGES.index(args.from_stage):]) if args.from_stage else set()
+    
     config = read_yml_file(Path(CONFIG_PATH))
+    stage_cache = StageCache(STAGE_CACHE_PATH)
+    
+    # Step 1: Data Ingestion
     data_ingestion = DataIngestion(config=config)
-    data_ingestion.run()
+    run_ingestion = lambda: stage_cache.run_stage(
+        stage="ingestion",
+        fingerprint_fn=lambda: stage_fingerprint(
+            data={"source": data_ingestion.get_source_version()},
+            config={"data_ingestion": config["data_ingestion"], "data_schema": config.get("data_schema"), "data_format": DATA_FORMAT},
+            # every repo module the stage imports, so a helper it starts using cannot be missed
+            code=module_sources(["src.data_ingestion"], BASE_DIR)
+        ),
+        outputs=[TRAIN_DATA_PATH, TEST_DATA_PATH],
+        run_fn=data_ingestion.run,
+        force="ingestion" in forced
+    )
+    
+    # sharded mode streams processed splits through shard directories instead of single files
+    sharded = config["data_processing"].get("storage_mode", "in_memory") == "sharded"
+    processed_train_path = PROCESSED_TRAIN_SHARD_DIR if sharded else PROCESSED_TRAIN_DATA_PATH
+    processed_test_path = PROCESSED_TEST_SHARD_DIR if sharded else PROCESSED_TEST_DATA_PATH
+    # in-memory processing records which processed training rows balancing added
+    balancing_outputs = {} if sharded else {"balancing_report": BALANCING_REPORT_PATH}
     
     # Step 2: Data Preprocessing
     data_processor = DataProcessor(
@@ -18,12 +62,46 @@ if __name__ == "__main__":
         test_path=TEST_DATA_PATH,
         processed_dir=DATA_PROCESSING_DIR
     )
-    data_processor.process()
+    run_processing = lambda ingestion: stage_cache.run_stage(
+        stage="processing",
+        fingerprint_fn=lambda: stage_fingerprint(
+            data={"train": TRAIN_DATA_PATH, "test": TEST_DATA_PATH},
+            config={"data_processing": config["data_processing"], "data_schema": config.get("data_schema"), "data_format": DATA_FORMAT},
+            code=module_sources(["src.data_preprocessing"], BASE_DIR)
+        ),
+        outputs=[processed_train_path, processed_test_path, FEATURE_TRANSFORMER_PATH, *balancing_outputs.values()],
+        run_fn=data_processor.process,
+        force="processing" in forced
+    )
     
     # Step 3: Model Training
     trainer = ModelTrainer(
-        train_data_path=PROCESSED_TRAIN_DATA_PATH,
-        test_data_path=PROCESSED_TEST_DATA_PATH,
+        train_data_path=processed_train_path,
+        test_data_path=processed_test_path,
         model_output_path=MODEL_OUTPUT_PATH
     )
-    trainer.run()
+    run_training = lambda processing: stage_cache.run_stage(
+        stage="training",
+        fingerprint_fn=lambda: stage_fingerprint(
+            data={"train": processed_train_path, "test": processed_test_path, "feature_transformer": FEATURE_TRANSFORMER_PATH,
+                  **balancing_outputs},
+            # the balancing strategy decides whether training reweights classes
+            config={"balancing": config["data_processing"].get("balancing")},
+            code=module_sources(["src.model_training"], BASE_DIR)
+        ),
+        outputs=[MODEL_OUTPUT_PATH, NATIVE_MODEL_PATH, MODEL_METADATA_PATH, MODEL_TRANSFORMER_PATH, COMPILED_MODEL_DIR],
+        run_fn=trainer.run,
+        force="training" in forced
+    )
+    
+    # stages depend on each other's files; the processing stage runs its own
+    # train/test branches in parallel
+    dag = DagRunner("training_pipeline")
+    dag.add("ingestion", run_ingestion, in_pool=False)
+    dag.add("processing", run_processing, deps=("ingestion",), in_pool=False)
+    dag.add("training", run_training, deps=("processing",), in_pool=False)
+    dag.run()
+    
+    with open(PIPELINE_REPORT_PATH, "w") as f:
+        json.dump({"stages": dag.report(), "ingestion": data_ingestion.download_report,
+                   "data_processing": data_processor.dag_report}, f, indent=2)
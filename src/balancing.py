@@ -0,0 +1,95 @@
+import numpy as np
+
+from src.logger import get_logger
+from src.custom_exception import CustomException
+
+logger_obj = get_logger(__name__)
+
+# smote             : imblearn SMOTE, exact k-NN over each whole class
+# block_smote       : SMOTE interpolation with neighbors searched inside class-local blocks
+# random_oversample : duplicate randomly drawn rows of the smaller classes
+# class_weight      : add no rows; the trainer reweights classes (LightGBM is_unbalance)
+BALANCING_STRATEGIES = ("smote", "block_smote", "random_oversample", "class_weight")
+
+
+class Balancer:
+    """Oversample every class up to the size of the largest one.
+
+    Works on a float32 feature matrix and returns only the rows to append,
+    so the caller keeps its original rows (and their dtypes) untouched,
+    the same layout imblearn produces: originals first, new rows after.
+
+    block_smote orders each class along its first principal component and
+    cuts it into blocks of block_size rows; neighbors are searched only
+    inside a row's block. The search costs O(n * block_size) instead of
+    growing with the square of the class size, at the price of approximate
+    neighbors near block edges.
+    """
+
+    def __init__(self, strategy: str = "smote", k_neighbors: int = 5, block_size: int = 4096, random_state: int = 42):
+        if strategy not in BALANCING_STRATEGIES:
+            raise CustomException(f"Unknown balancing strategy '{strategy}', expected one of {BALANCING_STRATEGIES}")
+        self.strategy = strategy
+        self.k_neighbors = k_neighbors
+        self.block_size = block_size
+        self.random_state = random_state
+
+    def extra_rows(self, X: np.ndarray, y: np.ndarray):
+        """Return (X_new, y_new), the rows that balance the classes of (X, y)."""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        y = np.asarray(y)
+        if self.strategy == "class_weight":
+            return X[:0], y[:0]
+        if self.strategy == "smote":
+            return self.__smote(X, y)
+
+        rng = np.random.default_rng(self.random_state)
+        labels, counts = np.unique(y, return_counts=True)
+        new_X, new_y = [], []
+        for label, count in zip(labels, counts):
+            n_samples = counts.max() - count
+            if n_samples == 0:
+                continue
+            X_class = X[y == label]
+            if self.strategy == "random_oversample":
+                new_X.append(X_class[rng.integers(0, count, n_samples)])
+            else:
+                new_X.append(self.__block_smote(X_class, n_samples, rng))
+            new_y.append(np.full(n_samples, label, dtype=y.dtype))
+
+        if not new_X:
+            return X[:0], y[:0]
+        return np.concatenate(new_X), np.concatenate(new_y)
+
+    def __smote(self, X, y):
+        from imblearn.over_sampling import SMOTE
+
+        X_resampled, y_resampled = SMOTE(k_neighbors=self.k_neighbors, random_state=self.random_state).fit_resample(X, y)
+        return X_resampled[len(X):], np.asarray(y_resampled)[len(X):]
+
+    def __block_smote(self, X_class: np.ndarray, n_samples: int, rng) -> np.ndarray:
+        from sklearn.neighbors import NearestNeighbors
+
+        n = len(X_class)
+        if n < 2:
+            return X_class[np.zeros(n_samples, dtype=np.intp)]
+
+        # order rows along the class's first principal component so blocks hold nearby rows
+        sample = X_class[rng.choice(n, min(n, 10000), replace=False)]
+        _, _, vt = np.linalg.svd(sample - sample.mean(axis=0), full_matrices=False)
+        order = np.argsort(X_class @ vt[0], kind="stable")
+
+        k = min(self.k_neighbors, n - 1)
+        # every block needs at least k + 1 rows to give each row k neighbors
+        n_blocks = max(1, min(round(n / self.block_size), n // (k + 1)))
+        neighbors = np.empty((n, k), dtype=np.intp)
+        for block in np.array_split(order, n_blocks):
+            _, idx = NearestNeighbors(n_neighbors=k + 1).fit(X_class[block]).kneighbors(X_class[block])
+            # column 0 is the row itself
+            neighbors[block] = block[idx[:, 1:]]
+
+        # interpolate between a random row and one of its k neighbors, as SMOTE does
+        base = rng.integers(0, n, n_samples)
+        neighbor = neighbors[base, rng.integers(0, k, n_samples)]
+        gap = rng.random((n_samples, 1), dtype=np.float32)
+        return X_class[base] + gap * (X_class[neighbor] - X_class[base])
@@ -0,0 +1,228 @@
+import io
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.logger import get_logger
+from src.custom_exception import CustomException
+from src.instrumentation import instrument, record_rows
+from src.model_artifacts import load_model, get_model_version, load_feature_transformer
+from utils.common_functions import get_data_format, ChunkedDataWriter
+
+logger_obj = get_logger(__name__)
+
+# label column the model predicts; its transformer categories decode the predictions
+TARGET_COLUMN = "booking_status"
+
+# model, transformer and settings of the current (worker) process, set by _init_worker
+_worker = {}
+
+
+def _init_worker(model_format: str, id_column: str, dtype: dict, output_format: str) -> None:
+    init_args = (model_format, id_column, dtype, output_format)
+    # forked workers inherit the state the parent loaded; spawned ones load their own
+    if _worker.get("init_args") == init_args:
+        return
+    transformer = load_feature_transformer()
+    if transformer is None or not transformer.feature_names:
+        raise CustomException("Batch scoring needs the feature transformer saved with the model")
+    _worker.update(model=load_model(model_format), transformer=transformer, id_column=id_column, dtype=dtype,
+                   output_format=output_format, init_args=init_args)
+
+
+def _read_task(task: tuple, columns: list) -> pd.DataFrame:
+    """Read the rows of one task: a CSV byte range or a list of Parquet row groups."""
+    if task[0] == "csv":
+        _, path, header, start, end = task
+        with open(path, "rb") as f:
+            f.seek(start)
+            data = f.read(end - start)
+        dtype = {col: col_type for col, col_type in (_worker["dtype"] or {}).items() if col in columns}
+        return pd.read_csv(io.BytesIO(data), header=None, names=header, usecols=columns, dtype=dtype)[columns]
+
+    import pyarrow.parquet as pq
+
+    _, path, row_groups = task
+    return pq.ParquetFile(path).read_row_groups(row_groups, columns=columns).to_pandas()
+
+
+def _score_task(task: tuple) -> tuple:
+    """Read, transform and score one task's rows.
+
+    Returns:
+        tuple: (rows, output) where output holds the id column (if any) and the
+        predictions, as CSV bytes with a header line for CSV output (so the
+        workers, not the writing process, pay for formatting) or as a DataFrame.
+    """
+    model, transformer, id_column = _worker["model"], _worker["transformer"], _worker["id_column"]
+    columns = transformer.feature_names + ([id_column] if id_column else [])
+    df = _read_task(task, columns)
+
+    # the same encoding and log1p as DataProcessor.process_data, without dropping duplicate rows
+    features = transformer.transform(df[transformer.feature_names]).to_numpy(dtype=np.float32)
+    # one thread per worker process: the pool provides the parallelism
+    probabilities = model.predict_proba(features, num_threads=1)
+
+    labels = model.classes_
+    if TARGET_COLUMN in transformer.categories_:
+        labels = transformer.categories_[TARGET_COLUMN][model.classes_]
+    scored = pd.DataFrame({id_column: df[id_column].to_numpy()}) if id_column else pd.DataFrame(index=range(len(df)))
+    scored["prediction"] = labels[probabilities.argmax(axis=1)]
+    for i, label in enumerate(labels):
+        scored[f"probability_{label}"] = probabilities[:, i]
+    if _worker["output_format"] == "csv":
+        return len(scored), scored.to_csv(index=False).encode()
+    return len(scored), scored
+
+
+class _ScoredOutput:
+    """Appends scored chunks to the output file: CSV bytes as they are, DataFrames through ChunkedDataWriter."""
+
+    def __init__(self, path: str, output_format: str):
+        self.rows_written = 0
+        self.__csv_file = open(path, "wb") if output_format == "csv" else None
+        self.__writer = ChunkedDataWriter(path) if output_format != "csv" else None
+
+    def write(self, result: tuple) -> None:
+        rows, output = result
+        if self.__csv_file is None:
+            self.__writer.write(output)
+        elif self.rows_written == 0:
+            self.__csv_file.write(output)
+        else:
+            # every chunk carries the header line; only the first one is kept
+            self.__csv_file.write(memoryview(output)[output.index(b"\n") + 1:])
+        self.rows_written += rows
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.__csv_file is not None:
+            self.__csv_file.close()
+        else:
+            self.__writer.close()
+
+
+class BatchScorer:
+    """Score a raw booking file with the saved model, chunk by chunk, across a process pool.
+
+    The input is cut into tasks of about chunk_rows rows: byte ranges that end
+    on line breaks for CSV (so quoted fields must not contain newlines), and
+    runs of row groups for Parquet. Each pool worker loads the model and the
+    feature transformer once, then reads, encodes and scores its tasks on its
+    own, so reading, parsing and formatting the output scale with the workers
+    too. Scored chunks are
+    appended to the output file in input order, with at most two tasks per
+    worker in flight so memory stays bounded.
+    """
+
+    def __init__(self, input_path: str, output_path: str, model_format: str = "pickle", chunk_rows: int = 100000,
+                 max_workers: int = None, id_column: str = "Booking_ID", dtype: dict = None):
+        self.input_path = input_path
+        self.output_path = output_path
+        self.model_format = model_format
+        self.chunk_rows = int(chunk_rows)
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.id_column = id_column
+        self.dtype = dtype
+        self.report = {}
+
+    def __csv_tasks(self) -> list:
+        with open(self.input_path, "rb") as f:
+            header_line = f.readline()
+            data_start = f.tell()
+            sample = [f.readline() for _ in range(1000)]
+            size = os.fstat(f.fileno()).st_size
+            header = pd.read_csv(io.BytesIO(header_line), nrows=0).columns.tolist()
+
+            bytes_per_row = max(sum(len(line) for line in sample) / max(len([line for line in sample if line]), 1), 1)
+            chunk_bytes = max(int(bytes_per_row * self.chunk_rows), 1)
+            bounds = [data_start]
+            while bounds[-1] < size:
+                f.seek(min(bounds[-1] + chunk_bytes, size))
+                # move to the start of the next line so no row is split between tasks
+                f.readline()
+                bounds.append(min(f.tell(), size))
+        return [("csv", str(self.input_path), header, start, end) for start, end in zip(bounds, bounds[1:]) if end > start]
+
+    def __parquet_tasks(self) -> list:
+        import pyarrow.parquet as pq
+
+        metadata = pq.ParquetFile(self.input_path).metadata
+        tasks, current, rows = [], [], 0
+        for i in range(metadata.num_row_groups):
+            current.append(i)
+            rows += metadata.row_group(i).num_rows
+            if rows >= self.chunk_rows:
+                tasks.append(("parquet", str(self.input_path), current))
+                current, rows = [], 0
+        if current:
+            tasks.append(("parquet", str(self.input_path), current))
+        return tasks
+
+    def __id_column_present(self) -> bool:
+        if get_data_format(self.input_path) == "parquet":
+            import pyarrow.parquet as pq
+
+            return self.id_column in pq.ParquetFile(self.input_path).schema_arrow.names
+        return self.id_column in pd.read_csv(self.input_path, nrows=0).columns
+
+    @instrument("BatchScorer.run")
+    def run(self) -> dict:
+        """Score the whole input file into output_path and return the throughput report."""
+        try:
+            start = time.perf_counter()
+            if not os.path.exists(self.input_path):
+                raise CustomException(f"Input file not found at path: {self.input_path}")
+            input_format = get_data_format(self.input_path)
+            tasks = self.__parquet_tasks() if input_format == "parquet" else self.__csv_tasks()
+            id_column = self.id_column if self.id_column and self.__id_column_present() else None
+            workers = max(1, min(self.max_workers, len(tasks)))
+            logger_obj.info(f"[BatchScorer] : Scoring {self.input_path} ({input_format}) as {len(tasks)} tasks with {workers} workers")
+
+            output_format = "parquet" if Path(self.output_path).suffix.lower() in (".parquet", ".pq") else "csv"
+            init_args = (self.model_format, id_column, self.dtype, output_format)
+            # loaded here first, so a missing artifact fails before the pool starts and forked workers share it
+            _init_worker(*init_args)
+            with _ScoredOutput(self.output_path, output_format) as writer:
+                if workers == 1:
+                    for task in tasks:
+                        writer.write(_score_task(task))
+                else:
+                    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=init_args) as pool:
+                        pending, queued = deque(), iter(tasks)
+                        for task in queued:
+                            pending.append(pool.submit(_score_task, task))
+                            if len(pending) >= 2 * workers:
+                                break
+                        # write in input order, topping the queue up as chunks finish
+                        while pending:
+                            writer.write(pending.popleft().result())
+                            for task in queued:
+                                pending.append(pool.submit(_score_task, task))
+                                break
+                rows = writer.rows_written
+            record_rows(rows)
+
+            seconds = time.perf_counter() - start
+            self.report = {
+                "input": str(self.input_path),
+                "output": str(self.output_path),
+                "model_version": get_model_version(self.model_format),
+                "rows": rows,
+                "tasks": len(tasks),
+                "workers": workers,
+                "seconds": seconds,
+                "rows_per_second": rows / seconds if seconds else 0.0,
+            }
+            logger_obj.info(f"[BatchScorer] : Scored {rows} rows in {seconds:.2f}s ({self.report['rows_per_second']:.0f} rows/s)")
+            return self.report
+        except Exception as e:
+            logger_obj.error(f"[BatchScorer] : Error in batch scoring: {e}")
+            raise CustomException("Batch scoring failed", e)
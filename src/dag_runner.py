@@ -0,0 +1,108 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from src.logger import get_logger
+from src.custom_exception import CustomException
+from src.instrumentation import PeakMemorySampler
+
+logger_obj = get_logger(__name__)
+
+
+def _execute_node(fn, args):
+    """Run one node and measure it; executed in a pool worker or in the main process."""
+    start = time.perf_counter()
+    with PeakMemorySampler() as sampler:
+        result = fn(*args)
+    return result, {
+        "wall_seconds": time.perf_counter() - start,
+        "peak_rss_mb": sampler.peak_rss_bytes / 2**20,
+        "pid": os.getpid(),
+    }
+
+
+class DagRunner:
+    """Run functions in dependency order, running independent nodes concurrently.
+
+    Each node's function receives the results of its dependencies as
+    positional arguments, in the order the dependencies were listed. Nodes added with in_pool=True run in a
+    process pool (their function, arguments and result must be picklable);
+    the others run in the main process. Every node's wall time and peak RSS
+    are recorded, and the critical path is computed from the wall times.
+    """
+
+    def __init__(self, name: str, max_workers: int = None):
+        self.name = name
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.__nodes = {}
+        self.metrics = {}
+
+    def add(self, name: str, fn, deps: tuple = (), in_pool: bool = True) -> None:
+        for dep in deps:
+            if dep not in self.__nodes:
+                raise CustomException(f"[DagRunner:{self.name}] Node '{name}' depends on unknown node '{dep}'")
+        self.__nodes[name] = {"fn": fn, "deps": tuple(deps), "in_pool": in_pool}
+
+    def run(self) -> dict:
+        """Execute every node and return {node name: result}."""
+        results, pending, running = {}, dict(self.__nodes), {}
+        start = time.perf_counter()
+        logger_obj.info(f"[DagRunner:{self.name}] Running {len(pending)} nodes with up to {self.max_workers} workers")
+
+        pool_nodes = sum(node["in_pool"] for node in pending.values())
+        pool = ProcessPoolExecutor(max_workers=min(self.max_workers, pool_nodes)) if pool_nodes else None
+        try:
+            while pending or running:
+                ready = [name for name, node in pending.items() if all(dep in results for dep in node["deps"])]
+                # pool nodes start right away; main-process nodes run one at a time while the pool works
+                for name in [name for name in ready if pending[name]["in_pool"]]:
+                    node = pending.pop(name)
+                    args = [results[dep] for dep in node["deps"]]
+                    self.metrics[name] = {"started_at": time.perf_counter() - start, "deps": list(node["deps"])}
+                    running[pool.submit(_execute_node, node["fn"], args)] = name
+                
+                local = [name for name in ready if name in pending]
+                if local:
+                    node = pending.pop(local[0])
+                    args = [results[dep] for dep in node["deps"]]
+                    self.metrics[local[0]] = {"started_at": time.perf_counter() - start, "deps": list(node["deps"])}
+                    results[local[0]], node_metrics = _execute_node(node["fn"], args)
+                    self.__finish(local[0], node_metrics)
+                    continue
+                
+                if not running:
+                    raise CustomException(f"[DagRunner:{self.name}] Dependency cycle among {list(pending)}")
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    results[name], node_metrics = future.result()
+                    self.__finish(name, node_metrics)
+        except Exception as e:
+            logger_obj.error(f"[DagRunner:{self.name}] Failed: {e}")
+            raise CustomException(f"DAG '{self.name}' failed: {e}")
+        finally:
+            if pool is not None:
+                pool.shutdown(wait=True, cancel_futures=True)
+
+        total = time.perf_counter() - start
+        path = self.critical_path()
+        logger_obj.info(f"[DagRunner:{self.name}] Completed in {total:.2f}s; critical path: {' -> '.join(path)}")
+        return results
+
+    def __finish(self, name: str, node_metrics: dict) -> None:
+        self.metrics[name].update(node_metrics)
+        logger_obj.info(f"[DagRunner:{self.name}] Node '{name}' finished in {node_metrics['wall_seconds']:.2f}s, "
+                        f"peak RSS {node_metrics['peak_rss_mb']:.1f} MB (pid {node_metrics['pid']})")
+
+    def critical_path(self) -> list:
+        """Return the chain of nodes with the largest summed wall time."""
+        longest = {}
+        for name in self.__nodes:  # insertion order is a topological order, since deps must exist first
+            deps = self.__nodes[name]["deps"]
+            best_dep = max(deps, key=lambda dep: longest[dep][0], default=None)
+            base_time, base_path = longest[best_dep] if best_dep else (0.0, [])
+            longest[name] = (base_time + self.metrics.get(name, {}).get("wall_seconds", 0.0), base_path + [name])
+        return max(longest.values(), key=lambda item: item[0], default=(0.0, []))[1]
+
+    def report(self) -> dict:
+        return {"name": self.name, "max_workers": self.max_workers, "critical_path": self.critical_path(), "nodes": self.metrics}
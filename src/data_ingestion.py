@@ -1,52 +1,106 @@
 import os
 from pathlib import Path
+import numpy as np
 import pandas as pd
-from google.cloud import storage
-from sklearn.model_selection import train_test_split
 from src.logger import get_logger
 from src.custom_exception import CustomException
+from src.instrumentation import instrument, record_rows
+from src.gcs_download import CachedBlobDownloader
 from config.path_config import *
-from utils.common_functions import read_yml_file
+from utils.common_functions import read_yml_file, load_data, save_data, ChunkedDataWriter
 
 # Initialize logger
 logger_obj = get_logger(__name__)
 
 # create DataIngetion claa
 class DataIngestion:
-    def __init__(self, config):
+    # resolution of the hash-based train/test split
+    HASH_BUCKETS = 10000
+
+    def __init__(self, config, storage_client=None):
         self.__config = config["data_ingestion"]
         self.__gcp_bucket_name = self.__config["bucket_name"]
         self.__file_nme = self.__config["bucket_file_name"]
         self.__train_test_split_ratio =  self.__config["train_ratio"]
+        # compact column dtypes applied while parsing the raw CSV
+        self.__data_schema = config.get("data_schema")
+        # "batch" downloads the whole file; "streaming" splits the blob chunk by chunk
+        self.__mode = self.__config.get("mode", "batch")
+        self.__chunk_size = self.__config.get("chunk_size", 100000)
+        # any object with the google.cloud.storage.Client bucket/blob interface
+        self.__storage_client = storage_client
+        # ranged/parallel download settings, see src/gcs_download.py
+        self.__download_config = self.__config.get("download", {})
+        # outcome, bytes transferred and time of the last download
+        self.download_report = {}
 
         # create RAW data derectory if not exists
         os.makedirs(Path(RAW_DIR), exist_ok=True)
         
         logger_obj.info(f"================> Data ingestion started with GCP bucket: {self.__gcp_bucket_name} and file: {self.__file_nme}")
         
+    # one storage client per ingestion run, shared by the metadata check and the download
+    def __get_client(self):
+        if self.__storage_client is None:
+            from google.cloud import storage
+
+            self.__storage_client = storage.Client()
+        return self.__storage_client
+        
+    # get the data blob from the GCP bucket
+    def __get_blob(self):
+        bucket = self.__get_client().bucket(self.__gcp_bucket_name)
+        return bucket.blob(self.__file_nme)
+        
+    # version of the source object
+    def get_source_version(self) -> str:
+        """_summary_
+        This function returns the generation and md5 of the data blob, which
+        change whenever the object is rewritten. Only metadata is fetched.
+
+        Returns:
+            str: "<generation>:<md5>" of the blob.
+        """
+        try:
+            blob = self.__get_blob()
+            blob.reload()
+            return f"{blob.generation}:{blob.md5_hash}"
+        except Exception as ex:
+            logger_obj.error(f"---:( Error reading blob metadata from GCP: {ex}")
+            raise CustomException(f"---:( Reading blob metadata failed: {ex}")
+        
     # doenloade data from GCP bucket
+    @instrument("DataIngestion.download")
     def __download_data_from_gcp(self):
         """_summary_
         This function downloads the data file from the specified GCP bucket
-        and saves it to the RAW_DATA_PATH.
+        and saves it to the RAW_DATA_PATH. The transfer is skipped when the
+        local copy already matches the object's generation and ETag, and
+        large objects are fetched as parallel byte ranges that resume after
+        a failure.
 
         Raises:
             CustomException: If there is an error during the download process.
         """
         try:
-            client = storage.Client()
-            bucket = client.bucket(self.__gcp_bucket_name)
-            blob = bucket.blob(self.__file_nme)
-
-            # Download the file to RAW_DATA_PATH
-            blob.download_to_filename(Path(RAW_DATA_PATH))
+            downloader = CachedBlobDownloader(
+                client=self.__get_client(),
+                manifest_path=Path(DOWNLOAD_MANIFEST_PATH),
+                chunk_bytes=int(self.__download_config.get("chunk_mb", 32) * 2**20),
+                max_workers=self.__download_config.get("max_workers", 8),
+                parallel_threshold_bytes=int(self.__download_config.get("parallel_threshold_mb", 64) * 2**20),
+                max_retries=self.__download_config.get("max_retries", 3)
+            )
+            self.download_report = downloader.download(self.__gcp_bucket_name, self.__file_nme, Path(RAW_DATA_PATH))
             
-            logger_obj.info(f"---:) Data downloaded successfully from GCP bucket {self.__gcp_bucket_name} to {RAW_DATA_PATH}")
+            logger_obj.info(f"---:) Data {self.download_report['outcome']} from GCP bucket {self.__gcp_bucket_name} to {RAW_DATA_PATH}: "
+                            f"{self.download_report['bytes_transferred'] / 2**20:.1f} MB transferred in {self.download_report['seconds']:.2f}s")
         except Exception as ex:
             logger_obj.error(f"---:( Error downloading data from GCP: {ex}")
             raise CustomException(f"---:( Data download failed: {ex}")
         
     # split data into train and test sets
+    @instrument("DataIngestion.split")
     def __split_data(self):
         """_summary_
         This function splits the raw data into training and testing datasets
@@ -56,8 +110,11 @@ class DataIngestion:
             CustomException: If there is an error during the data splitting process.
         """
         try:
+            from sklearn.model_selection import train_test_split
+
             # read the data set
-            data = pd.read_csv(RAW_DATA_PATH)
+            data = load_data(RAW_DATA_PATH, dtype=self.__data_schema)
+            record_rows(len(data))
             
             # split the data
             train_data, test_data = train_test_split(
@@ -67,27 +124,75 @@ class DataIngestion:
             )
             
             # save the train and test data
-            train_data.to_csv(Path(TRAIN_DATA_PATH), index=False)
+            save_data(train_data, Path(TRAIN_DATA_PATH))
             logger_obj.info(f"---:) Training data saved at {TRAIN_DATA_PATH}")
             
-            test_data.to_csv(Path(TEST_DATA_PATH), index=False)
+            save_data(test_data, Path(TEST_DATA_PATH))
             logger_obj.info(f"---:) Testing data saved at {TEST_DATA_PATH}")
         except Exception as ex:
             logger_obj.error(f"---:( Error splitting data: {ex}")
             raise CustomException(f"---:( Data splitting failed: {ex}")
         
+    # deterministic train/test assignment
+    def hash_split(self, booking_ids: pd.Series) -> np.ndarray:
+        """_summary_
+        This function assigns each row to train or test from a stable hash of
+        its Booking_ID, so the split is reproducible and needs no global view
+        of the data.
+
+        Args:
+            booking_ids (pd.Series): The Booking_ID column of a chunk.
+        Returns:
+            np.ndarray: Boolean mask, True for training rows.
+        """
+        hashes = pd.util.hash_pandas_object(booking_ids.astype(str), index=False).to_numpy()
+        return (hashes % self.HASH_BUCKETS) < int(self.__train_test_split_ratio * self.HASH_BUCKETS)
+    
+    # stream the blob and split it chunk by chunk
+    @instrument("DataIngestion.stream_split")
+    def __stream_split_data(self):
+        """_summary_
+        This function reads the data file from the GCP bucket in chunks and
+        writes each row straight to the train or test output, using a hash of
+        Booking_ID to decide. Memory use is bounded by the chunk size, and the
+        raw file is never staged on disk.
+
+        Raises:
+            CustomException: If there is an error while streaming or splitting.
+        """
+        try:
+            blob = self.__get_blob()
+            with blob.open("rb") as reader, \
+                    ChunkedDataWriter(Path(TRAIN_DATA_PATH)) as train_writer, \
+                    ChunkedDataWriter(Path(TEST_DATA_PATH)) as test_writer:
+                for chunk in pd.read_csv(reader, chunksize=self.__chunk_size, dtype=self.__data_schema):
+                    record_rows(len(chunk))
+                    is_train = self.hash_split(chunk["Booking_ID"])
+                    train_writer.write(chunk[is_train])
+                    test_writer.write(chunk[~is_train])
+                    
+            logger_obj.info(f"---:) Streamed {train_writer.rows_written} training rows to {TRAIN_DATA_PATH} and {test_writer.rows_written} testing rows to {TEST_DATA_PATH}")
+        except Exception as ex:
+            logger_obj.error(f"---:( Error streaming data from GCP: {ex}")
+            raise CustomException(f"---:( Streaming data split failed: {ex}")
+        
     # run data ingestion process
+    @instrument("DataIngestion.run")
     def run(self):
         """_summary_
         This function orchestrates the data ingestion process by downloading
         the data from GCP and splitting it into training and testing datasets.
         """
         try:
-            # download data from GCP storage
-            self.__download_data_from_gcp()
-            
-            # split the data into train and test sets
-            self.__split_data()
+            if self.__mode == "streaming":
+                # split the data into train and test sets while reading it
+                self.__stream_split_data()
+            else:
+                # download data from GCP storage
+                self.__download_data_from_gcp()
+                
+                # split the data into train and test sets
+                self.__split_data()
             
             logger_obj.info("---:) Data ingestion process completed successfully.")
         except Exception as ex:
@@ -1,13 +1,19 @@
 import os
+import json
+import logging
+import time
+from functools import partial
 import pandas as pd
 import numpy as np
 from src.logger import get_logger
 from src.custom_exception import CustomException
 from config.path_config import *
-from utils.common_functions import read_yml_file, load_data
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.preprocessing import LabelEncoder
-from imblearn.over_sampling import SMOTE
+from src.dag_runner import DagRunner
+from src.instrumentation import instrument, record_rows
+from src.feature_transformer import FeatureTransformer
+from src.balancing import Balancer
+from src.feature_selection import FeatureSelector
+from utils.common_functions import read_yml_file, load_data, save_data, optimize_dtypes, iter_data_chunks, ShardedDataWriter
 
 logger_obj = get_logger(__name__)
 
@@ -19,43 +25,34 @@ class DataProcessor:
         self.test_path = test_path
         self.processed_dir = processed_dir
         
+        # encoder and log1p choices fitted on the training split
+        self.transformer = None
+        # per-node timings of the last process() run
+        self.dag_report = {}
+        # method, time and cache use of the last feature selection
+        self.selection_report = {}
+        
         # if not exists, create processed data directory
         if not os.path.exists(self.processed_dir):
             os.makedirs(self.processed_dir)
             logger_obj.info(f"Created directory for processed data at {self.processed_dir}")
             
-    def process_data(self, df: pd.DataFrame):
+    @instrument("DataProcessor.process_data")
+    def process_data(self, df: pd.DataFrame, transformer: FeatureTransformer = None):
+        """Clean one split and apply the transformer, fitting it first when none is given."""
         try:
             logger_obj.info("[DataProcessor] : Starting data processing...")
             
             logger_obj.info("[DataProcessor] : Dropping the unused columns")
-            df.drop(columns=['Booking_ID'], inplace=True)
+            df.drop(columns=['Booking_ID'], inplace=True, errors='ignore')
             df.drop_duplicates(inplace=True)
             
-            cat_cols = self.config.get("category_features", [])
-            num_cols = self.config.get("numerical_features", [])
-            
-            logger_obj.info("[DataProcessor] : Applying Label Encoding to categorical columns")
-            encoder = LabelEncoder()
-
-            store_mappings = {}
-
-            for col in cat_cols:
-                df[col] = encoder.fit_transform(df[col])
-
-                # mapping values
-                store_mappings[col] = {lable:code for lable, code in zip(encoder.classes_, encoder.transform(encoder.classes_))}
-            
-            logger_obj.info("[DataProcessor] : Label Mapping are:")
-            for col, mapping in store_mappings.items():
-                logger_obj.info(f"{col} : {mapping}")
+            if transformer is None:
+                transformer = self.fit_transformer(df)
                 
-            logger_obj.info("[DataProcessor] : Skewness handling using log1p transformation")
-            skewness_threshold = self.config.get("skewness_threshold", 5)
-            skewness  = df[num_cols].apply(lambda x : x.skew())
-            
-            for col in skewness[skewness > skewness_threshold].index:
-                df[col] = np.log1p(df[col])
+            logger_obj.info("[DataProcessor] : Encoding categories and applying log1p transformation")
+            df = transformer.transform(df)
+            self.transformer = transformer
                 
             logger_obj.info("[DataProcessor] : Data processing completed.")
             return df
@@ -63,80 +60,196 @@ class DataProcessor:
             logger_obj.error(f"Error in data processing: {e}")
             raise CustomException(f"Data processing failed: {e}")
         
+    def fit_transformer(self, df: pd.DataFrame) -> FeatureTransformer:
+        """Fit category codes and log1p columns on cleaned (deduplicated) training rows."""
+        logger_obj.info("[DataProcessor] : Fitting category codes and log1p columns")
+        transformer = FeatureTransformer(
+            category_features=self.config.get("category_features", []),
+            numerical_features=self.config.get("numerical_features", []),
+            skewness_threshold=self.config.get("skewness_threshold", 5)
+        ).fit(df)
+        
+        # the mappings are saved with the transformer and the model metadata; log them only when debugging
+        if logger_obj.isEnabledFor(logging.DEBUG):
+            logger_obj.debug("[DataProcessor] : Label mappings are: %s", transformer.label_mappings)
+        logger_obj.info(f"[DataProcessor] : log1p columns are: {transformer.log1p_columns_}")
+        return transformer
+        
+    @instrument("DataProcessor.balance_data")
     def balance_data(self, df: pd.DataFrame):
         try:
-            logger_obj.info("[DataProcessor] : Handling data imbalance using SMOTE")
-            X = df.drop(columns=['booking_status'])
-            y = df['booking_status']
+            balancing = self.config.get("balancing", {})
+            balancer = Balancer(
+                strategy=balancing.get("strategy", "smote"),
+                k_neighbors=balancing.get("k_neighbors", 5),
+                block_size=balancing.get("block_size", 4096),
+                random_state=42
+            )
+            logger_obj.info(f"[DataProcessor] : Handling data imbalance using '{balancer.strategy}'")
+            start = time.perf_counter()
             
-            smote = SMOTE(random_state=42)
-            X_resampled, Y_resampled = smote.fit_resample(X, y)
+            X = df.drop(columns=['booking_status'])
+            X_new, y_new = balancer.extra_rows(X.to_numpy(dtype=np.float32), df['booking_status'].to_numpy())
             
-            balanced_data = pd.DataFrame(X_resampled, columns=X.columns)
-            balanced_data['booking_status'] = Y_resampled
-            logger_obj.info("[DataProcessor] : Data balancing completed.")
+            # original rows are kept as they are; new rows are appended after them, cast to the
+            # column dtypes (integer and category-code columns truncate, as imblearn does)
+            new_rows = pd.DataFrame(X_new, columns=X.columns).astype(X.dtypes.to_dict())
+            new_rows['booking_status'] = y_new
+            balanced_data = pd.concat([df, new_rows], ignore_index=True)
+            logger_obj.info(f"[DataProcessor] : Data balancing completed, added {len(new_rows)} rows in {time.perf_counter() - start:.2f}s")
             return balanced_data
             
         except Exception as e:
             logger_obj.error(f"Error in data balancing: {e}")
             raise CustomException(f"Data balancing failed: {e}")
         
+    @instrument("DataProcessor.select_features")
     def select_features(self, df: pd.DataFrame):
         try:
-            logger_obj.info("[DataProcessor] : Starting feature selection using RandomForestClassifier")
+            selection = self.config.get("feature_selection", {})
+            selector = FeatureSelector(
+                method=selection.get("method", "random_forest"),
+                num_features=self.config.get("num_of_fearures_to_select", 10),
+                random_state=42,
+                max_samples=selection.get("max_samples", 0.2),
+                n_estimators=selection.get("n_estimators", 100),
+                n_jobs=selection.get("n_jobs", -1),
+                cache_path=FEATURE_RANKING_PATH if selection.get("cache", True) else None
+            )
+            logger_obj.info(f"[DataProcessor] : Starting feature selection using '{selector.method}'")
             X = df.drop(columns=['booking_status'])
             y = df['booking_status']
             
-            model = RandomForestClassifier(random_state=42)
-            model.fit(X,y)
-            
-            feature_importances = model.feature_importances_
-            feature_importances_df = pd.DataFrame({
-                'Feature': X.columns,
-                'Importance': feature_importances
-            })
-            
-            most_effect_features = feature_importances_df.sort_values(by="Importance", ascending=False)
-            num_of_fearures_to_select = self.config.get("num_of_fearures_to_select", 10)
-            top_features = most_effect_features['Feature'].head(num_of_fearures_to_select).values
-            logger_obj.info(f"[DataProcessor] : Top {num_of_fearures_to_select} features selected: {top_features}")
+            top_features = selector.select(X, y)
+            self.selection_report = selector.last_report
+            logger_obj.info(f"[DataProcessor] : Top {len(top_features)} features selected: {top_features}")
             
-            top_features_with_data = df[top_features.tolist() + ['booking_status']]
+            top_features_with_data = df[top_features + ['booking_status']]
             logger_obj.info("[DataProcessor] : Feature selection completed.")
             return top_features_with_data
         except Exception as e:
             logger_obj.error(f"Error in feature selection: {e}")
             raise CustomException(f"Feature selection failed: {e}")
         
+    @instrument("DataProcessor.save_processed_data")
     def save_processed_data(self, df: pd.DataFrame, file_path: str):
         try:
             logger_obj.info(f"[DataProcessor] : Saving processed data to {file_path}")
+            record_rows(len(df))
             
-            df.to_csv(file_path, index=False)
+            save_data(optimize_dtypes(df), file_path)
             
             logger_obj.info(f"[DataProcessor] : Processed data saved successfully at {file_path}")
         except Exception as e:
             logger_obj.error(f"Error saving processed data to {file_path}: {e}")
             raise CustomException(f"Saving processed data failed: {e}")
         
-    def process(self):
+    def load_split(self, path: str) -> pd.DataFrame:
+        # only the configured feature columns are read; Booking_ID is never used
+        columns = self.config.get("category_features", []) + self.config.get("numerical_features", [])
+        return load_data(path, columns=columns, dtype=self.config_load.get("data_schema"))
+    
+    def load_and_fit(self, path: str) -> FeatureTransformer:
+        """Load the training split and fit the transformer on its deduplicated rows, as process_data would."""
+        return self.fit_transformer(self.load_split(path).drop_duplicates())
+    
+    def load_and_process(self, path: str, transformer: FeatureTransformer = None):
+        """Load one split and process it; returns the data and the transformer applied to it.
+
+        Without a transformer one is fitted on the split (the training split).
+        """
+        df = self.process_data(self.load_split(path), transformer)
+        return df, self.transformer
+    
+    def balance_processed(self, processed):
+        return self.balance_data(processed[0])
+    
+    def select_and_save(self, train_processed, train_data, test_processed):
+        train_data = self.select_features(train_data)
+        # the test split keeps its real class ratio
+        test_data = test_processed[0][train_data.columns]
+        
+        self.save_processed_data(train_data, PROCESSED_TRAIN_DATA_PATH)
+        self.save_processed_data(test_data, PROCESSED_TEST_DATA_PATH)
+        self.save_balancing_report(len(train_processed[0]), len(train_data) - len(train_processed[0]))
+        # the served model sees train-time encodings and transforms, in the selected feature order
+        transformer = train_processed[1]
+        transformer.feature_names = train_data.columns.drop('booking_status').tolist()
+        transformer.save(FEATURE_TRANSFORMER_PATH)
+        logger_obj.info(f"[DataProcessor] : Feature transformer saved at {FEATURE_TRANSFORMER_PATH}")
+        
+    def save_balancing_report(self, original_rows: int, added_rows: int, path: Path = BALANCING_REPORT_PATH) -> None:
+        """Record how many leading rows of the processed training split are real; balancing appended the rest."""
+        report = {
+            "strategy": self.config.get("balancing", {}).get("strategy", "smote"),
+            "original_rows": original_rows,
+            "added_rows": added_rows,
+        }
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+        logger_obj.info(f"[DataProcessor] : Balancing report saved at {path}")
+        
+    @instrument("DataProcessor.process_sharded")
+    def process_sharded(self, train_shard_dir: Path = PROCESSED_TRAIN_SHARD_DIR, test_shard_dir: Path = PROCESSED_TEST_SHARD_DIR,
+                        transformer_path: Path = FEATURE_TRANSFORMER_PATH):
+        """Out-of-core variant of process(): stream both splits into processed shards.
+
+        Only one chunk of shard_rows rows is in memory at a time. The
+        transformer is fitted in a first streaming pass over train; each train
+        chunk is then processed and balanced on its own (duplicates are only
+        dropped within a chunk, and SMOTE neighbors come from the same chunk),
+        and feature selection ranks the first balanced chunk.
+        """
         try:
-            # Load data
-            logger_obj.info("[DataProcessor] : Loading data from RAW directory")
-            train_data = load_data(self.train_path)
-            test_data = load_data(self.test_path)
+            shard_rows = self.config.get("shard_rows", 250000)
+            columns = self.config.get("category_features", []) + self.config.get("numerical_features", [])
+            read_chunks = lambda path: iter_data_chunks(path, shard_rows, columns=columns, dtype=self.config_load.get("data_schema"))
             
-            train_data = self.process_data(train_data)
-            test_data = self.process_data(test_data)
+            logger_obj.info(f"[DataProcessor] : Fitting the feature transformer in one pass over {self.train_path}")
+            transformer = FeatureTransformer(
+                category_features=self.config.get("category_features", []),
+                numerical_features=self.config.get("numerical_features", []),
+                skewness_threshold=self.config.get("skewness_threshold", 5)
+            ).fit_chunks(chunk.drop_duplicates() for chunk in read_chunks(self.train_path))
             
-            train_data = self.balance_data(train_data)
-            test_data = self.balance_data(test_data)
+            selected = None
+            with ShardedDataWriter(train_shard_dir, DATA_FORMAT) as train_writer:
+                for chunk in read_chunks(self.train_path):
+                    chunk = self.balance_data(self.process_data(chunk, transformer))
+                    if selected is None:
+                        selected = self.select_features(chunk).columns.drop('booking_status').tolist()
+                    train_writer.write(optimize_dtypes(chunk[selected + ['booking_status']]))
+                    
+            with ShardedDataWriter(test_shard_dir, DATA_FORMAT) as test_writer:
+                for chunk in read_chunks(self.test_path):
+                    chunk = self.process_data(chunk, transformer)
+                    test_writer.write(optimize_dtypes(chunk[selected + ['booking_status']]))
             
-            train_data = self.select_features(train_data)
-            test_data = test_data[train_data.columns]
-            
-            self.save_processed_data(train_data, PROCESSED_TRAIN_DATA_PATH)
-            self.save_processed_data(test_data, PROCESSED_TEST_DATA_PATH)
+            transformer.feature_names = selected
+            transformer.save(transformer_path)
+            self.transformer = transformer
+            self.dag_report = {"feature_selection": self.selection_report}
+            logger_obj.info(f"[DataProcessor] : Wrote {len(train_writer.shards)} train and {len(test_writer.shards)} test shards")
+        except Exception as e:
+            logger_obj.error(f"Error in sharded data processing pipeline: {e}")
+            raise CustomException(f"Sharded data processing pipeline failed: {e}")
+        
+    @instrument("DataProcessor.process")
+    def process(self):
+        if self.config.get("storage_mode", "in_memory") == "sharded":
+            return self.process_sharded()
+        try:
+            # the transformer is fitted on train in its own node, so both splits are then transformed
+            # side by side; only the training split is balanced
+            logger_obj.info("[DataProcessor] : Loading data from RAW directory")
+            dag = DagRunner("data_processing", max_workers=self.config.get("max_workers", 2))
+            dag.add("fit_transformer", partial(self.load_and_fit, self.train_path))
+            dag.add("process_train", partial(self.load_and_process, self.train_path), deps=("fit_transformer",))
+            dag.add("process_test", partial(self.load_and_process, self.test_path), deps=("fit_transformer",))
+            dag.add("balance_train", self.balance_processed, deps=("process_train",))
+            dag.add("select_and_save", self.select_and_save, deps=("process_train", "balance_train", "process_test"), in_pool=False)
+            dag.run()
+            self.dag_report = {**dag.report(), "feature_selection": self.selection_report}
             
             logger_obj.info("[DataProcessor] : Data processing pipeline completed successfully.")
         except Exception as e:
@@ -0,0 +1,143 @@
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.logger import get_logger
+from src.custom_exception import CustomException
+
+logger_obj = get_logger(__name__)
+
+# random_forest     : default RandomForestClassifier on every row, single-threaded (the original ranking)
+# subsampled_forest : forest whose trees each see max_samples of the rows, built on n_jobs cores
+# lgbm_gain         : total split gain of a small LightGBM booster
+SELECTION_METHODS = ("random_forest", "subsampled_forest", "lgbm_gain")
+
+
+def data_fingerprint(X: pd.DataFrame, y: pd.Series) -> str:
+    """Return a sha256 over the column names and row hashes of (X, y)."""
+    digest = hashlib.sha256(json.dumps(list(X.columns)).encode())
+    digest.update(pd.util.hash_pandas_object(X, index=False).to_numpy().tobytes())
+    digest.update(pd.util.hash_pandas_object(y, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+class FeatureSelector:
+    """Rank features by importance and keep the top num_features.
+
+    With a cache_path, the ranking is stored together with a fingerprint of
+    the input data and the selector settings, and reused as long as both
+    are unchanged. last_report holds the time taken and whether the cache
+    was used.
+    """
+
+    def __init__(self, method: str = "random_forest", num_features: int = 10, random_state: int = 42,
+                 max_samples: float = 0.2, n_estimators: int = 100, n_jobs: int = -1, cache_path: Path = None):
+        if method not in SELECTION_METHODS:
+            raise CustomException(f"Unknown feature selection method '{method}', expected one of {SELECTION_METHODS}")
+        self.method = method
+        self.num_features = num_features
+        self.random_state = random_state
+        self.max_samples = max_samples
+        self.n_estimators = n_estimators
+        self.n_jobs = n_jobs
+        self.cache_path = cache_path
+        self.last_report = {}
+
+    def settings(self) -> dict:
+        return {
+            "method": self.method,
+            "random_state": self.random_state,
+            "max_samples": self.max_samples,
+            "n_estimators": self.n_estimators,
+        }
+
+    def importances(self, X: pd.DataFrame, y: pd.Series, random_state: int = None) -> pd.Series:
+        """Fit the configured ranker and return importances indexed by column, highest first."""
+        random_state = self.random_state if random_state is None else random_state
+        if self.method == "lgbm_gain":
+            import lightgbm as lgb
+
+            model = lgb.LGBMClassifier(n_estimators=self.n_estimators, importance_type="gain", subsample=self.max_samples,
+                                       subsample_freq=1, n_jobs=self.n_jobs, random_state=random_state, verbose=-1)
+        else:
+            from sklearn.ensemble import RandomForestClassifier
+
+            if self.method == "random_forest":
+                model = RandomForestClassifier(random_state=random_state)
+            else:
+                model = RandomForestClassifier(n_estimators=self.n_estimators, max_samples=self.max_samples,
+                                               n_jobs=self.n_jobs, random_state=random_state)
+        model.fit(X, y)
+        # stable sort keeps column order among ties
+        return pd.Series(model.feature_importances_, index=X.columns).sort_values(ascending=False, kind="stable")
+
+    def select(self, X: pd.DataFrame, y: pd.Series) -> list:
+        """Return the top num_features columns, reusing the cached ranking when possible."""
+        try:
+            start = time.perf_counter()
+            fingerprint = None
+            ranking = None
+            if self.cache_path is not None:
+                fingerprint = hashlib.sha256(
+                    (data_fingerprint(X, y) + json.dumps(self.settings(), sort_keys=True)).encode()
+                ).hexdigest()
+                ranking = self.__cached_ranking(fingerprint)
+
+            cached = ranking is not None
+            if not cached:
+                ranking = self.importances(X, y).index.tolist()
+                if fingerprint is not None:
+                    self.__save_ranking(fingerprint, ranking)
+
+            selected = ranking[:self.num_features]
+            self.last_report = {
+                "method": self.method,
+                "cached": cached,
+                "selection_seconds": time.perf_counter() - start,
+                "selected_features": selected,
+            }
+            logger_obj.info(f"[FeatureSelector] : Selected {selected} with '{self.method}' in "
+                            f"{self.last_report['selection_seconds']:.2f}s (cached ranking: {cached})")
+            return selected
+        except CustomException:
+            raise
+        except Exception as e:
+            logger_obj.error(f"[FeatureSelector] : Feature selection failed: {e}")
+            raise CustomException(f"Feature selection failed: {e}")
+
+    def stability(self, X: pd.DataFrame, y: pd.Series, seeds: tuple = (0, 1, 2, 3, 4), subsample: float = 0.8) -> dict:
+        """Measure how much the chosen set moves when the data and seed change.
+
+        The ranker is refitted on a random subsample of the rows for every
+        seed. Returns the mean pairwise Jaccard similarity of the resulting
+        top-num_features sets (1.0 means always the same set) and how often
+        each feature was chosen.
+        """
+        selections = []
+        for seed in seeds:
+            rows = np.random.default_rng(seed).random(len(X)) < subsample
+            selections.append(set(self.importances(X[rows], y[rows], random_state=seed).index[:self.num_features]))
+
+        pairs = [(a, b) for i, a in enumerate(selections) for b in selections[i + 1:]]
+        counts = pd.Series([feature for selection in selections for feature in selection]).value_counts()
+        return {
+            "mean_jaccard": float(np.mean([len(a & b) / len(a | b) for a, b in pairs])) if pairs else 1.0,
+            "selection_frequency": (counts / len(selections)).to_dict(),
+        }
+
+    def __cached_ranking(self, fingerprint: str):
+        if not os.path.exists(self.cache_path):
+            return None
+        with open(self.cache_path) as f:
+            entry = json.load(f)
+        return entry["ranking"] if entry.get("fingerprint") == fingerprint else None
+
+    def __save_ranking(self, fingerprint: str, ranking: list) -> None:
+        os.makedirs(Path(self.cache_path).parent, exist_ok=True)
+        with open(self.cache_path, "w") as f:
+            json.dump({"fingerprint": fingerprint, **self.settings(), "ranking": ranking}, f, indent=2)
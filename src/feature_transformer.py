@@ -0,0 +1,188 @@
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+from src.logger import get_logger, RateLimitedLogger
+
+logger_obj = get_logger(__name__)
+# transform runs per chunk while scoring; one warning a minute per column is enough
+unseen_logger = RateLimitedLogger(logger_obj, interval_seconds=60.0)
+
+# code given to categories that were not seen while fitting
+UNKNOWN_CODE = -1
+
+
+class FeatureTransformer:
+    """Categorical encoding and log1p transform, fitted once on the training split.
+
+    fit learns the sorted category table of every categorical column (the
+    same codes LabelEncoder gives) and which numerical columns are skewed
+    enough for log1p. transform applies both to any split with vectorized
+    searchsorted lookups, so train, test and served bookings share one
+    encoding. Only NumPy is needed to transform, which keeps it cheap to
+    load in the serving process.
+
+    A categorical column that arrives numeric although its categories are
+    strings is taken as already encoded and passed through unchanged.
+    """
+
+    def __init__(self, category_features: list, numerical_features: list, skewness_threshold: float = 5,
+                 feature_names: list = None):
+        self.category_features = list(category_features)
+        self.numerical_features = list(numerical_features)
+        self.skewness_threshold = skewness_threshold
+        # model input columns, in order; set once feature selection has run
+        self.feature_names = list(feature_names or [])
+
+        self.categories_ = {}
+        self.log1p_columns_ = []
+
+    def fit(self, df):
+        """Learn the category tables and log1p columns from a training DataFrame."""
+        self.categories_ = {col: np.sort(df[col].dropna().unique().astype(_table_dtype(df[col])))
+                            for col in self.category_features if col in df}
+
+        numerical = [col for col in self.numerical_features if col in df]
+        skewness = df[numerical].skew()
+        self.log1p_columns_ = skewness[skewness > self.skewness_threshold].index.tolist()
+        return self
+
+    def fit_chunks(self, chunks):
+        """Learn the same tables as fit in one pass over DataFrame chunks.
+
+        Category values are unioned across chunks and skewness comes from
+        running power sums, so only one chunk is in memory at a time.
+        """
+        categories, moments, shift = {}, {}, {}
+        for df in chunks:
+            for col in self.category_features:
+                if col in df:
+                    values = df[col].dropna().unique().astype(_table_dtype(df[col]))
+                    categories[col] = np.union1d(categories.get(col, values[:0]), values)
+            for col in self.numerical_features:
+                if col in df:
+                    values = df[col].dropna().to_numpy(dtype=np.float64)
+                    # power sums around the first chunk's mean stay accurate for large values
+                    shift.setdefault(col, values.mean() if len(values) else 0.0)
+                    values = values - shift[col]
+                    moments[col] = moments.get(col, 0) + np.array([len(values), values.sum(), (values**2).sum(), (values**3).sum()])
+
+        self.categories_ = categories
+        self.log1p_columns_ = [col for col, sums in moments.items() if _skewness(sums) > self.skewness_threshold]
+        return self
+
+    def encode(self, col: str, values, strict: bool = False) -> np.ndarray:
+        """Map one column's values to their category codes.
+
+        Raises:
+            ValueError: If strict and a value is not in the fitted categories.
+        """
+        categories = self.categories_[col]
+        values = np.asarray(values)
+        if categories.dtype.kind in "OU" and values.dtype.kind in "iuf":
+            return values
+
+        values = values.astype(str if categories.dtype.kind in "OU" else np.float64)
+        codes = np.searchsorted(categories, values)
+        found = codes < len(categories)
+        found[found] = categories[codes[found]] == values[found]
+        if not found.all():
+            if strict:
+                raise ValueError(f"unknown {col} value(s) {sorted(set(values[~found].tolist()))}, expected one of {categories.tolist()}")
+            codes[~found] = UNKNOWN_CODE
+        return codes
+
+    def transform(self, df):
+        """Return a copy of df with categories encoded and skewed columns log1p-transformed.
+
+        Unseen categories are encoded as UNKNOWN_CODE.
+        """
+        df = df.copy()
+        for col in self.categories_:
+            if col in df:
+                codes = self.encode(col, df[col].to_numpy())
+                unknown = int((codes == UNKNOWN_CODE).sum())
+                if unknown:
+                    unseen_logger.warning("[FeatureTransformer] : %d %s value(s) unseen during fit, encoded as %d", unknown, col, UNKNOWN_CODE)
+                df[col] = codes
+        for col in self.log1p_columns_:
+            if col in df:
+                df[col] = np.log1p(df[col])
+        return df
+
+    def fit_transform(self, df):
+        return self.fit(df).transform(df)
+
+    def transform_bookings(self, bookings: list) -> np.ndarray:
+        """Build the model's float32 feature matrix from raw booking dicts in one pass per column.
+
+        Raises:
+            KeyError: If a booking lacks one of the model's features.
+            ValueError: If a categorical value was not seen during fit.
+        """
+        features = np.empty((len(bookings), len(self.feature_names)), dtype=np.float32)
+        for j, col in enumerate(self.feature_names):
+            values = [booking[col] for booking in bookings]
+            if col in self.categories_:
+                features[:, j] = self.encode(col, values, strict=True)
+            elif col in self.log1p_columns_:
+                features[:, j] = np.log1p(np.asarray(values, dtype=np.float64))
+            else:
+                features[:, j] = values
+        return features
+
+    @property
+    def label_mappings(self) -> dict:
+        """Return {column: {category: code}} for logging and the model metadata."""
+        return {col: {str(category): code for code, category in enumerate(categories.tolist())}
+                for col, categories in self.categories_.items()}
+
+    def to_dict(self) -> dict:
+        return {
+            "category_features": self.category_features,
+            "numerical_features": self.numerical_features,
+            "skewness_threshold": self.skewness_threshold,
+            "feature_names": self.feature_names,
+            "categories": {col: categories.tolist() for col, categories in self.categories_.items()},
+            "log1p_columns": self.log1p_columns_,
+        }
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "FeatureTransformer":
+        transformer = cls(state["category_features"], state["numerical_features"],
+                          state["skewness_threshold"], state["feature_names"])
+        transformer.categories_ = {col: np.asarray(categories) for col, categories in state["categories"].items()}
+        transformer.log1p_columns_ = list(state["log1p_columns"])
+        return transformer
+
+    def save(self, path: Path) -> None:
+        os.makedirs(Path(path).parent, exist_ok=True)
+        # renamed into place: a serving process reloading meanwhile reads the old file or the new one, never half of one
+        with open(f"{path}.tmp", "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        os.replace(f"{path}.tmp", path)
+
+    @classmethod
+    def load(cls, path: Path) -> "FeatureTransformer":
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+
+def _table_dtype(series):
+    """Numeric columns keep numeric categories; everything else is compared as str."""
+    return series.dtype if series.dtype.kind in "iuf" else str
+
+
+def _skewness(sums: np.ndarray) -> float:
+    """Adjusted Fisher-Pearson skewness (what pandas .skew() returns) from [n, sum x, sum x^2, sum x^3]."""
+    n, s1, s2, s3 = sums
+    if n < 3:
+        return np.nan
+    mean = s1 / n
+    m2 = s2 / n - mean**2
+    m3 = s3 / n - 3 * mean * s2 / n + 2 * mean**3
+    if m2 <= 1e-14 * max(1.0, s2 / n):
+        return 0.0
+    return np.sqrt(n * (n - 1)) / (n - 2) * m3 / m2**1.5
@@ -0,0 +1,201 @@
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from src.logger import get_logger
+from src.custom_exception import CustomException
+
+logger_obj = get_logger(__name__)
+
+
+def _atomic_write_json(path: Path, data: dict) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _read_json(path: Path) -> dict:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def file_checksum_base64(path: Path, algorithm: str) -> str:
+    """Return the base64 md5 or crc32c of a file, the form GCS reports them in."""
+    if algorithm == "crc32c":
+        import google_crc32c
+
+        digest = google_crc32c.Checksum()
+    else:
+        digest = hashlib.md5()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return base64.b64encode(digest.digest()).decode()
+
+
+class CachedBlobDownloader:
+    """Downloads GCS objects only when they changed, in parallel byte ranges that survive failures.
+
+    A JSON manifest records the generation, ETag, size and local mtime of
+    every object downloaded to each destination. When the object's current
+    metadata (one small request) still matches and the local file is
+    untouched, nothing is transferred.
+
+    Otherwise objects of at least parallel_threshold_bytes are fetched as
+    chunk_bytes ranges by max_workers threads into "<destination>.part",
+    pinned to the generation seen at the start so a rewrite mid-download
+    fails instead of mixing versions. Finished chunks are recorded in
+    "<destination>.part.json" as they land, and each chunk is retried
+    max_retries times; a download that still fails resumes from the missing
+    chunks on the next call, as long as the generation is unchanged. The
+    file is checked against the object's md5 (crc32c for composite objects)
+    before it replaces the destination.
+    """
+
+    def __init__(self, client, manifest_path: Path, chunk_bytes: int = 32 * 2**20, max_workers: int = 8,
+                 parallel_threshold_bytes: int = 64 * 2**20, max_retries: int = 3, retry_backoff_seconds: float = 0.5):
+        # any object with the google.cloud.storage.Client bucket/blob interface
+        self.client = client
+        self.manifest_path = Path(manifest_path)
+        self.chunk_bytes = int(chunk_bytes)
+        self.max_workers = max(1, int(max_workers))
+        self.parallel_threshold_bytes = int(parallel_threshold_bytes)
+        self.max_retries = int(max_retries)
+        self.retry_backoff_seconds = retry_backoff_seconds
+        self.__state_lock = threading.Lock()
+
+    def __cache_key(self, bucket_name: str, object_name: str, destination: Path) -> str:
+        return f"gs://{bucket_name}/{object_name} -> {Path(destination).resolve()}"
+
+    def download(self, bucket_name: str, object_name: str, destination: Path) -> dict:
+        """Make destination hold the current version of the object, transferring only what is missing.
+
+        Returns:
+            dict: outcome ("cached", "downloaded" or "resumed"), the object's
+            generation and size, bytes_transferred, seconds and MB/s.
+        """
+        start = time.perf_counter()
+        destination = Path(destination)
+        blob = self.client.bucket(bucket_name).blob(object_name)
+        blob.reload()
+        manifest = _read_json(self.manifest_path)
+        key = self.__cache_key(bucket_name, object_name, destination)
+
+        entry = manifest.get(key)
+        if entry is not None and destination.exists() and self.__is_current(entry, blob, destination):
+            report = {"outcome": "cached", "generation": blob.generation, "size": blob.size, "bytes_transferred": 0}
+        else:
+            os.makedirs(destination.parent, exist_ok=True)
+            if blob.size >= self.parallel_threshold_bytes:
+                report = self.__download_ranges(blob, destination)
+            else:
+                report = self.__download_whole(blob, destination)
+            manifest[key] = {
+                "generation": blob.generation,
+                "etag": blob.etag,
+                "size": blob.size,
+                "md5_hash": blob.md5_hash,
+                "local_mtime_ns": destination.stat().st_mtime_ns,
+                "downloaded_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            }
+            os.makedirs(self.manifest_path.parent, exist_ok=True)
+            _atomic_write_json(self.manifest_path, manifest)
+
+        report["seconds"] = time.perf_counter() - start
+        report["mb_per_second"] = report["bytes_transferred"] / 2**20 / report["seconds"] if report["seconds"] else 0.0
+        logger_obj.info(f"[CachedBlobDownloader] : gs://{bucket_name}/{object_name} {report['outcome']}, "
+                        f"{report['bytes_transferred']} of {blob.size} bytes transferred in {report['seconds']:.2f}s")
+        return report
+
+    @staticmethod
+    def __is_current(entry: dict, blob, destination: Path) -> bool:
+        stat = destination.stat()
+        return (str(entry["generation"]) == str(blob.generation) and entry["etag"] == blob.etag
+                and entry["size"] == blob.size == stat.st_size and entry["local_mtime_ns"] == stat.st_mtime_ns)
+
+    def __download_whole(self, blob, destination: Path) -> dict:
+        part_path = Path(f"{destination}.part")
+        blob.download_to_filename(part_path, if_generation_match=blob.generation)
+        self.__finish(blob, part_path, destination)
+        return {"outcome": "downloaded", "generation": blob.generation, "size": blob.size, "bytes_transferred": blob.size}
+
+    def __download_ranges(self, blob, destination: Path) -> dict:
+        part_path, state_path = Path(f"{destination}.part"), Path(f"{destination}.part.json")
+        chunks = [(offset, min(offset + self.chunk_bytes, blob.size)) for offset in range(0, blob.size, self.chunk_bytes)]
+
+        state = _read_json(state_path)
+        resumable = (state.get("generation") == str(blob.generation) and state.get("chunk_bytes") == self.chunk_bytes
+                     and part_path.exists() and part_path.stat().st_size == blob.size)
+        done = set(state.get("done", [])) if resumable else set()
+        if not resumable:
+            with open(part_path, "wb") as f:
+                f.truncate(blob.size)
+            state = {"generation": str(blob.generation), "chunk_bytes": self.chunk_bytes, "done": []}
+            _atomic_write_json(state_path, state)
+        missing = [i for i in range(len(chunks)) if i not in done]
+        logger_obj.info(f"[CachedBlobDownloader] : Fetching {len(missing)} of {len(chunks)} chunks "
+                        f"of {self.chunk_bytes} bytes with {self.max_workers} threads")
+
+        fd = os.open(part_path, os.O_WRONLY)
+        try:
+            def fetch(i):
+                chunk_start, chunk_end = chunks[i]
+                data = self.__fetch_range(blob, chunk_start, chunk_end)
+                os.pwrite(fd, data, chunk_start)
+                with self.__state_lock:
+                    done.add(i)
+                    state["done"] = sorted(done)
+                    _atomic_write_json(state_path, state)
+                return len(data)
+
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, max(len(missing), 1))) as pool:
+                futures = [pool.submit(fetch, i) for i in missing]
+                transferred, errors = 0, []
+                for future in futures:
+                    try:
+                        transferred += future.result()
+                    except Exception as e:
+                        errors.append(e)
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        if errors:
+            raise CustomException(f"{len(errors)} of {len(missing)} chunks failed after {self.max_retries} retries; "
+                                  f"the next download resumes from {state_path}: {errors[0]}")
+
+        self.__finish(blob, part_path, destination)
+        os.remove(state_path)
+        return {"outcome": "resumed" if len(missing) < len(chunks) else "downloaded", "generation": blob.generation,
+                "size": blob.size, "bytes_transferred": transferred, "chunks": len(chunks), "chunks_fetched": len(missing)}
+
+    def __fetch_range(self, blob, start: int, end: int) -> bytes:
+        for attempt in range(self.max_retries + 1):
+            try:
+                # end is inclusive; checksums are verified on the whole file instead of per range
+                data = blob.download_as_bytes(start=start, end=end - 1, if_generation_match=blob.generation, checksum=None)
+                if len(data) != end - start:
+                    raise IOError(f"range {start}-{end} returned {len(data)} bytes")
+                return data
+            except Exception as e:
+                if attempt == self.max_retries:
+                    raise
+                logger_obj.warning(f"[CachedBlobDownloader] : Range {start}-{end} failed ({e}), retry {attempt + 1} of {self.max_retries}")
+                time.sleep(self.retry_backoff_seconds * 2**attempt)
+
+    @staticmethod
+    def __finish(blob, part_path: Path, destination: Path) -> None:
+        # composite objects carry only a crc32c
+        algorithm, expected = ("md5", blob.md5_hash) if blob.md5_hash else ("crc32c", getattr(blob, "crc32c", None))
+        if expected and file_checksum_base64(part_path, algorithm) != expected:
+            os.remove(part_path)
+            raise CustomException(f"Downloaded gs://{blob.bucket.name}/{blob.name} does not match its {algorithm}, discarded")
+        os.replace(part_path, destination)
@@ -0,0 +1,268 @@
+import math
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import lightgbm as lgb
+from sklearn.model_selection import ParameterSampler, StratifiedKFold
+
+from src.logger import get_logger
+from src.custom_exception import CustomException
+
+logger = get_logger(__name__)
+
+# sklearn-style LGBMClassifier parameter names -> native LightGBM names
+NATIVE_PARAM_NAMES = {"boosting_type": "boosting", "random_state": "seed", "n_jobs": "num_threads"}
+
+
+def to_native_params(params: dict) -> dict:
+    """Translate LGBMClassifier keyword arguments into lgb.train/lgb.cv parameters."""
+    return {NATIVE_PARAM_NAMES.get(key, key): value for key, value in params.items() if key != "n_estimators"}
+
+
+def resolve_thread_split(cv: int, cv_jobs: int = None, lgbm_threads: int = None) -> tuple:
+    """Split the cores between concurrently trained folds and LightGBM's own threads.
+
+    Unset values are derived so that cv_jobs * lgbm_threads does not exceed the core count.
+    """
+    cores = os.cpu_count() or 1
+    cv_jobs = cv_jobs or min(cv, cores)
+    lgbm_threads = lgbm_threads or max(1, cores // cv_jobs)
+    return cv_jobs, lgbm_threads
+
+
+def uses_early_stopping(params: dict) -> bool:
+    """Whether lgb.early_stopping can stop this candidate; LightGBM ignores it for dart boosting."""
+    return to_native_params(params).get("boosting", "gbdt") != "dart"
+
+
+def _take(data, index):
+    return data.iloc[index] if hasattr(data, "iloc") else data[index]
+
+
+class PrebinnedFolds:
+    """Per-fold LightGBM Datasets that are binned once and reused by every candidate.
+
+    Fold indices come from StratifiedKFold without shuffling, the same folds
+    RandomizedSearchCV(cv=n) uses for a classifier. Each fold's training
+    Dataset computes its own bins and its validation Dataset reuses them, so
+    scores match fitting LGBMClassifier on the fold. Folds are trained
+    concurrently on cv_jobs threads (LightGBM releases the GIL), each with
+    lgbm_threads LightGBM threads.
+    """
+
+    def __init__(self, X, y, cv: int = 5, cv_jobs: int = None, lgbm_threads: int = None, random_state: int = 42,
+                 base_params: dict = None):
+        self.cv = cv
+        # fixed LightGBM parameters shared by every candidate
+        self.base_params = to_native_params(base_params or {})
+        self.cv_jobs, self.lgbm_threads = resolve_thread_split(cv, cv_jobs, lgbm_threads)
+        self.random_state = random_state
+
+        start = time.perf_counter()
+        dataset_params = {"verbose": -1, "num_threads": self.lgbm_threads}
+        self.folds = []
+        for train_index, valid_index in StratifiedKFold(n_splits=cv).split(X, y):
+            train_set = lgb.Dataset(_take(X, train_index), label=_take(y, train_index), params=dataset_params).construct()
+            valid_set = lgb.Dataset(_take(X, valid_index), label=_take(y, valid_index), reference=train_set).construct()
+            self.folds.append((train_set, valid_set))
+        self.binning_seconds = time.perf_counter() - start
+        logger.info(f"[PrebinnedFolds] Binned {cv} folds in {self.binning_seconds:.2f}s "
+                    f"({self.cv_jobs} concurrent folds x {self.lgbm_threads} LightGBM threads)")
+
+    def _train_fold(self, params: dict, fold: tuple, num_boost_round: int, early_stopping_rounds: int) -> dict:
+        train_set, valid_set = fold
+        evals = {}
+        callbacks = [lgb.record_evaluation(evals)]
+        if early_stopping_rounds and uses_early_stopping(params):
+            callbacks.append(lgb.early_stopping(early_stopping_rounds, verbose=False))
+        lgb.train(params, train_set, num_boost_round=num_boost_round, valid_sets=[valid_set], callbacks=callbacks)
+
+        errors = evals["valid_0"]["binary_error"]
+        best_iteration = int(np.argmin(errors)) + 1 if early_stopping_rounds else len(errors)
+        return {"accuracy": 1.0 - errors[best_iteration - 1], "best_iteration": best_iteration, "rounds_trained": len(errors)}
+
+    def evaluate(self, candidate: dict, num_boost_round: int, early_stopping_rounds: int = None) -> dict:
+        """Cross-validate one candidate on the prebinned folds.
+
+        Without early stopping every fold trains num_boost_round trees and is
+        scored at the last one, like RandomizedSearchCV. With early stopping
+        each fold stops on its own and is scored at its best iteration; dart
+        candidates cannot stop early, so they train every round and are only
+        scored at their best iteration.
+        """
+        params = {
+            **self.base_params,
+            **to_native_params(candidate),
+            "objective": "binary",
+            "metric": "binary_error",
+            "seed": self.random_state,
+            "num_threads": self.lgbm_threads,
+            "verbose": -1,
+        }
+        with ThreadPoolExecutor(max_workers=self.cv_jobs) as pool:
+            fold_results = list(pool.map(lambda fold: self._train_fold(params, fold, num_boost_round, early_stopping_rounds), self.folds))
+
+        return {
+            "cv_accuracy": float(np.mean([result["accuracy"] for result in fold_results])),
+            "best_iteration": int(round(np.mean([result["best_iteration"] for result in fold_results]))),
+            "tree_fits": sum(result["rounds_trained"] for result in fold_results),
+            # every fold stopped before num_boost_round, so a larger budget would train the same trees
+            "stopped_early": all(result["rounds_trained"] < num_boost_round for result in fold_results),
+        }
+
+
+class PrebinnedRandomSearch:
+    """Randomized search with the same candidates and folds as RandomizedSearchCV, on prebinned folds.
+
+    Every candidate trains its full n_estimators on every fold, as today;
+    only the per-fit binning and the thread oversubscription are removed.
+    """
+
+    def __init__(self, param_distributions: dict, n_iter: int = 5, cv: int = 5, random_state: int = 42,
+                 cv_jobs: int = None, lgbm_threads: int = None, base_params: dict = None):
+        self.param_distributions = param_distributions
+        self.n_iter = n_iter
+        self.cv = cv
+        self.random_state = random_state
+        self.cv_jobs = cv_jobs
+        self.lgbm_threads = lgbm_threads
+        self.base_params = base_params
+
+    def fit(self, X, y):
+        try:
+            start = time.perf_counter()
+            candidates = list(ParameterSampler(self.param_distributions, n_iter=self.n_iter, random_state=self.random_state))
+            folds = PrebinnedFolds(X, y, self.cv, self.cv_jobs, self.lgbm_threads, self.random_state, self.base_params)
+
+            self.history_ = [folds.evaluate(candidate, candidate["n_estimators"]) for candidate in candidates]
+            best = int(np.argmax([result["cv_accuracy"] for result in self.history_]))
+
+            self.best_score_ = self.history_[best]["cv_accuracy"]
+            self.best_params_ = candidates[best]
+            self.tree_fits_ = sum(result["tree_fits"] for result in self.history_)
+            self.search_seconds_ = time.perf_counter() - start
+            logger.info(f"[PrebinnedRandomSearch] Best CV accuracy {self.best_score_:.4f} in {self.search_seconds_:.1f}s")
+            return self
+        except Exception as e:
+            logger.exception(f"[PrebinnedRandomSearch] Error in search: {e}")
+            raise CustomException("Prebinned random search failed", e)
+
+    def summary(self) -> dict:
+        return {
+            "search_best_cv_accuracy": self.best_score_,
+            "search_tree_fits": self.tree_fits_,
+            "search_exhaustive_tree_fits": self.tree_fits_,
+            "search_tree_fits_saved_ratio": 0.0,
+            "search_seconds": self.search_seconds_,
+        }
+
+
+class SuccessiveHalvingSearch:
+    """Successive halving over boosting rounds with early stopping inside each CV run.
+
+    Candidates are sampled from the same distributions as RandomizedSearchCV.
+    Every rung trains the surviving candidates on the prebinned CV folds up
+    to the rung's boosting-round budget (capped by the candidate's own
+    n_estimators). Each fold stops early once its validation error has not
+    improved for early_stopping_rounds. Only the best 1/eta of the
+    candidates move on to the next rung, whose budget is eta times larger.
+    A survivor that already trained to its n_estimators, or whose folds all
+    stopped early, would train the same trees again, so its previous score
+    is carried over without training.
+
+    LightGBM cannot stop dart boosting early, so dart candidates train every
+    round of each rung's budget; they are still ranked at their best
+    iteration. no_early_stopping_candidates_ lists them.
+
+    After fit, best_params_ holds LGBMClassifier arguments with n_estimators
+    set to the best iteration found. tree_fits_ counts the trees actually
+    built, and exhaustive_tree_fits_ is what training every candidate to its
+    full n_estimators on every fold would have cost.
+    """
+
+    def __init__(self, param_distributions: dict, n_candidates: int = 27, min_boost_rounds: int = 50,
+                 max_boost_rounds: int = 1000, eta: int = 3, early_stopping_rounds: int = 30,
+                 cv: int = 5, random_state: int = 42, cv_jobs: int = None, lgbm_threads: int = None,
+                 base_params: dict = None):
+        self.param_distributions = param_distributions
+        self.n_candidates = n_candidates
+        self.min_boost_rounds = min_boost_rounds
+        self.max_boost_rounds = max_boost_rounds
+        self.eta = eta
+        self.early_stopping_rounds = early_stopping_rounds
+        self.cv = cv
+        self.random_state = random_state
+        self.cv_jobs = cv_jobs
+        self.lgbm_threads = lgbm_threads
+        self.base_params = base_params
+
+    def rung_budgets(self) -> list:
+        budgets, budget = [], self.min_boost_rounds
+        while budget < self.max_boost_rounds:
+            budgets.append(budget)
+            budget *= self.eta
+        return budgets + [self.max_boost_rounds]
+
+    def fit(self, X, y):
+        try:
+            start = time.perf_counter()
+            candidates = list(ParameterSampler(self.param_distributions, n_iter=self.n_candidates, random_state=self.random_state))
+            folds = PrebinnedFolds(X, y, self.cv, self.cv_jobs, self.lgbm_threads, self.random_state, self.base_params)
+
+            self.exhaustive_tree_fits_ = sum(candidate["n_estimators"] for candidate in candidates) * self.cv
+            self.tree_fits_ = 0
+            self.history_ = []
+            self.no_early_stopping_candidates_ = [index for index, candidate in enumerate(candidates)
+                                                  if not uses_early_stopping({**(self.base_params or {}), **candidate})]
+            if self.no_early_stopping_candidates_:
+                logger.warning(f"[SuccessiveHalvingSearch] Candidates {self.no_early_stopping_candidates_} use dart boosting, "
+                               f"which cannot stop early; they train every round of each rung")
+
+            survivors = list(range(len(candidates)))
+            scores, trained_rounds = {}, {}
+            for rung, budget in enumerate(self.rung_budgets()):
+                for index in survivors:
+                    budget_rounds = min(budget, candidates[index]["n_estimators"])
+                    if index in scores and (budget_rounds == trained_rounds[index] or scores[index]["stopped_early"]):
+                        self.history_.append({"rung": rung, "budget": budget, "candidate": index,
+                                              **scores[index], "tree_fits": 0, "reused": True})
+                        continue
+                    scores[index] = folds.evaluate(candidates[index], budget_rounds, self.early_stopping_rounds)
+                    trained_rounds[index] = budget_rounds
+                    self.tree_fits_ += scores[index]["tree_fits"]
+                    self.history_.append({"rung": rung, "budget": budget, "candidate": index, **scores[index], "reused": False})
+
+                survivors.sort(key=lambda index: scores[index]["cv_accuracy"], reverse=True)
+                logger.info(f"[SuccessiveHalvingSearch] Rung {rung} (budget {budget} rounds): "
+                            f"{len(survivors)} candidates, best CV accuracy {scores[survivors[0]]['cv_accuracy']:.4f}")
+                if len(survivors) == 1:
+                    break
+                survivors = survivors[:max(1, math.ceil(len(survivors) / self.eta))]
+
+            best = survivors[0]
+            self.best_score_ = scores[best]["cv_accuracy"]
+            self.best_params_ = {**candidates[best], "n_estimators": scores[best]["best_iteration"]}
+            self.search_seconds_ = time.perf_counter() - start
+            logger.info(f"[SuccessiveHalvingSearch] Built {self.tree_fits_} trees instead of {self.exhaustive_tree_fits_} "
+                        f"({self.tree_fits_saved_ratio:.1%} saved) in {self.search_seconds_:.1f}s")
+            return self
+        except Exception as e:
+            logger.exception(f"[SuccessiveHalvingSearch] Error in search: {e}")
+            raise CustomException("Successive halving search failed", e)
+
+    @property
+    def tree_fits_saved_ratio(self) -> float:
+        return 1.0 - self.tree_fits_ / self.exhaustive_tree_fits_ if self.exhaustive_tree_fits_ else 0.0
+
+    def summary(self) -> dict:
+        """Return the search counters as flat metrics."""
+        return {
+            "search_best_cv_accuracy": self.best_score_,
+            "search_tree_fits": self.tree_fits_,
+            "search_exhaustive_tree_fits": self.exhaustive_tree_fits_,
+            "search_tree_fits_saved_ratio": self.tree_fits_saved_ratio,
+            "search_candidates_without_early_stopping": len(self.no_early_stopping_candidates_),
+            "search_seconds": self.search_seconds_,
+        }
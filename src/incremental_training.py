@@ -0,0 +1,98 @@
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.logger import get_logger
+
+logger_obj = get_logger(__name__)
+
+
+def row_hashes(X: pd.DataFrame, y) -> np.ndarray:
+    """_summary_
+    This function hashes every training row (features and label) to a
+    uint64, so the rows a model was trained on can be stored compactly and
+    new rows found by set difference.
+
+    Args:
+        X (pd.DataFrame): Feature rows.
+        y (array-like): Labels of the rows.
+    Returns:
+        np.ndarray: Sorted, de-duplicated uint64 hashes.
+    """
+    rows = X.assign(booking_status=np.asarray(y))
+    return np.unique(pd.util.hash_pandas_object(rows, index=False).to_numpy())
+
+
+def new_row_mask(X: pd.DataFrame, y, trained_hashes: np.ndarray) -> np.ndarray:
+    """_summary_
+    This function marks the rows that are not among the hashes of the rows
+    the previous model was trained on.
+
+    Returns:
+        np.ndarray: Boolean mask, True for new rows.
+    """
+    rows = X.assign(booking_status=np.asarray(y))
+    hashes = pd.util.hash_pandas_object(rows, index=False).to_numpy()
+    return ~np.isin(hashes, trained_hashes)
+
+
+def population_stability_index(expected, actual, bins: int = 10) -> float:
+    """_summary_
+    This function computes the population stability index of actual against
+    expected, over quantile bins of expected. Repeated quantiles collapse, so
+    a low-cardinality column gets one bin per value. Below 0.1 is commonly
+    read as stable, above 0.25 as a significant shift.
+
+    Returns:
+        float: The PSI, 0.0 for identical distributions.
+    """
+    expected, actual = np.asarray(expected, dtype=float), np.asarray(actual, dtype=float)
+    if len(expected) == 0 or len(actual) == 0:
+        return 0.0
+    edges = np.unique(np.quantile(expected, np.linspace(0, 1, bins + 1)))[1:-1]
+    expected_share = np.bincount(np.searchsorted(edges, expected, side="right"), minlength=len(edges) + 1) / len(expected)
+    actual_share = np.bincount(np.searchsorted(edges, actual, side="right"), minlength=len(edges) + 1) / len(actual)
+    # empty bins would make the log infinite
+    expected_share, actual_share = np.clip(expected_share, 1e-4, None), np.clip(actual_share, 1e-4, None)
+    return float(np.sum((actual_share - expected_share) * np.log(actual_share / expected_share)))
+
+
+def feature_drift(X_reference: pd.DataFrame, X_new: pd.DataFrame, bins: int = 10) -> dict:
+    """Return {feature: PSI of the new rows against the reference rows}."""
+    return {col: population_stability_index(X_reference[col], X_new[col], bins) for col in X_reference.columns}
+
+
+def read_training_state(state_path: Path, rows_path: Path) -> tuple:
+    """_summary_
+    This function reads what the last training run recorded about the saved
+    model: its state sidecar and the hashes of the rows it was trained on.
+
+    Returns:
+        tuple: (state dict, hashes array), or (None, None) when either is missing.
+    """
+    if not os.path.exists(state_path) or not os.path.exists(rows_path):
+        return None, None
+    with open(state_path) as f:
+        state = json.load(f)
+    return state, np.load(rows_path)
+
+
+def write_training_state(state_path: Path, rows_path: Path, state: dict, hashes: np.ndarray) -> None:
+    """_summary_
+    This function writes the training state sidecar and the row hashes of
+    the saved model, each under a temporary name first, so an interrupted
+    run never leaves a half-written file next to the model.
+    """
+    os.makedirs(Path(state_path).parent, exist_ok=True)
+    tmp_rows_path = f"{rows_path}.tmp.npy"
+    np.save(tmp_rows_path, hashes)
+    os.replace(tmp_rows_path, rows_path)
+
+    tmp_state_path = f"{state_path}.tmp"
+    with open(tmp_state_path, "w") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_state_path, state_path)
+    logger_obj.info(f"Training state of {state['trained_rows']} rows saved at {state_path}")
@@ -0,0 +1,110 @@
+from operator import itemgetter
+
+import numpy as np
+
+# Feature order the model was trained on (same order as the HTML form)
+FEATURE_COLUMNS = [
+    'lead_time',
+    'no_of_special_requests',
+    'avg_price_per_room',
+    'arrival_month',
+    'arrival_date',
+    'market_segment_type',
+    'no_of_week_nights',
+    'no_of_weekend_nights',
+    'room_type_reserved',
+    'type_of_meal_plan',
+]
+_get_features = itemgetter(*FEATURE_COLUMNS)
+
+# Codes the baseline LabelEncoder gave the form's categories (their sorted
+# order), used for models saved without a FeatureTransformer sidecar
+LEGACY_CATEGORY_CODES = {
+    'market_segment_type': {label: code for code, label in enumerate(
+        ['Aviation', 'Complementary', 'Corporate', 'Offline', 'Online'])},
+    'room_type_reserved': {f'Room_Type {i}': i - 1 for i in range(1, 8)},
+    'type_of_meal_plan': {label: code for code, label in enumerate(
+        ['Meal Plan 1', 'Meal Plan 2', 'Meal Plan 3', 'Not Selected'])},
+}
+
+
+def build_feature_matrix(bookings, transformer=None):
+    """Build one contiguous float32 matrix from a list of bookings.
+
+    Each booking is either a dict keyed by FEATURE_COLUMNS or a list of
+    already-encoded values in FEATURE_COLUMNS order. With the model's
+    FeatureTransformer, dict bookings may carry raw category strings, which
+    are encoded for the whole batch at once, and columns come out in the
+    order the model was trained on.
+    """
+    if transformer is not None and isinstance(bookings[0], dict):
+        return transformer.transform_bookings(bookings)
+
+    if isinstance(bookings[0], dict):
+        rows = [_get_features(booking) for booking in bookings]
+    else:
+        rows = bookings
+
+    features = np.asarray(rows, dtype=np.float32)
+    if features.ndim != 2 or features.shape[1] != len(FEATURE_COLUMNS):
+        raise ValueError(f"expected {len(FEATURE_COLUMNS)} features per booking, got shape {features.shape}")
+    if transformer is not None and transformer.feature_names != FEATURE_COLUMNS:
+        features = features[:, [FEATURE_COLUMNS.index(col) for col in transformer.feature_names]]
+    return np.ascontiguousarray(features)
+
+
+def parse_form(form, transformer=None):
+    """Build a single-row feature matrix from the HTML form fields.
+
+    The form sends raw category labels, which the model's transformer
+    encodes; without one they get the baseline LabelEncoder codes, and
+    every other field must be numeric.
+    """
+    if transformer is not None:
+        return build_feature_matrix([{col: form[col] for col in transformer.feature_names}], transformer)
+    return build_feature_matrix([[_legacy_value(col, form[col]) for col in FEATURE_COLUMNS]])
+
+
+def _legacy_value(col: str, value) -> float:
+    codes = LEGACY_CATEGORY_CODES.get(col)
+    if codes is not None and value in codes:
+        return float(codes[value])
+    return float(value)
+
+
+class BatchTooLargeError(ValueError):
+    """A /predict/batch body with more bookings than the server accepts (answered with 413)."""
+
+
+def extract_bookings(payload, max_batch_size: int) -> list:
+    """Return the list of bookings from a /predict/batch JSON body.
+
+    Accepts either a bare list or {"bookings": [...]}.
+
+    Raises:
+        BatchTooLargeError: If the body holds more than max_batch_size bookings.
+        ValueError: If the body holds no bookings.
+    """
+    bookings = payload.get('bookings') if isinstance(payload, dict) else payload
+    if not isinstance(bookings, list) or not bookings:
+        raise ValueError("Request body must be a non-empty list of bookings or {'bookings': [...]}")
+    if len(bookings) > max_batch_size:
+        raise BatchTooLargeError(f"Batch of {len(bookings)} bookings exceeds the limit of {max_batch_size}")
+    return bookings
+
+
+def build_prediction_response(classes, probabilities: np.ndarray) -> dict:
+    """Build the /predict/batch JSON response from class probabilities."""
+    predictions = classes[probabilities.argmax(axis=1)]
+
+    return {
+        'count': len(predictions),
+        'classes': classes.tolist(),
+        'predictions': predictions.tolist(),
+        'probabilities': probabilities.tolist(),
+    }
+
+
+def predict_batch(model, features: np.ndarray, **predict_kwargs) -> dict:
+    """Score a feature matrix with one predict_proba call and build the JSON response."""
+    return build_prediction_response(model.classes_, model.predict_proba(features, **predict_kwargs))
@@ -0,0 +1,226 @@
+import contextvars
+import cProfile
+import functools
+import inspect
+import os
+import resource
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from src.logger import get_logger
+from config.path_config import PROFILE_DIR
+
+logger_obj = get_logger(__name__)
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+# comma-separated call names (e.g. "ModelTrainer.train_model") to run under cProfile, or "all"
+PROFILE_STAGES_ENV = "PROFILE_STAGES"
+
+
+def current_rss_bytes() -> int:
+    """Return the resident set size of this process (falls back to the lifetime peak off Linux)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class PeakMemorySampler:
+    """Context manager that polls RSS on a background thread and keeps the maximum."""
+
+    def __init__(self, interval_seconds: float = 0.005):
+        self.interval_seconds = interval_seconds
+        self.peak_rss_bytes = 0
+        self.__stop = threading.Event()
+        self.__thread = None
+
+    def __sample(self):
+        while not self.__stop.is_set():
+            self.peak_rss_bytes = max(self.peak_rss_bytes, current_rss_bytes())
+            self.__stop.wait(self.interval_seconds)
+
+    def __enter__(self):
+        self.peak_rss_bytes = current_rss_bytes()
+        self.__thread = threading.Thread(target=self.__sample, daemon=True)
+        self.__thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.__stop.set()
+        self.__thread.join()
+        self.peak_rss_bytes = max(self.peak_rss_bytes, current_rss_bytes())
+
+
+class CallRecord:
+    """Measurements of one instrumented call; rows may be set while it runs."""
+
+    __slots__ = ("name", "wall_seconds", "cpu_seconds", "peak_rss_mb", "rows")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.peak_rss_mb = None
+        self.rows = None
+
+    def as_dict(self) -> dict:
+        return {"wall_seconds": self.wall_seconds, "cpu_seconds": self.cpu_seconds,
+                "peak_rss_mb": self.peak_rss_mb, "rows": self.rows}
+
+
+class InstrumentationRegistry:
+    """Per-name running totals of instrumented calls in this process.
+
+    Only aggregates and the last call are kept, so instrumenting a request
+    handler does not grow memory with traffic.
+    """
+
+    def __init__(self):
+        self.__stats = {}
+        self.__lock = threading.Lock()
+
+    def add(self, record: CallRecord) -> None:
+        with self.__lock:
+            stats = self.__stats.setdefault(record.name, {
+                "calls": 0, "wall_seconds": 0.0, "cpu_seconds": 0.0, "max_wall_seconds": 0.0,
+                "peak_rss_mb": None, "rows": 0,
+            })
+            stats["calls"] += 1
+            stats["wall_seconds"] += record.wall_seconds
+            stats["cpu_seconds"] += record.cpu_seconds
+            stats["max_wall_seconds"] = max(stats["max_wall_seconds"], record.wall_seconds)
+            if record.peak_rss_mb is not None:
+                stats["peak_rss_mb"] = max(stats["peak_rss_mb"] or 0.0, record.peak_rss_mb)
+            stats["rows"] += record.rows or 0
+            stats["last"] = record.as_dict()
+
+    def summary(self) -> dict:
+        with self.__lock:
+            return {name: {**stats, "last": dict(stats["last"])} for name, stats in self.__stats.items()}
+
+    def reset(self) -> None:
+        with self.__lock:
+            self.__stats.clear()
+
+    def metrics(self, prefix: str = "") -> dict:
+        """Flatten the summary into {"<prefix><name>.<field>": value} for mlflow.log_metrics."""
+        metrics = {}
+        for name, stats in self.summary().items():
+            for field in ("calls", "wall_seconds", "cpu_seconds", "peak_rss_mb", "rows"):
+                if stats[field] is not None:
+                    metrics[f"{prefix}{name}.{field}"] = stats[field]
+        return metrics
+
+
+registry = InstrumentationRegistry()
+
+# innermost instrumented call of the current thread or task, for record_rows
+_current_call = contextvars.ContextVar("instrumented_call", default=None)
+_profiler_lock = threading.Lock()
+
+
+def record_rows(rows: int) -> None:
+    """Add rows to the innermost instrumented call in progress (no-op outside one)."""
+    record = _current_call.get()
+    if record is not None:
+        record.rows = (record.rows or 0) + int(rows)
+
+
+def _infer_rows(result):
+    """Row count of a DataFrame/array result, or of the first element of a tuple result."""
+    if isinstance(result, tuple) and result:
+        result = result[0]
+    shape = getattr(result, "shape", None)
+    return int(shape[0]) if shape else None
+
+
+def _profile_path(name: str):
+    """Return the .prof path when name is selected for profiling, else None."""
+    selected = {stage.strip() for stage in os.environ.get(PROFILE_STAGES_ENV, "").split(",") if stage.strip()}
+    if name not in selected and "all" not in selected:
+        return None
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    return PROFILE_DIR / f"{name}_{datetime.now():%Y%m%d_%H%M%S}_{os.getpid()}.prof"
+
+
+@contextmanager
+def measure(name: str, hot_path: bool = False):
+    """Measure the enclosed block as one call of name and add it to the registry.
+
+    Records wall time, process CPU time (all threads), peak RSS and rows.
+    Peak RSS is polled on a background thread; with hot_path=True (request
+    handlers) the process's lifetime peak RSS is recorded instead and nothing
+    is logged, which keeps the overhead to about ten microseconds per call. When name
+    is listed in $PROFILE_STAGES the block also runs under cProfile and the
+    stats are dumped to a .prof file (pstats format, viewable with snakeviz
+    or `python -m pstats`; py-spy can be attached to the same process for
+    native frames).
+    """
+    record = CallRecord(name)
+    token = _current_call.set(record)
+    profile_path = None if hot_path else _profile_path(name)
+    # only one cProfile profiler can be active per process
+    profiler = cProfile.Profile() if profile_path is not None and _profiler_lock.acquire(blocking=False) else None
+    sampler = None if hot_path else PeakMemorySampler()
+    start, cpu_start = time.perf_counter(), time.process_time()
+    try:
+        if sampler is not None:
+            sampler.__enter__()
+        if profiler is not None:
+            profiler.enable()
+        yield record
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        record.wall_seconds = time.perf_counter() - start
+        record.cpu_seconds = time.process_time() - cpu_start
+        if profiler is not None:
+            profiler.dump_stats(str(profile_path))
+            _profiler_lock.release()
+            logger_obj.info(f"[Instrumentation] : Profile of {name} written to {profile_path}")
+        if sampler is not None:
+            sampler.__exit__(None, None, None)
+            record.peak_rss_mb = sampler.peak_rss_bytes / 2**20
+        else:
+            # the process high-water mark: one syscall, no file read on the request path
+            record.peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        _current_call.reset(token)
+        registry.add(record)
+        if not hot_path:
+            logger_obj.info(f"[Instrumentation] : {name} took {record.wall_seconds:.3f}s wall, {record.cpu_seconds:.3f}s CPU, "
+                            f"peak RSS {record.peak_rss_mb:.1f} MB, rows {record.rows}")
+
+
+def instrument(name: str = None, hot_path: bool = False):
+    """Decorator form of measure(); name defaults to the function's qualified name.
+
+    Unless the function calls record_rows, rows are taken from the length of
+    the returned DataFrame/array (or of the first element of a returned tuple).
+    Works on plain and async functions.
+    """
+    def decorator(fn):
+        call_name = name or fn.__qualname__
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with measure(call_name, hot_path) as record:
+                    result = await fn(*args, **kwargs)
+                    if record.rows is None:
+                        record.rows = _infer_rows(result)
+                    return result
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with measure(call_name, hot_path) as record:
+                result = fn(*args, **kwargs)
+                if record.rows is None:
+                    record.rows = _infer_rows(result)
+                return result
+        return wrapper
+    return decorator
@@ -0,0 +1,110 @@
+import base64
+import hashlib
+import os
+import threading
+import time
+from pathlib import Path
+
+
+class LocalBlob:
+    """A file under a LocalBucket directory, with the parts of the GCS Blob interface ingestion uses.
+
+    generation is the file's mtime in nanoseconds, so rewriting the file
+    makes it a new generation the way re-uploading an object does.
+    """
+
+    def __init__(self, bucket: "LocalBucket", name: str):
+        self.bucket = bucket
+        self.name = name
+        self.path = bucket.path / name
+        self.generation = None
+        self.etag = None
+        self.md5_hash = None
+        self.crc32c = None
+        self.size = None
+
+    def reload(self) -> None:
+        stat = os.stat(self.path)
+        self.generation = stat.st_mtime_ns
+        self.etag = f"{stat.st_ino:x}-{stat.st_mtime_ns:x}"
+        self.size = stat.st_size
+        self.md5_hash = self.bucket.client.md5_of(self.path, stat)
+
+    def __check_generation(self, if_generation_match):
+        if if_generation_match is not None and os.stat(self.path).st_mtime_ns != if_generation_match:
+            raise IOError(f"412 Precondition Failed: {self.name} is no longer generation {if_generation_match}")
+
+    def download_as_bytes(self, start: int = None, end: int = None, if_generation_match: int = None, **kwargs) -> bytes:
+        """Return bytes start..end of the file, end inclusive like GCS ranged reads."""
+        self.__check_generation(if_generation_match)
+        start = start or 0
+        length = (end + 1 - start) if end is not None else os.stat(self.path).st_size - start
+        self.bucket.client.request(length)
+        with open(self.path, "rb") as f:
+            f.seek(start)
+            return f.read(length)
+
+    def download_to_filename(self, filename, if_generation_match: int = None, **kwargs) -> None:
+        data = self.download_as_bytes(if_generation_match=if_generation_match)
+        with open(filename, "wb") as f:
+            f.write(data)
+
+    def open(self, mode: str = "rb"):
+        return open(self.path, mode)
+
+
+class LocalBucket:
+    def __init__(self, client: "LocalStorageClient", name: str):
+        self.client = client
+        self.name = name
+        self.path = client.root / name
+
+    def blob(self, name: str) -> LocalBlob:
+        return LocalBlob(self, name)
+
+
+class LocalStorageClient:
+    """Stand-in for google.cloud.storage.Client that serves buckets from directories under root.
+
+    Every read counts its bytes, and can be slowed by a fixed per-request
+    latency plus a per-request bandwidth limit (requests in parallel each
+    get the full bandwidth, as separate connections to GCS do). With
+    fail_after_requests set, every read after that many fails, which
+    simulates a connection that drops partway through a download.
+    """
+
+    def __init__(self, root: Path, latency_seconds: float = 0.0, bandwidth_bytes_per_second: float = None,
+                 fail_after_requests: int = None):
+        self.root = Path(root)
+        self.latency_seconds = latency_seconds
+        self.bandwidth_bytes_per_second = bandwidth_bytes_per_second
+        self.fail_after_requests = fail_after_requests
+        self.requests = 0
+        self.bytes_served = 0
+        self.__lock = threading.Lock()
+        self.__md5_cache = {}
+
+    def bucket(self, name: str) -> LocalBucket:
+        return LocalBucket(self, name)
+
+    def request(self, length: int) -> None:
+        with self.__lock:
+            if self.fail_after_requests is not None and self.requests >= self.fail_after_requests:
+                raise ConnectionError("connection reset by the local storage stand-in")
+            self.requests += 1
+            self.bytes_served += length
+        delay = self.latency_seconds
+        if self.bandwidth_bytes_per_second:
+            delay += length / self.bandwidth_bytes_per_second
+        if delay:
+            time.sleep(delay)
+
+    def md5_of(self, path: Path, stat) -> str:
+        key = (str(path), stat.st_mtime_ns, stat.st_size)
+        if key not in self.__md5_cache:
+            digest = hashlib.md5()
+            with open(path, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(block)
+            self.__md5_cache[key] = base64.b64encode(digest.digest()).decode()
+        return self.__md5_cache[key]
@@ -1,6 +1,11 @@
 # import nessary dependancies
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
+import threading
+import time
 from datetime import datetime
 from pathlib import Path
 
@@ -10,15 +15,163 @@ os.makedirs(Path(LOG_DIR), exist_ok=True)
 
 LOG_FILE = os.path.join(LOG_DIR, f'log__{datetime.now().strftime("%d-%m-%y")}.log ')
 
-# configure logger 
-logging.basicConfig(
-    filename=LOG_FILE,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    level=logging.INFO
-)
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# "queue" hands records to a background writer thread; "sync" writes them in the calling thread
+LOG_MODE = os.environ.get("LOG_MODE", "queue")
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves formatting to the writer thread.
+
+    The stock QueueHandler formats every record in the calling thread so it
+    can be pickled onto a multiprocessing queue. This queue never leaves the
+    process, so the record goes on as it is: the caller pays for creating
+    the record and one queue put, and the message, timestamp and any
+    traceback are formatted by the writer. Objects passed as %-style
+    arguments must therefore not be mutated after the call.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+# writer thread of the current process (queue mode only)
+_listener = None
+
+
+def _file_handler(log_file: str) -> logging.Handler:
+    handler = logging.FileHandler(log_file)
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    return handler
+
+
+def _start_listener(queue_handler: DeferredQueueHandler, file_handler: logging.Handler) -> None:
+    global _listener
+    queue_handler.queue = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(queue_handler.queue, file_handler)
+    _listener.start()
+
+
+def _stop_listener() -> None:
+    global _listener
+    if _listener is not None:
+        # drains the queue before returning
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+def flush_logs() -> None:
+    """Block until every record queued so far is written (no-op in sync mode)."""
+    if _listener is not None:
+        _listener.stop()
+        _listener.start()
+
+
+def configure_logging(mode: str = LOG_MODE, level: str = LOG_LEVEL, log_file: str = LOG_FILE) -> None:
+    """_summary_
+    This function (re)configures the root logger, which every get_logger
+    logger writes through. In "queue" mode records go onto an in-memory
+    queue and a background thread writes them to log_file, so callers never
+    wait for disk; the thread is restarted in forked children (gunicorn and
+    process pool workers) and drained at exit. In "sync" mode the calling
+    thread writes each record, as logging.basicConfig does.
+
+    Args:
+        mode (str): "queue" or "sync".
+        level (str): Root log level, e.g. "INFO" or "DEBUG".
+        log_file (str): File the records are written to.
+    """
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+    _stop_listener()
+
+    if mode == "queue":
+        handler = DeferredQueueHandler(queue.SimpleQueue())
+        _start_listener(handler, _file_handler(log_file))
+    else:
+        handler = _file_handler(log_file)
+    root.addHandler(handler)
+    root.setLevel(level)
+
+
+def _restart_listener_in_child() -> None:
+    # the parent's writer thread does not exist after fork
+    root_handlers = [handler for handler in logging.getLogger().handlers if isinstance(handler, DeferredQueueHandler)]
+    if _listener is not None and root_handlers:
+        _start_listener(root_handlers[0], _listener.handlers[0])
+        # multiprocessing children leave through os._exit, which skips atexit
+        import multiprocessing.util
+        multiprocessing.util.Finalize(None, _stop_listener, exitpriority=0)
+
+
+# like logging.basicConfig, leave a root logger that is already configured alone
+if not logging.getLogger().handlers:
+    configure_logging()
+atexit.register(_stop_listener)
+os.register_at_fork(after_in_child=_restart_listener_in_child)
+
+
+class RateLimitedLogger:
+    """Wraps a logger so that each message template is emitted at most once per interval_seconds,
+    or only on every sample_every-th call when that is set.
+
+    Meant for messages logged per row, per request or per batch. Calls are
+    keyed by their unformatted template, so pass values as %-style arguments
+    rather than in an f-string. A disabled level costs one isEnabledFor check,
+    and the arguments of a suppressed call are never formatted. The next
+    emitted record of a template says how many were suppressed in between.
+    """
+
+    def __init__(self, logger: logging.Logger, interval_seconds: float = 60.0, sample_every: int = None):
+        self.logger = logger
+        self.interval_seconds = interval_seconds
+        self.sample_every = sample_every
+        self.__lock = threading.Lock()
+        # template -> [time of the next allowed emit, calls suppressed since the last emit, calls]
+        self.__templates = {}
+
+    def log(self, level: int, msg: str, *args) -> None:
+        if not self.logger.isEnabledFor(level):
+            return
+        now = time.monotonic()
+        with self.__lock:
+            state = self.__templates.setdefault(msg, [0.0, 0, 0])
+            state[2] += 1
+            if self.sample_every is not None:
+                emit = (state[2] - 1) % self.sample_every == 0
+            else:
+                emit = now >= state[0]
+            if not emit:
+                state[1] += 1
+                return
+            suppressed, state[1] = state[1], 0
+            state[0] = now + self.interval_seconds
+        if suppressed:
+            self.logger.log(level, msg + " (%d similar suppressed)", *args, suppressed)
+        else:
+            self.logger.log(level, msg, *args)
+
+    def debug(self, msg: str, *args) -> None:
+        self.log(logging.DEBUG, msg, *args)
+
+    def info(self, msg: str, *args) -> None:
+        self.log(logging.INFO, msg, *args)
+
+    def warning(self, msg: str, *args) -> None:
+        self.log(logging.WARNING, msg, *args)
+
+    def error(self, msg: str, *args) -> None:
+        self.log(logging.ERROR, msg, *args)
+
 
 def get_logger(name):
     """Function to get the logger instance."""
     logger = logging.getLogger(name)
-    logger.setLevel(logging.INFO)
-    return logger
\ No newline at end of file
+    logger.setLevel(logging.NOTSET)
+    return logger
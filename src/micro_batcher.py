@@ -0,0 +1,145 @@
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+import numpy as np
+
+from src.logger import get_logger, RateLimitedLogger
+
+logger_obj = get_logger(__name__)
+# a failing model fails every batch; keep that from flooding the log
+failure_logger = RateLimitedLogger(logger_obj, interval_seconds=10.0)
+# one flush in a thousand when debugging
+flush_logger = RateLimitedLogger(logger_obj, sample_every=1000)
+
+
+class MicroBatcher:
+    """Coalesce concurrent single-row predictions into batched model calls.
+
+    Callers submit one feature row and block until their row of the batched
+    result is ready. A background thread flushes the queue as one matrix when
+    either `max_batch_size` rows are waiting or the oldest row has waited
+    `max_wait_ms` milliseconds.
+
+    A row may be submitted with its own predict_fn, e.g. the predict_proba of
+    the model snapshot its request encoded the row for. A flush scores the
+    rows of each predict_fn in one call, so a model swapped in while rows are
+    queued never scores rows encoded for the previous one.
+    """
+
+    # upper bounds of the batch size histogram buckets
+    BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+
+    def __init__(self, predict_fn, max_batch_size: int = 32, max_wait_ms: float = 2.0, latency_window: int = 1024):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+
+        self.__queue = queue.Queue()
+        self.__stats_lock = threading.Lock()
+        self.__batch_size_histogram = {bucket: 0 for bucket in self.BATCH_SIZE_BUCKETS}
+        self.__batch_size_histogram["+Inf"] = 0
+        self.__flush_latencies_ms = deque(maxlen=latency_window)
+        self.__batches = 0
+        self.__rows = 0
+        self.__errors = 0
+
+        self.__worker = threading.Thread(target=self.__run, name="micro-batcher", daemon=True)
+        self.__worker.start()
+        logger_obj.info(f"[MicroBatcher] : Started with max_batch_size={self.max_batch_size}, max_wait_ms={max_wait_ms}")
+
+    def submit(self, row, predict_fn=None) -> Future:
+        """Queue a single feature row, scored by predict_fn (default: the batcher's), and return a Future for its prediction."""
+        future = Future()
+        self.__queue.put((np.asarray(row, dtype=np.float32).ravel(), future, predict_fn or self.predict_fn))
+        return future
+
+    def predict(self, row, predict_fn=None, timeout: float = None):
+        """Queue a single feature row and block until its prediction is ready."""
+        return self.submit(row, predict_fn).result(timeout=timeout)
+
+    def __collect_batch(self):
+        # block for the first row, then gather more until the batch is full or the deadline passes
+        batch = [self.__queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                if remaining <= 0:
+                    batch.append(self.__queue.get_nowait())
+                else:
+                    batch.append(self.__queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def __run(self):
+        while True:
+            # rows queued for different models (across a swap) are scored separately
+            groups = {}
+            for row, future, predict_fn in self.__collect_batch():
+                rows, futures = groups.setdefault(predict_fn, ([], []))
+                rows.append(row)
+                futures.append(future)
+            for predict_fn, (rows, futures) in groups.items():
+                self.__flush(predict_fn, rows, futures)
+
+    def __flush(self, predict_fn, rows: list, futures: list):
+        start = time.perf_counter()
+        try:
+            results = predict_fn(np.ascontiguousarray(np.vstack(rows)))
+        except Exception as e:
+            failure_logger.error("[MicroBatcher] : Batch of %d rows failed: %s", len(rows), e)
+            for future in futures:
+                future.set_exception(e)
+            with self.__stats_lock:
+                self.__errors += 1
+            return
+        flush_ms = (time.perf_counter() - start) * 1000.0
+
+        for i, future in enumerate(futures):
+            future.set_result(results[i])
+        self.__record_flush(len(rows), flush_ms)
+        flush_logger.debug("[MicroBatcher] : Flushed %d rows in %.3f ms", len(rows), flush_ms)
+
+    def __record_flush(self, batch_size: int, flush_ms: float):
+        with self.__stats_lock:
+            self.__batches += 1
+            self.__rows += batch_size
+            self.__flush_latencies_ms.append(flush_ms)
+            for bucket in self.BATCH_SIZE_BUCKETS:
+                if batch_size <= bucket:
+                    self.__batch_size_histogram[bucket] += 1
+                    break
+            else:
+                self.__batch_size_histogram["+Inf"] += 1
+
+    def stats(self) -> dict:
+        """Return queue depth, batch size histogram and flush latency summary."""
+        with self.__stats_lock:
+            latencies = np.array(self.__flush_latencies_ms, dtype=np.float64)
+            histogram = {str(bucket): count for bucket, count in self.__batch_size_histogram.items()}
+            batches, rows, errors = self.__batches, self.__rows, self.__errors
+
+        flush_latency_ms = {"count": int(latencies.size)}
+        if latencies.size:
+            flush_latency_ms.update({
+                "mean": float(latencies.mean()),
+                "p50": float(np.percentile(latencies, 50)),
+                "p99": float(np.percentile(latencies, 99)),
+                "max": float(latencies.max()),
+            })
+
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "queue_depth": self.__queue.qsize(),
+            "batches": batches,
+            "rows": rows,
+            "errors": errors,
+            "mean_batch_size": rows / batches if batches else 0.0,
+            "batch_size_histogram": histogram,
+            "flush_latency_ms": flush_latency_ms,
+        }
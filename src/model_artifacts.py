@@ -0,0 +1,173 @@
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from config.path_config import MODEL_OUTPUT_PATH, COMPILED_MODEL_DIR, MODEL_METADATA_PATH, MODEL_TRANSFORMER_PATH
+
+# Serving formats understood by load_model
+MODEL_FORMATS = ("pickle", "native")
+
+
+def file_sha256(path: Path) -> str:
+    """Return the hex sha256 digest of a file, read in 1 MiB blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def write_model_metadata(path: Path, native_model_path: Path, feature_names: list, classes: list,
+                         label_mappings: dict, log1p_columns: list) -> dict:
+    """Write the JSON sidecar describing the native booster artifact."""
+    metadata = {
+        "model_file": Path(native_model_path).name,
+        "model_version": file_sha256(native_model_path)[:12],
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "feature_names": list(feature_names),
+        "classes": [int(c) for c in classes],
+        "label_mappings": label_mappings,
+        "log1p_columns": list(log1p_columns),
+    }
+    # renamed into place: serving processes watch this file to pick up a new native model
+    with open(f"{path}.tmp", "w") as f:
+        json.dump(metadata, f, indent=2)
+    os.replace(f"{path}.tmp", path)
+    return metadata
+
+
+def read_model_metadata(path: Path = MODEL_METADATA_PATH) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+class LazyModel:
+    """Compiled model that is memory-mapped on first use.
+
+    The node arrays are opened with np.load(mmap_mode="r"), so every worker
+    process maps the same page-cache copy of the model instead of holding a
+    private unpickled object graph. Nothing heavier than NumPy is imported.
+    """
+
+    def __init__(self, compiled_model_dir: Path = COMPILED_MODEL_DIR, metadata_path: Path = MODEL_METADATA_PATH):
+        self.compiled_model_dir = compiled_model_dir
+        self.metadata_path = metadata_path
+        self.__model = None
+        self.__metadata = None
+        self.__lock = threading.Lock()
+
+    def __load(self):
+        with self.__lock:
+            if self.__model is None:
+                from src.tree_compiler import CompiledTreeModel
+
+                self.__metadata = read_model_metadata(self.metadata_path)
+                self.__model = CompiledTreeModel.load(self.compiled_model_dir, mmap_mode="r")
+        return self.__model
+
+    @property
+    def model(self):
+        return self.__model if self.__model is not None else self.__load()
+
+    @property
+    def metadata(self) -> dict:
+        self.model
+        return self.__metadata
+
+    @property
+    def classes_(self):
+        return self.model.classes_
+
+    def predict(self, features, **kwargs):
+        return self.model.predict(features)
+
+    def predict_proba(self, features, **kwargs):
+        return self.model.predict_proba(features)
+
+
+class BoosterClassifier:
+    """The parts of LGBMClassifier the pipeline and the servers use, around a Booster from lgb.train.
+
+    Out-of-core training builds its model with lgb.train on a streamed
+    Dataset, which LGBMClassifier.fit cannot take; this wrapper gives that
+    booster the same predict/predict_proba/classes_/booster_ surface so it
+    can be evaluated, pickled and compiled like the in-memory model.
+
+    It lives here rather than in src/out_of_core.py because its pickles
+    (out-of-core models and refitted incremental ones) name this module, and
+    the serving image copies this one; loading it needs lightgbm but not
+    pandas or the training modules.
+    """
+
+    def __init__(self, booster, classes, params: dict):
+        self._Booster = booster
+        self.classes_ = np.asarray(classes)
+        self.params = dict(params)
+
+    @property
+    def booster_(self):
+        return self._Booster
+
+    @property
+    def feature_name_(self) -> list:
+        return self._Booster.feature_name()
+
+    @property
+    def n_features_in_(self) -> int:
+        return self._Booster.num_feature()
+
+    def predict_proba(self, X, **kwargs) -> np.ndarray:
+        positive = self._Booster.predict(X, **kwargs)
+        return np.vstack((1.0 - positive, positive)).transpose()
+
+    def predict(self, X, **kwargs) -> np.ndarray:
+        return self.classes_[self.predict_proba(X, **kwargs).argmax(axis=1)]
+
+    def get_params(self, deep: bool = True) -> dict:
+        return dict(self.params)
+
+
+def get_model_version(model_format: str = "pickle", model_path: Path = MODEL_OUTPUT_PATH,
+                      metadata_path: Path = MODEL_METADATA_PATH, transformer_path: Path = MODEL_TRANSFORMER_PATH) -> str:
+    """Return a short content hash identifying the model artifact being served.
+
+    The feature transformer saved with the model is part of the version, so a
+    model is never served (or its predictions cached) under the version of a
+    different transformer.
+    """
+    if model_format == "native":
+        version = read_model_metadata(metadata_path)["model_version"]
+    else:
+        version = file_sha256(model_path)[:12]
+    if Path(transformer_path).exists():
+        version = f"{version}-{file_sha256(transformer_path)[:8]}"
+    return version
+
+
+def load_model(model_format: str = "pickle", model_path: Path = MODEL_OUTPUT_PATH):
+    """Load the serving model in the requested format.
+
+    "pickle" unpickles the full LGBMClassifier with joblib; "native" returns a
+    LazyModel over the memory-mapped compiled arrays and metadata sidecar.
+    """
+    if model_format == "pickle":
+        import joblib
+
+        return joblib.load(model_path)
+    if model_format == "native":
+        return LazyModel()
+    raise ValueError(f"Unknown model format '{model_format}', expected one of {MODEL_FORMATS}")
+
+
+def load_feature_transformer(path: Path = MODEL_TRANSFORMER_PATH):
+    """Load the FeatureTransformer saved with the model, or None for models trained without one."""
+    if not Path(path).exists():
+        return None
+    from src.feature_transformer import FeatureTransformer
+
+    return FeatureTransformer.load(path)
@@ -0,0 +1,223 @@
+import fcntl
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from config.path_config import MODEL_OUTPUT_PATH, MODEL_METADATA_PATH, MODEL_TRANSFORMER_PATH
+from src.logger import get_logger
+from src.custom_exception import CustomException
+from src.model_artifacts import load_model, get_model_version, load_feature_transformer
+
+logger_obj = get_logger(__name__)
+
+# rows scored by a freshly loaded model before it is swapped in
+WARMUP_ROWS = 64
+
+
+class ServedModel:
+    """One loaded model together with the transformer and version it is served with.
+
+    Handlers read the reloader's current ServedModel once per request and use
+    it throughout, so a request that started before a swap finishes on the
+    model it started with.
+    """
+
+    __slots__ = ("model", "transformer", "version", "model_format", "loaded_at", "load_seconds")
+
+    def __init__(self, model, transformer, version: str, model_format: str, load_seconds: float = 0.0):
+        self.model = model
+        self.transformer = transformer
+        self.version = version
+        self.model_format = model_format
+        self.loaded_at = datetime.now().isoformat(timespec="seconds")
+        self.load_seconds = load_seconds
+
+
+class ModelReloader:
+    """Loads the serving model and swaps in new versions while the server keeps running.
+
+    reload() loads the artifact in the calling thread, scores a few warm-up
+    rows with it and then replaces the current ServedModel with a single
+    reference assignment; nothing waits on in-flight requests. The watcher
+    thread started by start_watching() polls the artifact (the pickle, or the
+    metadata sidecar for the native format) and the feature transformer saved
+    with it, and reloads once they have stopped changing for one poll. The
+    version covers both files; a reload that sees it change while loading
+    fails, and the watcher retries once the files settle.
+
+    Worker processes of one server share lock_path and reload one at a time,
+    so a new version costs at most one extra model's memory on the host
+    instead of doubling every worker at once. The old model is freed when the
+    last request holding it finishes.
+    """
+
+    def __init__(self, model_format: str = "pickle", lock_path: str = None, on_swap=None):
+        self.model_format = model_format
+        self.watch_path = Path(MODEL_OUTPUT_PATH if model_format == "pickle" else MODEL_METADATA_PATH)
+        self.lock_path = lock_path or os.path.join(tempfile.gettempdir(), "model_reload.lock")
+        self.on_swap = on_swap
+        self.current = None
+
+        self.__reload_lock = threading.Lock()
+        self.__stop = threading.Event()
+        self.__watcher = None
+        self.__poll_seconds = None
+        self.__counters = {"reloads": 0, "unchanged": 0, "failures": 0}
+        self.__last_reload = None
+        self.__last_error = None
+        # a forked worker gets fresh locks and its own watcher
+        os.register_at_fork(after_in_child=self.__after_fork)
+
+    def __after_fork(self):
+        self.__reload_lock = threading.Lock()
+        self.__stop = threading.Event()
+        self.__watcher = None
+        if self.__poll_seconds:
+            self.start_watching(self.__poll_seconds)
+
+    def swap(self, served_model: ServedModel) -> None:
+        """Make served_model the one new requests use."""
+        self.current = served_model
+        if self.on_swap is not None:
+            self.on_swap(served_model)
+
+    def reload(self, force: bool = False) -> dict:
+        """Load, warm up and swap in the artifact on disk, unless it is the version already served.
+
+        Returns:
+            dict: Outcome ("reloaded" or "unchanged"), versions and the
+            lock wait, load, warm-up and swap times in seconds.
+        """
+        with self.__reload_lock:
+            start = time.perf_counter()
+            old_version = self.current.version if self.current is not None else None
+            try:
+                # serialize reloads across the worker processes of this host
+                with open(self.lock_path, "a") as lock:
+                    fcntl.flock(lock, fcntl.LOCK_EX)
+                    lock_wait = time.perf_counter() - start
+
+                    version = get_model_version(self.model_format)
+                    if version == old_version and not force:
+                        self.__counters["unchanged"] += 1
+                        return {"outcome": "unchanged", "version": version}
+
+                    load_start = time.perf_counter()
+                    model = load_model(self.model_format)
+                    transformer = load_feature_transformer()
+                    load_seconds = time.perf_counter() - load_start
+                    if get_model_version(self.model_format) != version:
+                        raise CustomException("Model artifacts changed while they were loaded")
+
+                    warmup_start = time.perf_counter()
+                    self.__warm_up(model, transformer)
+                    warmup_seconds = time.perf_counter() - warmup_start
+
+                    served_model = ServedModel(model, transformer, version, self.model_format, load_seconds)
+                    swap_start = time.perf_counter()
+                    self.current = served_model
+                    swap_seconds = time.perf_counter() - swap_start
+                    # the old model has no reference cycles, so it is freed by reference counting
+                    # as its last request finishes; a gc.collect() here would stall every request
+                    locked_seconds = time.perf_counter() - start - lock_wait
+                if self.on_swap is not None:
+                    self.on_swap(served_model)
+            except Exception as e:
+                self.__counters["failures"] += 1
+                self.__last_error = str(e)
+                logger_obj.exception(f"[ModelReloader] : Reload failed, still serving {old_version}: {e}")
+                raise CustomException("Failed to reload model", e)
+
+            self.__counters["reloads"] += 1
+            self.__last_reload = {
+                "outcome": "reloaded",
+                "previous_version": old_version,
+                "version": version,
+                "lock_wait_seconds": lock_wait,
+                "load_seconds": load_seconds,
+                "warmup_seconds": warmup_seconds,
+                "swap_seconds": swap_seconds,
+                "locked_seconds": locked_seconds,
+                "total_seconds": time.perf_counter() - start,
+            }
+            logger_obj.info(f"[ModelReloader] : Swapped {old_version} for {version} (load {load_seconds:.3f}s, "
+                            f"warm-up {warmup_seconds:.3f}s, waited {lock_wait:.3f}s for other workers)")
+            return dict(self.__last_reload)
+
+    def __warm_up(self, model, transformer):
+        """Score WARMUP_ROWS rows so lazy loading and first-call setup happen before the swap."""
+        if transformer is not None:
+            n_features = len(transformer.feature_names)
+        elif self.model_format == "native":
+            n_features = len(model.metadata["feature_names"])
+        else:
+            n_features = model.n_features_in_
+        features = np.random.default_rng(0).normal(size=(WARMUP_ROWS, n_features)).astype(np.float32)
+        probabilities = model.predict_proba(features)
+        if probabilities.shape != (WARMUP_ROWS, len(model.classes_)) or not np.isfinite(probabilities).all():
+            raise CustomException(f"Warm-up predictions have shape {probabilities.shape} or are not finite")
+
+    def __signature(self):
+        try:
+            stat = os.stat(self.watch_path)
+        except FileNotFoundError:
+            return None
+        try:
+            transformer_stat = os.stat(MODEL_TRANSFORMER_PATH)
+            transformer = transformer_stat.st_ino, transformer_stat.st_size, transformer_stat.st_mtime_ns
+        except FileNotFoundError:
+            transformer = None
+        return stat.st_ino, stat.st_size, stat.st_mtime_ns, transformer
+
+    def __watch(self, poll_seconds: float):
+        seen = self.__signature()
+        pending = None
+        while not self.__stop.wait(poll_seconds):
+            signature = self.__signature()
+            if signature is None or signature == seen:
+                pending = None
+                continue
+            # the artifact must stay unchanged for one poll so a file being written is never loaded
+            if signature != pending:
+                pending = signature
+                continue
+            seen, pending = signature, None
+            try:
+                self.reload()
+            except CustomException:
+                pass
+
+    def start_watching(self, poll_seconds: float) -> None:
+        """Poll the model artifact every poll_seconds on a daemon thread and reload when it changes."""
+        if poll_seconds <= 0 or (self.__watcher is not None and self.__watcher.is_alive()):
+            return
+        self.__poll_seconds = poll_seconds
+        self.__stop.clear()
+        self.__watcher = threading.Thread(target=self.__watch, args=(poll_seconds,), name="model-reloader", daemon=True)
+        self.__watcher.start()
+        logger_obj.info(f"[ModelReloader] : Watching {self.watch_path} every {poll_seconds}s")
+
+    def stop_watching(self) -> None:
+        self.__poll_seconds = None
+        self.__stop.set()
+        if self.__watcher is not None:
+            self.__watcher.join()
+            self.__watcher = None
+
+    def stats(self) -> dict:
+        """Return the served version, reload counters and the timings of the last reload."""
+        current = self.current
+        return {
+            "version": current.version if current is not None else None,
+            "model_format": self.model_format,
+            "loaded_at": current.loaded_at if current is not None else None,
+            "watching": self.__watcher is not None and self.__watcher.is_alive(),
+            **self.__counters,
+            "last_reload": self.__last_reload,
+            "last_error": self.__last_error,
+        }
@@ -1,32 +1,65 @@
 import os 
+import json
+import time
+import numpy as np
 import pandas as pd
-import joblib
-from sklearn.model_selection import RandomizedSearchCV
-import lightgbm as lgb
-from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
-from scipy.stats import randint
-
-import mlflow
-import mlflow.sklearn 
 
 from src.logger import get_logger
 from src.custom_exception import CustomException
+from src.tree_compiler import CompiledTreeModel
+from src.model_artifacts import write_model_metadata, file_sha256
+from src.instrumentation import instrument, record_rows, registry
+from src.feature_transformer import FeatureTransformer
+from src.incremental_training import row_hashes, new_row_mask, feature_drift, read_training_state, write_training_state
 from config.path_config import *
-from config.model_parms import *
 from utils.common_functions import load_data, read_yml_file
 
+# lightgbm, scikit-learn, scipy (through config.model_parms), joblib and mlflow
+# are imported by the methods that use them, so importing this module to run
+# another stage, or to read a constant, does not load them
 
 logger = get_logger(__name__)
 
 class ModelTrainer:
-    def __init__(self, train_data_path: Path, test_data_path: Path, model_output_path: Path):
+    def __init__(self, train_data_path: Path, test_data_path: Path, model_output_path: Path, compiled_model_dir: Path = COMPILED_MODEL_DIR,
+                 native_model_path: Path = NATIVE_MODEL_PATH, model_metadata_path: Path = MODEL_METADATA_PATH,
+                 feature_transformer_path: Path = FEATURE_TRANSFORMER_PATH, model_transformer_path: Path = MODEL_TRANSFORMER_PATH,
+                 training_state_path: Path = TRAINING_STATE_PATH, trained_rows_path: Path = TRAINED_ROWS_PATH,
+                 balancing_report_path: Path = BALANCING_REPORT_PATH):
         self.train_path = train_data_path
         self.test_path = test_data_path
         self.model_output = model_output_path
+        self.compiled_model_dir = compiled_model_dir
+        self.native_model_path = native_model_path
+        self.model_metadata_path = model_metadata_path
+        self.feature_transformer_path = feature_transformer_path
+        self.model_transformer_path = model_transformer_path
+        self.training_state_path = training_state_path
+        self.trained_rows_path = trained_rows_path
+        self.balancing_report_path = balancing_report_path
+        
+        from config import model_parms
         
-        self.parms_distribution = LIGHTGBM_PARAM
-        self.random_search_parms = RANDOM_SEAECH_PARAMS
+        self.parms_distribution = model_parms.LIGHTGBM_PARAM
+        self.random_search_parms = model_parms.RANDOM_SEAECH_PARAMS
+        self.search_mode = model_parms.SEARCH_MODE
+        self.halving_search_parms = model_parms.HALVING_SEARCH_PARAMS
+        self.thread_parms = model_parms.THREAD_PARAMS
+        self.out_of_core_parms = model_parms.OUT_OF_CORE_PARAMS
+        self.incremental_parms = model_parms.INCREMENTAL_PARAMS
+        # shard directories (data_processing.storage_mode: sharded) are streamed instead of loaded
+        self.out_of_core = os.path.isdir(self.train_path)
+        # with class weighting the training split is left imbalanced and LightGBM reweights the classes
+        self.balancing_parms = balancing = read_yml_file(CONFIG_PATH).get("data_processing", {}).get("balancing", {})
+        self.class_weight_parms = {'is_unbalance': True} if balancing.get("strategy") == "class_weight" else {}
+        # counters of the last hyperparameter search, logged to MLflow
+        self.search_summary = {}
+        # "full" or "incremental", and the checks and timings behind the choice, logged to MLflow
+        self.training_mode = "full"
+        self.full_retrain_reason = None
+        self.incremental_summary = {}
         
+    @instrument("ModelTrainer.load_and_split_data")
     def load_and_split_data(self):
         try:
             logger.info(f"[ModelTrainer] Loading training data from {self.train_path}")
@@ -47,11 +80,25 @@ class ModelTrainer:
             logger.exception(f"[ModelTrainer] Error in loading and splitting data: {e}")
             raise CustomException("Failed to load and split data", e)
         
+    @instrument("ModelTrainer.train_model")
     def train_model(self, X_train, y_train):
+        record_rows(len(X_train))
+        if self.search_mode == "halving":
+            return self.train_model_with_halving(X_train, y_train)
+        if self.random_search_parms.get('prebinned'):
+            return self.train_model_with_prebinned_search(X_train, y_train)
         try:
+            import lightgbm as lgb
+            from sklearn.model_selection import RandomizedSearchCV
+            from src.hyperparameter_search import resolve_thread_split
+            
+            cv_jobs, lgbm_threads = resolve_thread_split(self.random_search_parms['cv'], **self.thread_parms)
+            
             logger.info(f"[ModelTrainer] Initializing LightGBM classifier")
             lgbm_model = lgb.LGBMClassifier(
-                random_state=self.random_search_parms['random_state']
+                random_state=self.random_search_parms['random_state'],
+                n_jobs=lgbm_threads,
+                **self.class_weight_parms
             )
             
             logger.info(f"[ModelTrainer] Starting Randomized Search CV for hyperparameter tuning")
@@ -62,13 +109,24 @@ class ModelTrainer:
                 random_state=self.random_search_parms['random_state'],
                 cv=self.random_search_parms['cv'],
                 verbose=self.random_search_parms['verbose'],
-                n_jobs=self.random_search_parms['n_jobs'],
+                n_jobs=cv_jobs,
                 scoring=self.random_search_parms['scoring']
             )
             
             logger.info(f"[ModelTrainer] Fitting Randomized Search CV")
+            start = time.perf_counter()
             random_search.fit(X_train, y_train)
             
+            # every candidate trains all of its trees on every fold
+            tree_fits = sum(params['n_estimators'] for params in random_search.cv_results_['params']) * self.random_search_parms['cv']
+            self.search_summary = {
+                "search_best_cv_accuracy": random_search.best_score_,
+                "search_tree_fits": tree_fits,
+                "search_exhaustive_tree_fits": tree_fits,
+                "search_tree_fits_saved_ratio": 0.0,
+                "search_seconds": time.perf_counter() - start,
+            }
+            
             best_params = random_search.best_params_
             logger.info(f"[ModelTrainer] Best hyperparameters found: {best_params}")
             best_model = random_search.best_estimator_
@@ -79,66 +137,460 @@ class ModelTrainer:
             logger.exception(f"[ModelTrainer] Error in model training: {e}")
             raise CustomException("Failed to train model", e)
         
+    def train_model_with_prebinned_search(self, X_train, y_train):
+        try:
+            import lightgbm as lgb
+            from src.hyperparameter_search import PrebinnedRandomSearch
+            
+            logger.info(f"[ModelTrainer] Starting randomized search on prebinned CV folds")
+            search = PrebinnedRandomSearch(
+                param_distributions=self.parms_distribution,
+                n_iter=self.random_search_parms['n_iter'],
+                cv=self.random_search_parms['cv'],
+                random_state=self.random_search_parms['random_state'],
+                base_params=self.class_weight_parms,
+                **self.thread_parms
+            )
+            search.fit(X_train, y_train)
+            self.search_summary = search.summary()
+            logger.info(f"[ModelTrainer] Best hyperparameters found: {search.best_params_}")
+            
+            logger.info(f"[ModelTrainer] Refitting best candidate on the full training set")
+            best_model = lgb.LGBMClassifier(
+                random_state=self.random_search_parms['random_state'],
+                **self.class_weight_parms,
+                **search.best_params_
+            )
+            best_model.fit(X_train, y_train)
+            
+            logger.info("[ModelTrainer] Completing model training")
+            return best_model
+        except Exception as e:
+            logger.exception(f"[ModelTrainer] Error in model training: {e}")
+            raise CustomException("Failed to train model", e)
+        
+    def train_model_with_halving(self, X_train, y_train):
+        try:
+            import lightgbm as lgb
+            from src.hyperparameter_search import SuccessiveHalvingSearch
+            
+            logger.info(f"[ModelTrainer] Starting successive halving search with early stopping")
+            search = SuccessiveHalvingSearch(
+                param_distributions=self.parms_distribution,
+                **self.halving_search_parms,
+                **self.thread_parms,
+                base_params=self.class_weight_parms
+            )
+            search.fit(X_train, y_train)
+            self.search_summary = search.summary()
+            logger.info(f"[ModelTrainer] Best hyperparameters found: {search.best_params_}")
+            
+            logger.info(f"[ModelTrainer] Refitting best candidate on the full training set")
+            best_model = lgb.LGBMClassifier(
+                random_state=self.halving_search_parms['random_state'],
+                **self.class_weight_parms,
+                **search.best_params_
+            )
+            best_model.fit(X_train, y_train)
+            
+            logger.info("[ModelTrainer] Completing model training")
+            return best_model
+        except Exception as e:
+            logger.exception(f"[ModelTrainer] Error in model training: {e}")
+            raise CustomException("Failed to train model", e)
+        
+    def original_rows(self, n_rows: int):
+        """Return how many leading rows of the processed training split are real, or None when unknown.
+
+        Balancing appends its rows after the real ones, and oversampling or
+        SMOTE regenerates them on every processing run, so only the real rows
+        can be compared with the rows a previous model was trained on.
+        """
+        if not os.path.exists(self.balancing_report_path):
+            return None
+        with open(self.balancing_report_path) as f:
+            report = json.load(f)
+        if report["original_rows"] + report["added_rows"] != n_rows:
+            return None
+        return report["original_rows"]
+        
+    def balance_new_rows(self, X_new, y_new) -> tuple:
+        """Balance the new real rows on their own, with the strategy processing balanced the full split with."""
+        from src.balancing import Balancer
+        
+        if len(X_new) == 0:
+            return X_new, y_new
+        balancer = Balancer(
+            strategy=self.balancing_parms.get("strategy", "smote"),
+            k_neighbors=self.balancing_parms.get("k_neighbors", 5),
+            block_size=self.balancing_parms.get("block_size", 4096),
+            random_state=42
+        )
+        X_extra, y_extra = balancer.extra_rows(X_new.to_numpy(dtype=np.float32), y_new.to_numpy())
+        extra_rows = pd.DataFrame(X_extra, columns=X_new.columns).astype(X_new.dtypes.to_dict())
+        return (pd.concat([X_new, extra_rows], ignore_index=True),
+                pd.concat([y_new, pd.Series(y_extra, name=y_new.name).astype(y_new.dtype)], ignore_index=True))
+        
+    def incremental_plan(self, X_train, y_train) -> tuple:
+        """Return (previous model, new row mask) when warm-starting is safe, otherwise (None, reason).
+
+        X_train and y_train are the real rows of the training split, without the rows balancing added.
+        """
+        import joblib
+        from sklearn.metrics import accuracy_score
+        
+        parms = self.incremental_parms
+        state, trained_hashes = read_training_state(self.training_state_path, self.trained_rows_path)
+        if state is None or not os.path.exists(self.model_output) or not os.path.exists(self.model_transformer_path):
+            return None, "no previous training state"
+        if state["model_version"] != file_sha256(self.model_output)[:12]:
+            return None, "saved model was not written by the run that recorded the training state"
+        # the encodings and log1p columns must be the ones the previous model was trained with
+        if FeatureTransformer.load(self.model_transformer_path).to_dict() != FeatureTransformer.load(self.feature_transformer_path).to_dict():
+            return None, "feature transformer changed"
         
+        previous = joblib.load(self.model_output)
+        if list(previous.feature_name_) != list(X_train.columns):
+            return None, "selected features changed"
+        if parms['strategy'] == 'continue':
+            if previous.get_params().get('boosting_type') == 'dart':
+                return None, "dart models are not continued"
+            if previous.booster_.num_trees() + parms['extra_rounds'] > parms['max_total_trees']:
+                return None, f"model would exceed {parms['max_total_trees']} trees"
+        
+        is_new = new_row_mask(X_train, y_train, trained_hashes)
+        new_rows = int(is_new.sum())
+        self.incremental_summary = {"incremental.new_rows": new_rows, "incremental.previous_trees": previous.booster_.num_trees(),
+                                    "incremental.previous_test_accuracy": state["test_accuracy"]}
+        if new_rows > parms['max_new_row_fraction'] * len(X_train):
+            return None, f"{new_rows} of {len(X_train)} training rows are new"
+        if new_rows:
+            drift = feature_drift(X_train[~is_new], X_train[is_new])
+            drifted = max(drift, key=drift.get)
+            # the previous model has not seen these rows, so this is an unbiased estimate of its accuracy on them,
+            # comparable with its accuracy on the test rows it had not seen either
+            accuracy = accuracy_score(y_true=y_train[is_new], y_pred=previous.predict(X_train[is_new]))
+            baseline = state.get("unseen_test_accuracy") or state["test_accuracy"]
+            self.incremental_summary.update({
+                "incremental.max_feature_psi": drift[drifted],
+                "incremental.previous_accuracy_on_new_rows": accuracy,
+                "incremental.previous_unseen_test_accuracy": baseline,
+            })
+            logger.info(f"[ModelTrainer] {new_rows} new rows: largest feature PSI {drift[drifted]:.3f} ({drifted}), "
+                        f"previous model accuracy {accuracy:.4f} against {baseline:.4f} on its unseen test rows")
+            if drift[drifted] > parms['max_feature_psi']:
+                return None, f"feature {drifted} drifted (PSI {drift[drifted]:.3f})"
+            if baseline - accuracy > parms['max_accuracy_drop']:
+                return None, f"previous model accuracy on new rows dropped to {accuracy:.4f}"
+        return previous, is_new
+        
+    def warm_start(self, previous, X_new, y_new):
+        """Continue boosting, or refit the leaves of, the previous model on the new rows."""
+        import lightgbm as lgb
+        from src.model_artifacts import BoosterClassifier
+        
+        if len(X_new) == 0:
+            logger.info("[ModelTrainer] No new training rows, keeping the previous model")
+            return previous
+        params = previous.get_params()
+        if self.incremental_parms['strategy'] == 'refit':
+            logger.info(f"[ModelTrainer] Refitting the leaves of {previous.booster_.num_trees()} trees on {len(X_new)} new rows")
+            booster = previous.booster_.refit(X_new, np.searchsorted(previous.classes_, y_new),
+                                              decay_rate=self.incremental_parms['refit_decay_rate'])
+            return BoosterClassifier(booster, classes=previous.classes_, params=params)
+        
+        logger.info(f"[ModelTrainer] Boosting {self.incremental_parms['extra_rounds']} more rounds on {len(X_new)} new rows")
+        # a few small steps: the new rows alone are too few to take full-size steps on without overfitting them
+        model = lgb.LGBMClassifier(**{**params, 'n_estimators': self.incremental_parms['extra_rounds'],
+                                      'learning_rate': params['learning_rate'] * self.incremental_parms['learning_rate_scale']})
+        model.fit(X_new, y_new, init_model=previous.booster_)
+        # the booster holds the previous trees too; a retrain from these params must build all of them
+        model.set_params(n_estimators=model.booster_.num_trees(), learning_rate=params['learning_rate'])
+        return model
+        
+    @instrument("ModelTrainer.train_model_incremental")
+    def train_model_incremental(self, X_train, y_train, X_test, y_test) -> tuple:
+        """_summary_
+        This function warm-starts from the saved model on the real training
+        rows it has not seen, balanced on their own. It runs the full retrain with the hyperparameter search
+        instead when incremental_plan finds no compatible model or a failed
+        drift or accuracy check, or when the warm-started model's test
+        accuracy ends up more than max_accuracy_drop below the previous one's.
+        With compare_with_full_retrain a model is also fitted from scratch with
+        the same hyperparameters on every row, and the wall time and metrics
+        of both end up in incremental_summary.
+
+        Returns:
+            tuple: (model, metrics DataFrame) of the model to save.
+        """
+        try:
+            import lightgbm as lgb
+            
+            original_rows = self.original_rows(len(X_train))
+            if original_rows is None:
+                previous, plan = None, "no balancing report matching the processed training data"
+            else:
+                previous, plan = self.incremental_plan(X_train[:original_rows], y_train[:original_rows])
+            if previous is not None:
+                start = time.perf_counter()
+                try:
+                    X_new, y_new = self.balance_new_rows(X_train[:original_rows][plan], y_train[:original_rows][plan])
+                except Exception as e:
+                    previous, plan = None, f"new rows could not be balanced: {e}"
+            if previous is not None:
+                self.training_mode = "incremental"
+                self.incremental_summary["incremental.balanced_new_rows"] = len(X_new)
+                model = self.warm_start(previous, X_new, y_new)
+                self.incremental_summary["incremental.seconds"] = time.perf_counter() - start
+                metrics_df = self.evaluate_model(model, X_test, y_test)
+                self.incremental_summary.update({f"incremental.{name}": value for name, value in metrics_df.iloc[0].items()})
+                self.incremental_summary["incremental.trees"] = model.booster_.num_trees()
+                
+                accuracy_drop = self.incremental_summary["incremental.previous_test_accuracy"] - metrics_df.iloc[0]["accuracy"]
+                if accuracy_drop > self.incremental_parms['max_accuracy_drop']:
+                    previous, plan = None, f"warm-started model lost {accuracy_drop:.4f} test accuracy"
+            if previous is None:
+                logger.info(f"[ModelTrainer] Running a full retrain instead of an incremental one: {plan}")
+                self.training_mode, self.full_retrain_reason = "full", plan
+                model = self.train_model(X_train, y_train)
+                return model, self.evaluate_model(model, X_test, y_test)
+            
+            if self.incremental_parms['compare_with_full_retrain']:
+                logger.info(f"[ModelTrainer] Fitting {len(X_train)} rows from scratch for comparison")
+                start = time.perf_counter()
+                full_model = lgb.LGBMClassifier(**model.get_params()).fit(X_train, y_train)
+                self.incremental_summary["full_retrain.seconds"] = time.perf_counter() - start
+                full_metrics = self.evaluate_model(full_model, X_test, y_test)
+                self.incremental_summary.update({f"full_retrain.{name}": value for name, value in full_metrics.iloc[0].items()})
+            
+            logger.info(f"[ModelTrainer] Incremental training summary: {self.incremental_summary}")
+            return model, metrics_df
+        except Exception as e:
+            logger.exception(f"[ModelTrainer] Error in incremental model training: {e}")
+            raise CustomException("Failed to train model incrementally", e)
+        
+    def save_training_state(self, model, X_train, y_train, metrics_df, X_test, y_test) -> None:
+        from sklearn.metrics import accuracy_score
+        
+        try:
+            hashes = row_hashes(X_train, y_train)
+            # test rows that duplicate training rows are scored far better than new rows would be
+            unseen = new_row_mask(X_test, y_test, hashes)
+            state = {
+                "model_version": file_sha256(self.model_output)[:12],
+                "mode": self.training_mode,
+                "trained_rows": len(X_train),
+                "num_trees": model.booster_.num_trees(),
+                "test_accuracy": float(metrics_df.iloc[0]["accuracy"]),
+                "unseen_test_rows": int(unseen.sum()),
+                "unseen_test_accuracy": float(accuracy_score(y_true=y_test[unseen], y_pred=model.predict(X_test[unseen]))) if unseen.any() else None,
+                "saved_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            }
+            write_training_state(self.training_state_path, self.trained_rows_path, state, hashes)
+        except Exception as e:
+            logger.exception(f"[ModelTrainer] Error in saving training state: {e}")
+            raise CustomException("Failed to save training state", e)
+        
+    @instrument("ModelTrainer.evaluate_model")
     def evaluate_model(self, model, X_test, y_test) -> pd.DataFrame:
         try:
             logger.info(f"[ModelTrainer] Evaluating model performance on test data")
             y_pred = model.predict(X_test)
+            return self.score_predictions(y_test, y_pred)
+        except Exception as e:
+            logger.exception(f"[ModelTrainer] Error in model evaluation: {e}")
+            raise CustomException("Failed to evaluate model", e)
+        
+    def score_predictions(self, y_test, y_pred) -> pd.DataFrame:
+        from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
+        
+        record_rows(len(y_pred))
+        accuracy = accuracy_score(y_pred=y_pred, y_true=y_test)
+        logger.info(f"[ModelTrainer] Accuracy: {accuracy}")
+        precision = precision_score(y_pred=y_pred, y_true=y_test)
+        logger.info(f"[ModelTrainer] Precision: {precision}")
+        recall = recall_score(y_pred=y_pred, y_true=y_test)
+        logger.info(f"[ModelTrainer] Recall: {recall}")
+        f1 = f1_score(y_pred=y_pred, y_true=y_test)
+        logger.info(f"[ModelTrainer] F1 Score: {f1}")
+        
+        metrics_df = pd.DataFrame([{
+            "accuracy": accuracy,
+            "precision": precision,
+            "recall": recall,
+            "f1_score": f1
+        }])
+        
+        return metrics_df
+        
+    @instrument("ModelTrainer.train_model_out_of_core")
+    def train_model_out_of_core(self):
+        try:
+            import lightgbm as lgb
+            from src.model_artifacts import BoosterClassifier
+            from src.out_of_core import shard_dataset, sample_shards, train_params
+            
+            # the search runs in memory on a bounded sample; only the final fit sees every shard
+            X_sample, y_sample = sample_shards(self.train_path, self.out_of_core_parms['search_sample_rows'],
+                                               random_state=self.random_search_parms['random_state'])
+            logger.info(f"[ModelTrainer] Searching hyperparameters on a {len(X_sample)} row sample of {self.train_path}")
+            searched_model = self.train_model(X_sample, y_sample)
+            
+            params, num_boost_round = train_params(searched_model.get_params())
+            logger.info(f"[ModelTrainer] Training {num_boost_round} rounds on shards streamed from {self.train_path}")
+            dataset = shard_dataset(self.train_path, list(X_sample.columns), params=params,
+                                    batch_size=self.out_of_core_parms['batch_size'])
+            booster = lgb.train(params, dataset, num_boost_round=num_boost_round)
+            record_rows(dataset.num_data())
             
-            accuracy = accuracy_score(y_pred=y_pred, y_true=y_test)
-            logger.info(f"[ModelTrainer] Accuracy: {accuracy}")
-            precision = precision_score(y_pred=y_pred, y_true=y_test)
-            logger.info(f"[ModelTrainer] Precision: {precision}")
-            recall = recall_score(y_pred=y_pred, y_true=y_test)
-            logger.info(f"[ModelTrainer] Recall: {recall}")
-            f1 = f1_score(y_pred=y_pred, y_true=y_test)
-            logger.info(f"[ModelTrainer] F1 Score: {f1}")
-            
-            metrics_df = pd.DataFrame([{
-                "accuracy": accuracy,
-                "precision": precision,
-                "recall": recall,
-                "f1_score": f1
-            }])
-            
-            return metrics_df
+            logger.info("[ModelTrainer] Completing out-of-core model training")
+            return BoosterClassifier(booster, classes=searched_model.classes_, params=searched_model.get_params())
+        except Exception as e:
+            logger.exception(f"[ModelTrainer] Error in out-of-core model training: {e}")
+            raise CustomException("Failed to train model out of core", e)
+        
+    @instrument("ModelTrainer.evaluate_model_out_of_core")
+    def evaluate_model_out_of_core(self, model):
+        """Score the test shards one at a time; returns the metrics and the first shard for the parity check."""
+        try:
+            from src.out_of_core import iter_shards
+            
+            logger.info(f"[ModelTrainer] Evaluating model performance on test shards in {self.test_path}")
+            y_test, y_pred, first_shard = [], [], None
+            for X_shard, y_shard in iter_shards(self.test_path, model.feature_name_):
+                first_shard = X_shard if first_shard is None else first_shard
+                y_test.append(y_shard)
+                y_pred.append(model.predict(X_shard))
+            return self.score_predictions(np.concatenate(y_test), np.concatenate(y_pred)), first_shard
         except Exception as e:
             logger.exception(f"[ModelTrainer] Error in model evaluation: {e}")
             raise CustomException("Failed to evaluate model", e)
         
+    @instrument("ModelTrainer.save_model")
     def save_model(self, model) -> None:
         try:
+            import joblib
+            
             # Ensure the directory exists
             os.makedirs(os.path.dirname(self.model_output), exist_ok=True)
             
             logger.info(f"[ModelTrainer] Saving model ...")
-            joblib.dump(model, self.model_output)
+            # written under a temporary name and renamed, so a serving process watching the file never loads half of it
+            tmp_path = f"{self.model_output}.tmp"
+            joblib.dump(model, tmp_path)
+            os.replace(tmp_path, self.model_output)
             logger.info(f"[ModelTrainer] Model saved at {self.model_output}")
         except Exception as e:
             logger.exception(f"[ModelTrainer] Error in saving model: {e}")
             raise CustomException("Failed to save model", e)
         
+    def save_native_model(self, model) -> None:
+        try:
+            logger.info(f"[ModelTrainer] Saving native LightGBM booster ...")
+            model.booster_.save_model(str(self.native_model_path))
+            
+            # label mappings and log1p columns come from the preprocessing stage's transformer
+            transformer = FeatureTransformer.load(self.feature_transformer_path)
+            metadata = write_model_metadata(
+                path=self.model_metadata_path,
+                native_model_path=self.native_model_path,
+                feature_names=model.feature_name_,
+                classes=model.classes_,
+                label_mappings=transformer.label_mappings,
+                log1p_columns=transformer.log1p_columns_
+            )
+            logger.info(f"[ModelTrainer] Native model version {metadata['model_version']} saved at {self.native_model_path}")
+        except Exception as e:
+            logger.exception(f"[ModelTrainer] Error in saving native model: {e}")
+            raise CustomException("Failed to save native model", e)
+        
+    def save_feature_transformer(self, model) -> None:
+        try:
+            logger.info(f"[ModelTrainer] Saving feature transformer next to the model ...")
+            transformer = FeatureTransformer.load(self.feature_transformer_path)
+            if transformer.feature_names != list(model.feature_name_):
+                raise CustomException(f"Transformer features {transformer.feature_names} do not match model features {model.feature_name_}")
+            
+            transformer.save(self.model_transformer_path)
+            logger.info(f"[ModelTrainer] Feature transformer saved at {self.model_transformer_path}")
+        except Exception as e:
+            logger.exception(f"[ModelTrainer] Error in saving feature transformer: {e}")
+            raise CustomException("Failed to save feature transformer", e)
+        
+    @instrument("ModelTrainer.export_compiled_model")
+    def export_compiled_model(self, model, X_test) -> None:
+        try:
+            logger.info(f"[ModelTrainer] Flattening booster trees into NumPy arrays")
+            compiled_model = CompiledTreeModel.from_booster(model.booster_, classes=model.classes_)
+            
+            # the compiled predictor must reproduce the booster exactly
+            features = np.asarray(X_test, dtype="float32")
+            if not np.array_equal(compiled_model.predict_proba(features, exact=True), model.predict_proba(features)):
+                raise CustomException("Compiled model probabilities differ from the LightGBM booster")
+            
+            compiled_model.save(self.compiled_model_dir)
+            logger.info(f"[ModelTrainer] Compiled model with {compiled_model.meta['num_trees']} trees saved at {self.compiled_model_dir}")
+        except Exception as e:
+            logger.exception(f"[ModelTrainer] Error in exporting compiled model: {e}")
+            raise CustomException("Failed to export compiled model", e)
+        
     def run(self):
         try:
+            import mlflow
+            
             with mlflow.start_run():
                 logger.info(f"[ModelTrainer] Starting model training pipeline")
                 
                 logger.info("[ModelTrainer] Start the model tracking with MLflow...")
                 
                 logger.info(f"[ModelTrainer] Logging the traing & testing dat to MLflow")
-                mlflow.log_artifact(self.train_path, artifact_path="datasets")
-                mlflow.log_artifact(self.test_path, artifact_path="datasets")
-                
-                X_train, y_train, X_test, y_test = self.load_and_split_data()
-                model = self.train_model(X_train, y_train)
-                metrics_df = self.evaluate_model(model, X_test, y_test)
+                if self.out_of_core:
+                    # shards can be far larger than MLflow artifacts should be; log their manifests
+                    mlflow.log_artifact(os.path.join(self.train_path, "manifest.json"), artifact_path="datasets/train_shards")
+                    mlflow.log_artifact(os.path.join(self.test_path, "manifest.json"), artifact_path="datasets/test_shards")
+                    
+                    if self.incremental_parms['enabled']:
+                        self.full_retrain_reason = "out-of-core training has no incremental mode"
+                    model = self.train_model_out_of_core()
+                    metrics_df, X_test = self.evaluate_model_out_of_core(model)
+                else:
+                    mlflow.log_artifact(self.train_path, artifact_path="datasets")
+                    mlflow.log_artifact(self.test_path, artifact_path="datasets")
+                    
+                    X_train, y_train, X_test, y_test = self.load_and_split_data()
+                    if self.incremental_parms['enabled']:
+                        model, metrics_df = self.train_model_incremental(X_train, y_train, X_test, y_test)
+                    else:
+                        model = self.train_model(X_train, y_train)
+                        metrics_df = self.evaluate_model(model, X_test, y_test)
+                # serving processes watch the transformer, the metadata sidecar and the pickle, so the slow
+                # compiled export runs first and the three are replaced right after one another
+                self.export_compiled_model(model, X_test)
+                self.save_feature_transformer(model)
+                self.save_native_model(model)
                 self.save_model(model)
+                if not self.out_of_core:
+                    # the real rows and test accuracy the next incremental run starts from
+                    original_rows = self.original_rows(len(X_train))
+                    if original_rows is None:
+                        logger.warning("[ModelTrainer] No balancing report matches the training data, not saving the training state")
+                    else:
+                        self.save_training_state(model, X_train[:original_rows], y_train[:original_rows], metrics_df, X_test, y_test)
                 
                 logger.info("[ModelTrainer] Logging model to MLflow")
                 mlflow.log_artifact(self.model_output)
                 
                 logger.info("[ModelTrainer] Logging evaluation metrics to MLflow")
                 mlflow.log_metrics(metrics_df.iloc[0].to_dict())
+                if self.search_summary:
+                    mlflow.log_metrics(self.search_summary)
+                mlflow.set_tag("training_mode", self.training_mode)
+                if self.full_retrain_reason:
+                    mlflow.set_tag("full_retrain_reason", self.full_retrain_reason)
+                if self.incremental_summary:
+                    mlflow.log_metrics(self.incremental_summary)
+                # wall/CPU time, peak RSS and rows of every instrumented call made in this process so far
+                mlflow.log_metrics(registry.metrics(prefix="instrumentation."))
                 
                 logger.info("[ModelTrainer] Logging parameters to MLflow")
                 mlflow.log_params(model.get_params())
@@ -0,0 +1,94 @@
+import threading
+
+import numpy as np
+import pandas as pd
+import lightgbm as lgb
+
+from src.logger import get_logger
+# re-exported: models pickled before BoosterClassifier moved still name this module
+from src.model_artifacts import BoosterClassifier  # noqa: F401
+from src.hyperparameter_search import to_native_params
+from utils.common_functions import load_data, read_shard_manifest
+
+logger_obj = get_logger(__name__)
+
+TARGET_COLUMN = "booking_status"
+
+
+class _LastShardCache:
+    """Holds the one shard most recently read as a float64 matrix (what lgb.Sequence sampling requires).
+
+    LightGBM reads a list of Sequences in order (monotonic sampling, then
+    sequential batches), so keeping a single shard bounds memory to one
+    shard without re-reading it for every batch.
+    """
+
+    def __init__(self, columns: list):
+        self.columns = columns
+        self.__path = None
+        self.__data = None
+        self.__lock = threading.Lock()
+
+    def get(self, path) -> np.ndarray:
+        with self.__lock:
+            if path != self.__path:
+                self.__data = None
+                self.__data = load_data(path, columns=self.columns).to_numpy(dtype=np.float64)
+                self.__path = path
+            return self.__data
+
+
+class ShardSequence(lgb.Sequence):
+    """lightgbm.Sequence over one shard file, loaded on first access."""
+
+    def __init__(self, path, rows: int, cache: _LastShardCache, batch_size: int = 65536):
+        self.path = path
+        self.rows = rows
+        self.cache = cache
+        self.batch_size = batch_size
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def __getitem__(self, idx):
+        return self.cache.get(self.path)[idx]
+
+
+def shard_dataset(shard_dir, feature_names: list, params: dict = None, batch_size: int = 65536) -> lgb.Dataset:
+    """Build a LightGBM Dataset that streams the shards in shard_dir one at a time.
+
+    Only the labels (one float per row) are gathered up front; features are
+    binned batch by batch straight from the shard files.
+    """
+    shards = read_shard_manifest(shard_dir)
+    labels = np.concatenate([load_data(path, columns=[TARGET_COLUMN])[TARGET_COLUMN].to_numpy() for path, _ in shards])
+    cache = _LastShardCache(feature_names)
+    sequences = [ShardSequence(path, rows, cache, batch_size) for path, rows in shards]
+    return lgb.Dataset(sequences, label=labels, feature_name=feature_names, params=params)
+
+
+def sample_shards(shard_dir, max_rows: int, random_state: int = 42):
+    """Return (X, y) with about max_rows rows drawn evenly from every shard."""
+    shards = read_shard_manifest(shard_dir)
+    total_rows = sum(rows for _, rows in shards)
+    fraction = min(1.0, max_rows / total_rows) if total_rows else 1.0
+    samples = [load_data(path).sample(frac=fraction, random_state=random_state) for path, _ in shards]
+    sample = pd.concat(samples, ignore_index=True)
+    return sample.drop(columns=[TARGET_COLUMN]), sample[TARGET_COLUMN]
+
+
+def iter_shards(shard_dir, feature_names: list):
+    """Yield (X, y) per shard, with X holding the feature_names columns in order."""
+    for path, _ in read_shard_manifest(shard_dir):
+        shard = load_data(path, columns=feature_names + [TARGET_COLUMN])
+        yield shard[feature_names], shard[TARGET_COLUMN].to_numpy()
+
+
+def train_params(estimator_params: dict) -> tuple:
+    """Split LGBMClassifier.get_params() into (lgb.train params, num_boost_round)."""
+    params = {key: value for key, value in estimator_params.items()
+              if value is not None and key not in ("importance_type", "class_weight", "objective")}
+    num_boost_round = params.pop("n_estimators", 100)
+    if params.get("n_jobs", 0) < 0:
+        params.pop("n_jobs")
+    return {**to_native_params(params), "objective": "binary", "verbose": -1}, num_boost_round
@@ -0,0 +1,108 @@
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from src.logger import get_logger
+
+logger_obj = get_logger(__name__)
+
+
+class PredictionCache:
+    """LRU + TTL cache of predicted probabilities keyed by the exact feature vector.
+
+    Rows are normalized to contiguous float32 (with -0.0 folded into 0.0) and
+    their raw bytes are the key, so only identical vectors share an entry.
+    The cache remembers which model version filled it and drops every entry
+    as soon as it is asked about a different version.
+    """
+
+    def __init__(self, max_entries: int = 100000, ttl_seconds: float = 3600.0):
+        self.max_entries = int(max_entries)
+        self.ttl_seconds = float(ttl_seconds)
+
+        self.__entries = OrderedDict()  # key -> (expires_at, probabilities row)
+        self.__model_version = None
+        self.__lock = threading.Lock()
+        self.__counters = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "invalidations": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__clear()
+
+    def __clear(self):
+        if self.__entries:
+            self.__counters["invalidations"] += 1
+        self.__entries.clear()
+
+    def predict_proba(self, features: np.ndarray, predict_fn, model_version: str) -> np.ndarray:
+        """Return probabilities for every row, calling predict_fn once on the cache misses."""
+        if not self.enabled:
+            return predict_fn(features)
+
+        features = np.ascontiguousarray(features, dtype=np.float32) + np.float32(0.0)
+        keys = [row.tobytes() for row in features]
+        results = [None] * len(keys)
+        miss_rows = []
+
+        now = time.monotonic()
+        with self.__lock:
+            if model_version != self.__model_version:
+                logger_obj.info(f"[PredictionCache] : Model version changed to {model_version}, dropping cached predictions")
+                self.__clear()
+                self.__model_version = model_version
+
+            for i, key in enumerate(keys):
+                entry = self.__entries.get(key)
+                if entry is not None and entry[0] < now:
+                    del self.__entries[key]
+                    self.__counters["expirations"] += 1
+                    entry = None
+                if entry is None:
+                    miss_rows.append(i)
+                    continue
+                self.__entries.move_to_end(key)
+                results[i] = entry[1]
+            self.__counters["hits"] += len(keys) - len(miss_rows)
+            self.__counters["misses"] += len(miss_rows)
+
+        if miss_rows:
+            probabilities = predict_fn(features[miss_rows])
+            expires_at = time.monotonic() + self.ttl_seconds
+            with self.__lock:
+                # a reload may have happened while predicting; only cache for the current version
+                cacheable = model_version == self.__model_version
+                for i, row in zip(miss_rows, probabilities):
+                    results[i] = row
+                    if cacheable:
+                        # a view would keep the whole batch's array alive for as long as any one row stays cached
+                        self.__entries[keys[i]] = (expires_at, row.copy())
+                        self.__entries.move_to_end(keys[i])
+                while len(self.__entries) > self.max_entries:
+                    self.__entries.popitem(last=False)
+                    self.__counters["evictions"] += 1
+
+        return np.vstack(results)
+
+    def stats(self) -> dict:
+        """Return entry count, hit ratio and hit/miss/eviction counters."""
+        with self.__lock:
+            counters = dict(self.__counters)
+            size = len(self.__entries)
+            model_version = self.__model_version
+
+        lookups = counters["hits"] + counters["misses"]
+        return {
+            "enabled": self.enabled,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "model_version": model_version,
+            "entries": size,
+            "hit_ratio": counters["hits"] / lookups if lookups else 0.0,
+            **counters,
+        }
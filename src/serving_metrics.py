@@ -0,0 +1,310 @@
+import bisect
+import fcntl
+import glob
+import itertools
+import json
+import mmap
+import os
+import threading
+import time
+
+import numpy as np
+
+from src.logger import get_logger
+
+logger_obj = get_logger(__name__)
+
+# endpoints and phases are fixed so every process shares one slot layout
+ENDPOINTS = ("index", "predict_batch")
+PHASES = ("parse", "predict", "render", "total")
+STATUS_CLASSES = ("2xx", "3xx", "4xx", "5xx")
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 4096, 16384, 65536)
+
+_VALUES_PATTERN = "values_{pid}.bin"
+_INFO_PATTERN = "info_{pid}.json"
+_ARCHIVE_FILE = "archive.bin"
+_LOCK_FILE = ".lock"
+
+
+class _Layout:
+    """Slot offsets of every metric in the flat float64 array each process writes."""
+
+    def __init__(self):
+        size = 0
+        self.requests = {}
+        for endpoint in ENDPOINTS:
+            for status in STATUS_CLASSES:
+                self.requests[endpoint, status] = size
+                size += 1
+        # histogram slots: one per bucket, +Inf, then sum and count
+        self.latency = {}
+        for endpoint in ENDPOINTS:
+            for phase in PHASES:
+                self.latency[endpoint, phase] = size
+                size += len(LATENCY_BUCKETS) + 3
+        self.batch_size = {}
+        for endpoint in ENDPOINTS:
+            self.batch_size[endpoint] = size
+            size += len(BATCH_SIZE_BUCKETS) + 3
+        # per-process values come last; everything before them only ever grows.
+        # in flight = requests started - requests counted, for live processes
+        self.counter_slots = size
+        self.started = size
+        self.size = size + 1
+
+
+LAYOUT = _Layout()
+
+
+class _NullTimer:
+    """Timer handed out for untracked endpoints; every call is a no-op."""
+
+    def mark(self, phase: str) -> None:
+        pass
+
+    def observe_batch_size(self, rows: int) -> None:
+        pass
+
+    def finish(self, status_code: int) -> None:
+        pass
+
+
+NULL_TIMER = _NullTimer()
+
+
+class RequestTimer:
+    """Times one request; mark(phase) records the time since the previous mark.
+
+    Observations are kept on the timer and written in one locked update by
+    finish(), so a request takes the metrics lock once.
+    """
+
+    __slots__ = ("_metrics", "_endpoint", "_start", "_last", "_observations", "_finished")
+
+    def __init__(self, metrics: "ServingMetrics", endpoint: str):
+        self._metrics = metrics
+        self._endpoint = endpoint
+        self._start = self._last = time.perf_counter()
+        self._observations = []
+        self._finished = False
+
+    def mark(self, phase: str) -> None:
+        now = time.perf_counter()
+        self._observations.append((LAYOUT.latency[self._endpoint, phase], LATENCY_BUCKETS, now - self._last))
+        self._last = now
+
+    def observe_batch_size(self, rows: int) -> None:
+        self._observations.append((LAYOUT.batch_size[self._endpoint], BATCH_SIZE_BUCKETS, rows))
+
+    def finish(self, status_code: int) -> None:
+        """Count the request under its status class and its total latency; later calls are ignored."""
+        if self._finished:
+            return
+        self._finished = True
+        self._observations.append((LAYOUT.latency[self._endpoint, "total"], LATENCY_BUCKETS, time.perf_counter() - self._start))
+        self._metrics._record(LAYOUT.requests[self._endpoint, STATUS_CLASSES[min(max(status_code // 100 - 2, 0), 3)]],
+                              self._observations)
+
+
+class ServingMetrics:
+    """Request metrics shared by every worker process of the prediction server.
+
+    Each process writes its counters and histograms into its own
+    memory-mapped file in directory, so recording a request is a few float
+    additions under one thread lock and never waits for another process.
+    collect() sums the files of all processes into the Prometheus text
+    format. When a process starts writing, files left by processes that
+    are gone are folded into an archive file (gauges dropped), so counters
+    never go backwards when a worker is replaced.
+    """
+
+    def __init__(self, directory: str, enabled: bool = True):
+        self.directory = str(directory)
+        self.enabled = enabled
+        self.__lock = threading.Lock()
+        self.__values = None
+        self.__started = itertools.count(1)
+        if enabled:
+            os.makedirs(self.directory, exist_ok=True)
+            # a forked worker must not write into its parent's file
+            os.register_at_fork(after_in_child=self.__detach)
+
+    def __detach(self):
+        self.__lock = threading.Lock()
+        self.__values = None
+        self.__started = itertools.count(1)
+
+    def __path(self, pattern: str, pid: int) -> str:
+        return os.path.join(self.directory, pattern.format(pid=pid))
+
+    def __open(self):
+        """Create this process's value file, archiving the files of dead processes first."""
+        with open(os.path.join(self.directory, _LOCK_FILE), "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            self.__archive_dead_processes()
+            path = self.__path(_VALUES_PATTERN, os.getpid())
+            with open(path, "wb") as f:
+                f.write(b"\0" * LAYOUT.size * 8)
+        with open(path, "r+b") as f:
+            self.__mmap = mmap.mmap(f.fileno(), LAYOUT.size * 8)
+        self.__values = memoryview(self.__mmap).cast("d")
+
+    def __archive_dead_processes(self):
+        archive_path = os.path.join(self.directory, _ARCHIVE_FILE)
+        archive = _read_values(archive_path) if os.path.exists(archive_path) else np.zeros(LAYOUT.size)
+        changed = False
+        for path in glob.glob(self.__path(_VALUES_PATTERN, "*")):
+            pid = _pid_of(path)
+            if pid == os.getpid() or _is_alive(pid):
+                continue
+            values = _read_values(path)
+            if values is not None:
+                archive[:LAYOUT.counter_slots] += values[:LAYOUT.counter_slots]
+            else:
+                logger_obj.warning(f"[ServingMetrics] : Dropping {path}, written with a different metric layout")
+            os.remove(path)
+            if os.path.exists(self.__path(_INFO_PATTERN, pid)):
+                os.remove(self.__path(_INFO_PATTERN, pid))
+            changed = True
+        if changed:
+            tmp_path = archive_path + ".tmp"
+            archive.tofile(tmp_path)
+            os.replace(tmp_path, archive_path)
+
+    def _record(self, request_slot: int, observations: list) -> None:
+        """Count one finished request and add its (histogram base, buckets, value) observations."""
+        with self.__lock:
+            if self.__values is None:
+                self.__open()
+            values = self.__values
+            values[request_slot] += 1
+            for base, buckets, value in observations:
+                values[base + bisect.bisect_left(buckets, value)] += 1
+                values[base + len(buckets) + 1] += value
+                values[base + len(buckets) + 2] += 1
+
+    def start(self, endpoint: str):
+        """Return a timer for a request to endpoint and count it as started."""
+        if not self.enabled or endpoint not in ENDPOINTS:
+            return NULL_TIMER
+        if self.__values is None:
+            with self.__lock:
+                if self.__values is None:
+                    self.__open()
+        # next() on a count is atomic, so this plain store needs no lock; a racing
+        # store can leave the value one behind until the next request starts
+        self.__values[LAYOUT.started] = next(self.__started)
+        return RequestTimer(self, endpoint)
+
+    def set_model_info(self, model_version: str, load_seconds: float, model_format: str) -> None:
+        """Publish this process's model version and how long loading it took."""
+        if not self.enabled:
+            return
+        path = self.__path(_INFO_PATTERN, os.getpid())
+        with open(path + ".tmp", "w") as f:
+            json.dump({"model_version": model_version, "load_seconds": load_seconds, "model_format": model_format}, f)
+        os.replace(path + ".tmp", path)
+
+    def collect(self) -> str:
+        """Return the summed metrics of all processes in the Prometheus text exposition format."""
+        totals = np.zeros(LAYOUT.size)
+        archive_path = os.path.join(self.directory, _ARCHIVE_FILE)
+        if os.path.exists(archive_path):
+            archive = _read_values(archive_path)
+            if archive is not None:
+                totals += archive
+        in_flight = 0.0
+        request_slots = list(LAYOUT.requests.values())
+        for path in glob.glob(self.__path(_VALUES_PATTERN, "*")):
+            values = _read_values(path)
+            if values is None:
+                continue
+            totals[:LAYOUT.counter_slots] += values[:LAYOUT.counter_slots]
+            # a dead process is no longer in flight, but its counts still happened
+            if _is_alive(_pid_of(path)):
+                in_flight += max(values[LAYOUT.started] - values[request_slots].sum(), 0.0)
+
+        lines = [
+            "# HELP prediction_requests_total Prediction requests by endpoint and status class.",
+            "# TYPE prediction_requests_total counter",
+        ]
+        for (endpoint, status), slot in LAYOUT.requests.items():
+            lines.append(f'prediction_requests_total{{endpoint="{endpoint}",status="{status}"}} {_fmt(totals[slot])}')
+        lines += [
+            "# HELP prediction_latency_seconds Request latency by endpoint and phase (parse, predict, render, total).",
+            "# TYPE prediction_latency_seconds histogram",
+        ]
+        for (endpoint, phase), base in LAYOUT.latency.items():
+            lines += _histogram_lines("prediction_latency_seconds", f'endpoint="{endpoint}",phase="{phase}"',
+                                     LATENCY_BUCKETS, totals[base:base + len(LATENCY_BUCKETS) + 3])
+        lines += [
+            "# HELP prediction_batch_size Bookings per prediction request.",
+            "# TYPE prediction_batch_size histogram",
+        ]
+        for endpoint, base in LAYOUT.batch_size.items():
+            lines += _histogram_lines("prediction_batch_size", f'endpoint="{endpoint}"',
+                                     BATCH_SIZE_BUCKETS, totals[base:base + len(BATCH_SIZE_BUCKETS) + 3])
+        lines += [
+            "# HELP prediction_in_flight_requests Requests being handled right now, summed over workers.",
+            "# TYPE prediction_in_flight_requests gauge",
+            f"prediction_in_flight_requests {_fmt(in_flight)}",
+        ]
+
+        infos = []
+        for path in glob.glob(self.__path(_INFO_PATTERN, "*")):
+            pid = _pid_of(path)
+            if _is_alive(pid):
+                try:
+                    with open(path) as f:
+                        infos.append((pid, json.load(f)))
+                except (OSError, ValueError):
+                    continue
+        lines += [
+            "# HELP prediction_model_load_seconds Time each worker took to load its model.",
+            "# TYPE prediction_model_load_seconds gauge",
+        ]
+        lines += [f'prediction_model_load_seconds{{pid="{pid}"}} {_fmt(info["load_seconds"])}' for pid, info in infos]
+        lines += [
+            "# HELP prediction_model_info Model version served by each worker.",
+            "# TYPE prediction_model_info gauge",
+        ]
+        lines += [f'prediction_model_info{{pid="{pid}",version="{info["model_version"]}",format="{info["model_format"]}"}} 1'
+                  for pid, info in infos]
+        return "\n".join(lines) + "\n"
+
+
+def _histogram_lines(name: str, labels: str, buckets: tuple, values: np.ndarray) -> list:
+    counts = np.cumsum(values[:len(buckets) + 1])
+    lines = [f'{name}_bucket{{{labels},le="{bound}"}} {_fmt(count)}' for bound, count in zip(buckets, counts)]
+    lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {_fmt(counts[-1])}')
+    lines.append(f"{name}_sum{{{labels}}} {_fmt(values[len(buckets) + 1])}")
+    lines.append(f"{name}_count{{{labels}}} {_fmt(values[len(buckets) + 2])}")
+    return lines
+
+
+def _fmt(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _read_values(path: str):
+    """Return the float64 values in path, or None when its size does not match the layout."""
+    try:
+        values = np.fromfile(path, dtype=np.float64)
+    except OSError:
+        return None
+    return values if len(values) == LAYOUT.size else None
+
+
+def _pid_of(path: str) -> int:
+    return int(os.path.basename(path).split("_")[1].split(".")[0])
+
+
+def _is_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
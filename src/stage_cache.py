@@ -0,0 +1,136 @@
+import ast
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+from src.logger import get_logger
+from src.custom_exception import CustomException
+from src.model_artifacts import file_sha256
+
+logger_obj = get_logger(__name__)
+
+
+def path_sha256(path: Path) -> str:
+    """Return the sha256 of a file, or of every file under a directory."""
+    path = Path(path)
+    if not path.is_dir():
+        return file_sha256(path)
+    digest = hashlib.sha256()
+    for file_path in sorted(p for p in path.rglob("*") if p.is_file()):
+        digest.update(str(file_path.relative_to(path)).encode())
+        digest.update(file_sha256(file_path).encode())
+    return digest.hexdigest()
+
+
+def module_sources(modules: list, root: Path) -> list:
+    """Return the source files of modules and of every repo module they import, transitively.
+
+    Imports are read from the syntax tree, so imports inside functions (the
+    stages import their heavy dependencies lazily) count as well. Only modules
+    that resolve to a file under root are followed.
+
+    Args:
+        modules (list): Dotted module names, e.g. "src.model_training".
+        root (Path): Repository root the module names resolve against.
+    Returns:
+        list: Sorted source file paths.
+    """
+    root = Path(root)
+
+    def resolve(module: str):
+        path = root.joinpath(*module.split("."))
+        for candidate in (path.with_suffix(".py"), path / "__init__.py"):
+            if candidate.is_file():
+                return candidate
+        return None
+
+    sources, pending = set(), list(modules)
+    while pending:
+        path = resolve(pending.pop())
+        if path is None or path in sources:
+            continue
+        sources.add(path)
+        for node in ast.walk(ast.parse(path.read_text(), filename=str(path))):
+            if isinstance(node, ast.Import):
+                pending.extend(alias.name for alias in node.names)
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                # "from config import model_parms" imports a module, "from x import y" may import a name
+                pending.append(node.module)
+                pending.extend(f"{node.module}.{alias.name}" for alias in node.names if alias.name != "*")
+    return sorted(sources)
+
+
+def stage_fingerprint(data: dict = None, config: dict = None, code: list = None) -> str:
+    """Combine a stage's inputs into one fingerprint.
+
+    Args:
+        data (dict): Input name -> file/directory path, or an already computed version string.
+        config (dict): The config sections the stage reads.
+        code (list): Source files that implement the stage (see module_sources).
+    Returns:
+        str: Hex sha256 over the data hashes, the canonical config JSON and the code hashes.
+    """
+    parts = {
+        "data": {name: value if isinstance(value, str) else path_sha256(value) for name, value in (data or {}).items()},
+        "config": config or {},
+        # keyed by package and file name, so src/__init__.py and config/__init__.py do not collide
+        "code": {"/".join(Path(path).parts[-2:]): file_sha256(path) for path in (code or [])},
+    }
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class StageCache:
+    """JSON manifest of the fingerprint and output hashes of each completed stage.
+
+    A stage is fresh when its current input fingerprint matches the recorded
+    one and every recorded output still exists with the same content.
+    """
+
+    def __init__(self, manifest_path: Path):
+        self.manifest_path = Path(manifest_path)
+        self.__manifest = {}
+        if self.manifest_path.exists():
+            with open(self.manifest_path) as f:
+                self.__manifest = json.load(f)
+
+    def is_fresh(self, stage: str, fingerprint: str) -> bool:
+        entry = self.__manifest.get(stage)
+        if entry is None or entry["fingerprint"] != fingerprint:
+            return False
+        for output, recorded_hash in entry["outputs"].items():
+            if not os.path.exists(output) or path_sha256(output) != recorded_hash:
+                logger_obj.info(f"[StageCache] : Output {output} of stage '{stage}' is missing or changed")
+                return False
+        return True
+
+    def record(self, stage: str, fingerprint: str, outputs: list) -> None:
+        self.__manifest[stage] = {
+            "fingerprint": fingerprint,
+            "outputs": {str(output): path_sha256(output) for output in outputs},
+            "completed_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        os.makedirs(self.manifest_path.parent, exist_ok=True)
+        with open(self.manifest_path, "w") as f:
+            json.dump(self.__manifest, f, indent=2)
+
+    def run_stage(self, stage: str, fingerprint_fn, outputs: list, run_fn, force: bool = False) -> bool:
+        """Run a stage unless its fingerprint is unchanged; return True when it ran.
+
+        fingerprint_fn is called before the stage runs. The fingerprint is
+        recorded only after run_fn succeeds, so a failed run is retried next time.
+        """
+        try:
+            fingerprint = fingerprint_fn()
+            if not force and self.is_fresh(stage, fingerprint):
+                logger_obj.info(f"[StageCache] : Skipping stage '{stage}', inputs unchanged (fingerprint {fingerprint[:12]})")
+                return False
+
+            logger_obj.info(f"[StageCache] : Running stage '{stage}' (fingerprint {fingerprint[:12]}, force={force})")
+            run_fn()
+            self.record(stage, fingerprint, outputs)
+            return True
+        except Exception as e:
+            logger_obj.error(f"[StageCache] : Stage '{stage}' failed: {e}")
+            raise CustomException(f"Stage '{stage}' failed: {e}")
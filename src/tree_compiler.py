@@ -0,0 +1,214 @@
+import json
+import math
+import os
+from pathlib import Path
+
+import numpy as np
+
+from src.logger import get_logger
+from src.custom_exception import CustomException
+
+logger_obj = get_logger(__name__)
+
+# LightGBM missing value handling per split (see LightGBM tree.h NumericalDecision)
+MISSING_TYPES = {"None": 0, "Zero": 1, "NaN": 2}
+# LightGBM kZeroThreshold
+ZERO_THRESHOLD = 1e-35
+
+# rows walked through the trees at once; bounds the (rows x trees) work arrays of predict_raw
+BLOCK_ROWS = 1024
+
+ARRAY_NAMES = ("split_feature", "threshold", "left_child", "right_child",
+               "default_left", "missing_type", "leaf_value", "tree_roots")
+
+
+class CompiledTreeModel:
+    """Flattened LightGBM binary classifier evaluated with vectorized NumPy.
+
+    All trees are stored in one set of node arrays. Internal nodes hold a split
+    feature, threshold and global child indices; leaves have split_feature -1
+    and point to themselves, so every row can be walked `max_depth` steps
+    through every tree at once without branching on leaf/internal nodes.
+    """
+
+    def __init__(self, arrays: dict, meta: dict):
+        self.split_feature = arrays["split_feature"]
+        self.threshold = arrays["threshold"]
+        self.left_child = arrays["left_child"]
+        self.right_child = arrays["right_child"]
+        self.default_left = arrays["default_left"]
+        self.missing_type = arrays["missing_type"]
+        self.leaf_value = arrays["leaf_value"]
+        self.tree_roots = arrays["tree_roots"]
+
+        # [left, right] child pairs, so one gather picks the next node
+        self._children = np.stack([self.left_child, self.right_child], axis=1).astype(np.intp).ravel()
+        self._split_feature = np.maximum(self.split_feature, 0).astype(np.intp)
+
+        self.meta = meta
+        self.max_depth = int(meta["max_depth"])
+        self.sigmoid = float(meta["sigmoid"])
+        self.feature_names = list(meta["feature_names"])
+        self.classes_ = np.asarray(meta["classes"])
+
+    @classmethod
+    def from_booster(cls, booster, classes=(0, 1)) -> "CompiledTreeModel":
+        """Flatten every tree of a binary LightGBM booster into node arrays."""
+        dump = booster.dump_model()
+        objective = dump["objective"].split()
+        if objective[0] != "binary" or dump["num_class"] != 1:
+            raise CustomException(f"Only binary objectives can be compiled, got '{dump['objective']}'")
+        if dump["average_output"]:
+            raise CustomException("Random forest boosting (average_output) is not supported")
+        sigmoid = 1.0
+        for option in objective[1:]:
+            if option.startswith("sigmoid:"):
+                sigmoid = float(option.split(":", 1)[1])
+
+        split_feature, threshold, left_child, right_child = [], [], [], []
+        default_left, missing_type, leaf_value, tree_roots = [], [], [], []
+        max_depth = 0
+
+        for tree in dump["tree_info"]:
+            tree_roots.append(len(split_feature))
+            # iterative pre-order walk; children are patched once their index is known
+            stack = [(tree["tree_structure"], None, None, 0)]
+            while stack:
+                node, parent, side, depth = stack.pop()
+                index = len(split_feature)
+                if parent is not None:
+                    (left_child if side == "left" else right_child)[parent] = index
+                max_depth = max(max_depth, depth)
+
+                if "leaf_value" in node:
+                    split_feature.append(-1)
+                    threshold.append(0.0)
+                    left_child.append(index)
+                    right_child.append(index)
+                    default_left.append(False)
+                    missing_type.append(0)
+                    leaf_value.append(node["leaf_value"])
+                    continue
+
+                if node["decision_type"] != "<=":
+                    raise CustomException(f"Unsupported split decision type '{node['decision_type']}'")
+                split_feature.append(node["split_feature"])
+                threshold.append(node["threshold"])
+                left_child.append(-1)
+                right_child.append(-1)
+                default_left.append(node["default_left"])
+                missing_type.append(MISSING_TYPES[node["missing_type"]])
+                leaf_value.append(0.0)
+
+                stack.append((node["right_child"], index, "right", depth + 1))
+                stack.append((node["left_child"], index, "left", depth + 1))
+
+        arrays = {
+            "split_feature": np.asarray(split_feature, dtype=np.int32),
+            "threshold": np.asarray(threshold, dtype=np.float64),
+            "left_child": np.asarray(left_child, dtype=np.int32),
+            "right_child": np.asarray(right_child, dtype=np.int32),
+            "default_left": np.asarray(default_left, dtype=bool),
+            "missing_type": np.asarray(missing_type, dtype=np.int8),
+            "leaf_value": np.asarray(leaf_value, dtype=np.float64),
+            "tree_roots": np.asarray(tree_roots, dtype=np.int32),
+        }
+        meta = {
+            "num_trees": len(tree_roots),
+            "num_nodes": len(split_feature),
+            "max_depth": max_depth,
+            "sigmoid": sigmoid,
+            "feature_names": dump["feature_names"],
+            "classes": [int(c) for c in classes],
+        }
+        return cls(arrays, meta)
+
+    def predict_raw(self, X, block_rows: int = BLOCK_ROWS) -> np.ndarray:
+        """Return the raw boosting score (sum of leaf values) for each row.
+
+        Rows are scored block_rows at a time, so the per-depth work arrays
+        stay (block_rows x n_trees) however large the batch is.
+        """
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if len(X) <= block_rows:
+            return self.__predict_raw_block(X)
+        scores = np.empty(len(X))
+        for start in range(0, len(X), block_rows):
+            scores[start:start + block_rows] = self.__predict_raw_block(X[start:start + block_rows])
+        return scores
+
+    def __predict_raw_block(self, X: np.ndarray) -> np.ndarray:
+        n_rows, n_features = X.shape
+        flat_X = np.ascontiguousarray(X).ravel()
+        row_offsets = (np.arange(n_rows) * n_features)[:, None]
+        # missing value rules only matter for NaN inputs or zero-as-missing splits
+        check_missing = bool(np.isnan(flat_X).any()) or bool((self.missing_type == MISSING_TYPES["Zero"]).any())
+
+        # (n_rows, n_trees) matrix of current node per row and tree
+        node = np.broadcast_to(self.tree_roots.astype(np.intp), (n_rows, self.tree_roots.size)).copy()
+        for _ in range(self.max_depth):
+            fval = flat_X[row_offsets + self._split_feature[node]]
+            go_right = ~(fval <= self.threshold[node])
+
+            if check_missing:
+                missing = self.missing_type[node]
+                is_nan = np.isnan(fval)
+                fval = np.where(is_nan & (missing != MISSING_TYPES["NaN"]), 0.0, fval)
+                use_default = ((missing == MISSING_TYPES["Zero"]) & (np.abs(fval) <= ZERO_THRESHOLD)) | \
+                              ((missing == MISSING_TYPES["NaN"]) & is_nan)
+                go_right = np.where(use_default, ~self.default_left[node], ~(fval <= self.threshold[node]))
+
+            # leaves point to themselves, so rows that finished early stay put
+            node = self._children[2 * node + go_right]
+
+        # accumulate trees sequentially in float64, in the same order as LightGBM
+        leaf_values = self.leaf_value[node]
+        if leaf_values.shape[1] == 0:
+            return np.zeros(n_rows)
+        return np.cumsum(leaf_values, axis=1)[:, -1]
+
+    def predict_proba(self, X, exact: bool = False, **kwargs) -> np.ndarray:
+        """Return class probabilities with the same layout as LGBMClassifier.predict_proba.
+
+        np.exp can differ from the C library exp LightGBM uses in the last
+        ulp, so probabilities match LightGBM to within about 1e-16; exact=True
+        calls math.exp (the C library exp) per row to match it bit for bit.
+        """
+        scores = -self.sigmoid * self.predict_raw(X)
+        if exact:
+            exp_scores = np.fromiter((math.exp(score) for score in scores), dtype=np.float64, count=scores.size)
+        else:
+            exp_scores = np.exp(scores)
+        positive = 1.0 / (1.0 + exp_scores)
+        return np.column_stack([1.0 - positive, positive])
+
+    def predict(self, X, **kwargs) -> np.ndarray:
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+    def save(self, output_dir: Path) -> None:
+        """Write each node array as a raw .npy file plus a JSON metadata file.
+
+        Every file is written to a temporary name and renamed over the old
+        one, so a server that has the previous model memory-mapped keeps
+        reading the old file instead of one being rewritten under it.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        for name in ARRAY_NAMES:
+            path = Path(output_dir) / f"{name}.npy"
+            with open(f"{path}.tmp", "wb") as array_file:
+                np.save(array_file, getattr(self, name))
+            os.replace(f"{path}.tmp", path)
+        meta_path = Path(output_dir) / "meta.json"
+        with open(f"{meta_path}.tmp", "w") as meta_file:
+            json.dump(self.meta, meta_file, indent=2)
+        os.replace(f"{meta_path}.tmp", meta_path)
+
+    @classmethod
+    def load(cls, model_dir: Path, mmap_mode: str = None) -> "CompiledTreeModel":
+        """Load a compiled model written by `save`."""
+        with open(Path(model_dir) / "meta.json") as meta_file:
+            meta = json.load(meta_file)
+        arrays = {name: np.load(Path(model_dir) / f"{name}.npy", mmap_mode=mmap_mode) for name in ARRAY_NAMES}
+        return cls(arrays, meta)
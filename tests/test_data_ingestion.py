@@ -0,0 +1,69 @@
+"""Deterministic hash split and streaming ingestion (src/data_ingestion.py) from a local stand-in bucket."""
+import numpy as np
+import pandas as pd
+import pytest
+
+import src.data_ingestion as data_ingestion
+from src.data_ingestion import DataIngestion
+from src.local_storage import LocalStorageClient
+
+BUCKET, OBJECT = "test-bucket", "bookings.csv"
+
+
+def make_config(**ingestion) -> dict:
+    return {"data_ingestion": {"bucket_name": BUCKET, "bucket_file_name": OBJECT, "train_ratio": 0.8, **ingestion}}
+
+
+@pytest.fixture
+def raw_paths(tmp_path, monkeypatch):
+    """Point the ingestion outputs at tmp_path."""
+    monkeypatch.setattr(data_ingestion, "RAW_DIR", tmp_path / "raw")
+    monkeypatch.setattr(data_ingestion, "TRAIN_DATA_PATH", tmp_path / "raw" / "train.csv")
+    monkeypatch.setattr(data_ingestion, "TEST_DATA_PATH", tmp_path / "raw" / "test.csv")
+    return tmp_path / "raw" / "train.csv", tmp_path / "raw" / "test.csv"
+
+
+@pytest.fixture
+def bookings(tmp_path) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "Booking_ID": [f"INN{i:05d}" for i in range(1, 5001)],
+        "lead_time": rng.integers(0, 400, 5000),
+        "booking_status": rng.choice(["Canceled", "Not_Canceled"], 5000),
+    })
+    (tmp_path / "buckets" / BUCKET).mkdir(parents=True)
+    df.to_csv(tmp_path / "buckets" / BUCKET / OBJECT, index=False)
+    return df
+
+
+def test_hash_split_is_pinned(raw_paths):
+    # the assignment of an ID must never change between runs, processes or releases
+    ids = pd.Series([f"INN{i:05d}" for i in range(1, 13)])
+    mask = DataIngestion(make_config()).hash_split(ids)
+    assert mask.tolist() == [True] * 9 + [False, True, False]
+
+
+def test_hash_split_ignores_chunking_and_order(raw_paths):
+    ids = pd.Series([f"INN{i:05d}" for i in range(1, 20001)])
+    ingestion = DataIngestion(make_config())
+    whole = ingestion.hash_split(ids)
+    chunked = np.concatenate([ingestion.hash_split(ids[start:start + 3000]) for start in range(0, len(ids), 3000)])
+    shuffled = ingestion.hash_split(ids[::-1].reset_index(drop=True))[::-1]
+    np.testing.assert_array_equal(whole, chunked)
+    np.testing.assert_array_equal(whole, shuffled)
+    assert abs(whole.mean() - 0.8) < 0.01
+
+
+def test_streaming_split_matches_across_chunk_sizes(tmp_path, raw_paths, bookings):
+    train_path, test_path = raw_paths
+    splits = []
+    for chunk_size in (333, 5000):
+        client = LocalStorageClient(tmp_path / "buckets")
+        DataIngestion(make_config(mode="streaming", chunk_size=chunk_size), storage_client=client).run()
+        splits.append((pd.read_csv(train_path), pd.read_csv(test_path)))
+
+    (train, test), (train_again, test_again) = splits
+    pd.testing.assert_frame_equal(train, train_again)
+    pd.testing.assert_frame_equal(test, test_again)
+    assert set(train["Booking_ID"]).isdisjoint(test["Booking_ID"])
+    assert sorted(train["Booking_ID"].tolist() + test["Booking_ID"].tolist()) == bookings["Booking_ID"].tolist()
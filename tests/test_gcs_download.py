@@ -0,0 +1,74 @@
+"""CachedBlobDownloader (src/gcs_download.py) outcomes against a local stand-in bucket."""
+import os
+
+import pytest
+
+from src.custom_exception import CustomException
+from src.gcs_download import CachedBlobDownloader
+from src.local_storage import LocalStorageClient
+
+BUCKET, OBJECT = "test-bucket", "bookings.csv"
+CHUNK_BYTES = 64 * 1024
+N_CHUNKS = 8
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "buckets" / BUCKET / OBJECT
+    path.parent.mkdir(parents=True)
+    path.write_bytes(os.urandom(CHUNK_BYTES * N_CHUNKS - 100))
+    return path
+
+
+def make_downloader(tmp_path, client, threshold_bytes: int = 0) -> CachedBlobDownloader:
+    return CachedBlobDownloader(client, tmp_path / "manifest.json", chunk_bytes=CHUNK_BYTES, max_workers=4,
+                                parallel_threshold_bytes=threshold_bytes, max_retries=0)
+
+
+@pytest.mark.parametrize("threshold_bytes", [0, 2**30], ids=["ranged", "whole"])
+def test_downloaded_then_cached(tmp_path, source, threshold_bytes):
+    client = LocalStorageClient(tmp_path / "buckets")
+    downloader = make_downloader(tmp_path, client, threshold_bytes)
+    destination = tmp_path / "raw" / OBJECT
+
+    report = downloader.download(BUCKET, OBJECT, destination)
+    assert report["outcome"] == "downloaded"
+    assert report["bytes_transferred"] == source.stat().st_size
+    assert destination.read_bytes() == source.read_bytes()
+
+    served = client.bytes_served
+    report = downloader.download(BUCKET, OBJECT, destination)
+    assert report["outcome"] == "cached"
+    assert report["bytes_transferred"] == 0
+    assert client.bytes_served == served
+
+
+def test_changed_object_is_downloaded_again(tmp_path, source):
+    downloader = make_downloader(tmp_path, LocalStorageClient(tmp_path / "buckets"))
+    destination = tmp_path / "raw" / OBJECT
+    downloader.download(BUCKET, OBJECT, destination)
+
+    source.write_bytes(os.urandom(CHUNK_BYTES * 3))
+    os.utime(source, ns=(source.stat().st_atime_ns, source.stat().st_mtime_ns + 10**9))
+    assert downloader.download(BUCKET, OBJECT, destination)["outcome"] == "downloaded"
+    assert destination.read_bytes() == source.read_bytes()
+
+
+def test_resumes_after_chunk_failure(tmp_path, source):
+    # the connection drops after half of the ranges
+    client = LocalStorageClient(tmp_path / "buckets", fail_after_requests=N_CHUNKS // 2)
+    downloader = CachedBlobDownloader(client, tmp_path / "manifest.json", chunk_bytes=CHUNK_BYTES, max_workers=1,
+                                      parallel_threshold_bytes=0, max_retries=0)
+    destination = tmp_path / "raw" / OBJECT
+    with pytest.raises(CustomException):
+        downloader.download(BUCKET, OBJECT, destination)
+    assert not destination.exists()
+
+    client.fail_after_requests = None
+    served = client.bytes_served
+    report = downloader.download(BUCKET, OBJECT, destination)
+    assert report["outcome"] == "resumed"
+    assert report["chunks_fetched"] == N_CHUNKS - N_CHUNKS // 2
+    assert client.bytes_served - served == report["bytes_transferred"] < source.stat().st_size
+    assert destination.read_bytes() == source.read_bytes()
+    assert not (tmp_path / "raw" / f"{OBJECT}.part.json").exists()
@@ -0,0 +1,37 @@
+"""Successive halving (src/hyperparameter_search.py) on a small synthetic problem."""
+import numpy as np
+
+from src.hyperparameter_search import SuccessiveHalvingSearch
+
+
+def make_data(n_rows: int = 1500, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n_rows, 5))
+    y = (X[:, 0] - X[:, 1] + rng.normal(scale=0.8, size=n_rows) > 0).astype(int)
+    return X, y
+
+
+def test_capped_and_dart_candidates():
+    X, y = make_data()
+    # budgets 20, 60, 180: every candidate is capped at its 60 trees from the second rung on
+    search = SuccessiveHalvingSearch(
+        {"n_estimators": [60], "num_leaves": [7, 15], "learning_rate": [0.05, 0.1], "boosting_type": ["gbdt", "dart"]},
+        n_candidates=8, min_boost_rounds=20, max_boost_rounds=180, eta=3, early_stopping_rounds=5, cv=3,
+        cv_jobs=1, lgbm_threads=1,
+    ).fit(X, y)
+
+    rungs = {}
+    for entry in search.history_:
+        rungs.setdefault(entry["candidate"], []).append(entry)
+    for entries in rungs.values():
+        # a capped survivor keeps its score and builds no more trees
+        for entry in entries[2:]:
+            assert entry["reused"] and entry["tree_fits"] == 0
+            assert entry["cv_accuracy"] == entries[1]["cv_accuracy"]
+    assert search.tree_fits_ == sum(entry["tree_fits"] for entry in search.history_)
+
+    dart = [entry["candidate"] for entry in search.history_ if entry["rung"] == 0 and entry["tree_fits"] == 3 * 20
+            and not entry["stopped_early"]]
+    assert search.no_early_stopping_candidates_
+    assert set(search.no_early_stopping_candidates_) <= set(dart)
+    assert search.summary()["search_candidates_without_early_stopping"] == len(search.no_early_stopping_candidates_)
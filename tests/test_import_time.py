@@ -0,0 +1,76 @@
+"""Startup cost of the pipeline stages and the servers (see benchmarks/import_time.py).
+
+Each target is imported in a fresh interpreter. Timing budgets can be
+scaled for slow machines with IMPORT_BUDGET_SCALE (default 1.0).
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from benchmarks.import_time import ROOT, SERVERS, SERVING_ENV, TARGETS, dockerfile_sources, import_trace, module_path
+from config.path_config import COMPILED_MODEL_DIR, MODEL_METADATA_PATH
+
+BUDGET_SCALE = float(os.environ.get("IMPORT_BUDGET_SCALE", "1.0"))
+
+
+def loaded(modules: dict, library: str) -> bool:
+    return any(m == library or m.startswith(library + ".") for m in modules)
+
+
+@pytest.fixture(scope="module")
+def traces() -> dict:
+    """The fastest of three imports of every target, after one that writes the bytecode caches."""
+    results = {}
+    for name, (module, env, _, _) in TARGETS.items():
+        import_trace(module, env)
+        results[name] = min((import_trace(module, env) for _ in range(3)), key=lambda trace: trace["cumulative_ms"])
+    return results
+
+
+@pytest.mark.parametrize("name", list(TARGETS))
+def test_within_budget(traces, name):
+    budget_ms = TARGETS[name][2] * BUDGET_SCALE
+    assert traces[name]["cumulative_ms"] <= budget_ms
+
+
+@pytest.mark.parametrize("name", list(TARGETS))
+def test_no_heavy_imports(traces, name):
+    forbidden = TARGETS[name][3]
+    assert [library for library in forbidden if loaded(traces[name]["modules"], library)] == []
+
+
+@pytest.mark.parametrize("name", SERVERS)
+def test_servers_import_no_lightgbm_in_native_mode(traces, name):
+    assert TARGETS[name][1]["MODEL_FORMAT"] == "native"
+    assert not loaded(traces[name]["modules"], "lightgbm")
+
+
+@pytest.mark.parametrize("name", SERVERS)
+def test_server_modules_in_image(traces, name):
+    copied = dockerfile_sources()
+    repo_modules = [m for m in traces[name]["modules"] if m.split(".")[0] in ("src", "config") or m == TARGETS[name][0]]
+    assert [module_path(m) for m in repo_modules
+            if module_path(m) not in copied and str(Path(module_path(m)).parent) not in copied] == []
+
+
+@pytest.mark.skipif(not (MODEL_METADATA_PATH.exists() and COMPILED_MODEL_DIR.exists()),
+                    reason="needs the native model artifacts")
+def test_native_prediction_never_loads_lightgbm():
+    # the compiled model is loaded lazily, so score a batch before looking
+    script = (
+        "import sys, app\n"
+        "assert app.model_reloader.current is not None, 'model not loaded'\n"
+        "booking = {'lead_time': 45, 'no_of_special_requests': 1, 'avg_price_per_room': 110.5, 'arrival_month': 7,\n"
+        "           'arrival_date': 14, 'market_segment_type': 'Online', 'no_of_week_nights': 2,\n"
+        "           'no_of_weekend_nights': 1, 'room_type_reserved': 'Room_Type 1', 'type_of_meal_plan': 'Meal Plan 1'}\n"
+        "response = app.app.test_client().post('/predict/batch', json={'bookings': [booking] * 4})\n"
+        "assert response.status_code == 200, response.data\n"
+        "loaded = sorted(m for m in sys.modules if m.split('.')[0] in ('lightgbm', 'sklearn', 'pandas'))\n"
+        "assert not loaded, loaded\n"
+    )
+    completed = subprocess.run([sys.executable, "-c", script], cwd=ROOT, env={**os.environ, **SERVING_ENV},
+                               capture_output=True, text=True)
+    assert completed.returncode == 0, completed.stderr[-2000:]
@@ -0,0 +1,60 @@
+"""Out-of-core training helpers (src/out_of_core.py) on shards written by ShardedDataWriter."""
+import joblib
+import lightgbm as lgb
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.model_artifacts import BoosterClassifier
+from src.out_of_core import TARGET_COLUMN, iter_shards, sample_shards, shard_dataset, train_params
+from src.tree_compiler import CompiledTreeModel
+from utils.common_functions import ShardedDataWriter
+
+FEATURES = ["lead_time", "avg_price_per_room", "no_of_special_requests"]
+
+
+@pytest.fixture
+def shards(tmp_path) -> tuple:
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "lead_time": rng.integers(0, 400, 3000).astype(float),
+        "avg_price_per_room": rng.normal(100, 30, 3000),
+        "no_of_special_requests": rng.integers(0, 4, 3000).astype(float),
+    })
+    df[TARGET_COLUMN] = ((df["lead_time"] / 400 - df["no_of_special_requests"] / 4 + rng.normal(0, 0.2, 3000)) > 0).astype(int)
+    with ShardedDataWriter(tmp_path / "shards") as writer:
+        for start in range(0, len(df), 700):
+            writer.write(df[start:start + 700])
+    return tmp_path / "shards", df
+
+
+def test_iter_and_sample_shards(shards):
+    shard_dir, df = shards
+    X = pd.concat([X for X, _ in iter_shards(shard_dir, FEATURES)], ignore_index=True)
+    y = np.concatenate([y for _, y in iter_shards(shard_dir, FEATURES)])
+    pd.testing.assert_frame_equal(X, df[FEATURES])
+    np.testing.assert_array_equal(y, df[TARGET_COLUMN].to_numpy())
+
+    X_sample, y_sample = sample_shards(shard_dir, max_rows=600, random_state=0)
+    assert abs(len(X_sample) - 600) <= 5 and len(X_sample) == len(y_sample)
+
+
+def test_streamed_dataset_trains_a_servable_model(shards, tmp_path):
+    shard_dir, df = shards
+    estimator_params = lgb.LGBMClassifier(n_estimators=30, num_leaves=7, random_state=0, n_jobs=-1).get_params()
+    params, num_boost_round = train_params(estimator_params)
+    assert num_boost_round == 30 and "n_jobs" not in params
+
+    dataset = shard_dataset(shard_dir, FEATURES, params=params, batch_size=256)
+    booster = lgb.train(params, dataset, num_boost_round=num_boost_round)
+    assert dataset.num_data() == len(df)
+    model = BoosterClassifier(booster, classes=[0, 1], params=estimator_params)
+
+    X = df[FEATURES].to_numpy()
+    assert model.feature_name_ == FEATURES and model.n_features_in_ == len(FEATURES)
+    assert (model.predict(X) == df[TARGET_COLUMN]).mean() > 0.8
+    # the same artifacts as an in-memory model: a pickle and a compiled model
+    joblib.dump(model, tmp_path / "model.pkl")
+    np.testing.assert_array_equal(joblib.load(tmp_path / "model.pkl").predict_proba(X), model.predict_proba(X))
+    compiled = CompiledTreeModel.from_booster(model.booster_, classes=model.classes_)
+    np.testing.assert_array_equal(compiled.predict_proba(X, exact=True), model.predict_proba(X))
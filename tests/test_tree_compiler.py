@@ -0,0 +1,73 @@
+"""Compiled tree predictions (src/tree_compiler.py) against LightGBM on the same inputs."""
+import lightgbm as lgb
+import numpy as np
+import pytest
+
+from src.tree_compiler import CompiledTreeModel
+
+
+def make_data(n_rows: int = 2000, n_features: int = 6, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n_rows, n_features))
+    y = (X[:, 0] + 0.5 * X[:, 1] * X[:, 2] + rng.normal(scale=0.5, size=n_rows) > 0).astype(int)
+    return X, y
+
+
+def fit(X, y, **params) -> lgb.LGBMClassifier:
+    return lgb.LGBMClassifier(n_estimators=40, num_leaves=15, verbose=-1, random_state=0, **params).fit(X, y)
+
+
+def assert_parity(model: lgb.LGBMClassifier, X) -> None:
+    compiled = CompiledTreeModel.from_booster(model.booster_, classes=model.classes_)
+    np.testing.assert_array_equal(compiled.predict_raw(X), model.predict(X, raw_score=True))
+    np.testing.assert_array_equal(compiled.predict_proba(X, exact=True), model.predict_proba(X))
+    # np.exp may differ from the C library exp in the last ulp
+    np.testing.assert_allclose(compiled.predict_proba(X), model.predict_proba(X), rtol=0, atol=1e-15)
+    np.testing.assert_array_equal(compiled.predict(X), model.predict(X))
+
+
+def test_gbdt_parity():
+    X, y = make_data()
+    assert_parity(fit(X, y), X)
+
+
+def test_nan_parity():
+    X, y = make_data()
+    X[np.random.default_rng(1).random(X.shape) < 0.2] = np.nan
+    model = fit(X, y)
+    # rows that are all NaN, and NaN only in the split features
+    X_eval = np.vstack([X, np.full((5, X.shape[1]), np.nan)])
+    assert_parity(model, X_eval)
+
+
+def test_zero_as_missing_parity():
+    X, y = make_data()
+    X[np.random.default_rng(2).random(X.shape) < 0.2] = 0.0
+    model = fit(X, y, zero_as_missing=True)
+    X_eval = np.vstack([X, np.zeros((5, X.shape[1])), np.full((5, X.shape[1]), np.nan)])
+    assert_parity(model, X_eval)
+
+
+def test_blocks_match_whole_batch():
+    X, y = make_data(n_rows=3000)
+    X[::11, 2] = np.nan
+    compiled = CompiledTreeModel.from_booster(fit(X, y).booster_)
+    whole = compiled.predict_raw(X, block_rows=len(X))
+    for block_rows in (1, 7, 1024):
+        np.testing.assert_array_equal(compiled.predict_raw(X, block_rows=block_rows), whole)
+
+
+def test_save_and_memory_mapped_load(tmp_path):
+    X, y = make_data()
+    model = fit(X, y)
+    CompiledTreeModel.from_booster(model.booster_, classes=model.classes_).save(tmp_path)
+    loaded = CompiledTreeModel.load(tmp_path, mmap_mode="r")
+    np.testing.assert_array_equal(loaded.predict_proba(X, exact=True), model.predict_proba(X))
+
+
+def test_rejects_multiclass():
+    X, _ = make_data()
+    y = np.digitize(X[:, 0], [-0.5, 0.5])
+    model = lgb.LGBMClassifier(n_estimators=5, verbose=-1).fit(X, y)
+    with pytest.raises(Exception, match="binary"):
+        CompiledTreeModel.from_booster(model.booster_)
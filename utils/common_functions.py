@@ -1,9 +1,14 @@
 import os
+import json
+from pathlib import Path
 import pandas as pd
 from src.logger import get_logger
 from src.custom_exception import CustomException
 import yaml
-import pandas as pd
+
+
+# first bytes of every Parquet file
+PARQUET_MAGIC = b"PAR1"
 
 
 logger_obj = get_logger(__name__) 
@@ -31,13 +36,35 @@ def read_yml_file(file_path: str) -> dict:
         logger_obj.error(f"Error reading YAML file at {file_path}: {e}")
         raise CustomException(f"YML file loading failed: {e}")
     
+# detect data file format
+def get_data_format(path: str) -> str:
+    """_summary_
+    This function detects whether a data file is Parquet or CSV, first from
+    the file extension and then from the Parquet magic bytes.
+
+    Args:
+        path (str): The path to the data file.
+    Returns:
+        str: "parquet" or "csv".
+    """
+    suffix = Path(path).suffix.lower()
+    if suffix in (".parquet", ".pq"):
+        return "parquet"
+    if suffix == ".csv":
+        return "csv"
+    with open(path, "rb") as f:
+        return "parquet" if f.read(4) == PARQUET_MAGIC else "csv"
+    
 # load data
-def load_data(path: str) -> pd.DataFrame:
+def load_data(path: str, columns: list = None, dtype: dict = None) -> pd.DataFrame:
     """_summary_
-    This function loads data from a CSV file into a pandas DataFrame.
+    This function loads data from a CSV or Parquet file into a pandas DataFrame.
+    The format is detected from the file, and only the requested columns are read.
 
     Args:
-        path (str): The path to the CSV file.
+        path (str): The path to the data file.
+        columns (list, optional): Columns to read. Defaults to all columns.
+        dtype (dict, optional): Column dtypes to apply while parsing CSV files.
     Returns:
         pd.DataFrame: The loaded data as a pandas DataFrame.
     """
@@ -46,9 +73,189 @@ def load_data(path: str) -> pd.DataFrame:
             logger_obj.error(f"Data file not found at path: {path}")
             raise CustomException(f"Data file not found at path: {path}")
         
-        data = pd.read_csv(path)
+        if get_data_format(path) == "parquet":
+            data = pd.read_parquet(path, columns=columns)
+        else:
+            if dtype is not None and columns is not None:
+                dtype = {col: col_type for col, col_type in dtype.items() if col in columns}
+            data = pd.read_csv(path, usecols=columns, dtype=dtype)
+            
+        if columns is not None:
+            data = data[columns]
         logger_obj.info(f"Data loaded successfully from {path}")
         return data
     except Exception as e:
         logger_obj.error(f"Error loading data from {path}: {e}")
-        raise CustomException(f"Data loading failed: {e}")
\ No newline at end of file
+        raise CustomException(f"Data loading failed: {e}")
+    
+# iterate over data chunks
+def iter_data_chunks(path: str, chunk_size: int, columns: list = None, dtype: dict = None):
+    """_summary_
+    This function yields a CSV or Parquet file as DataFrames of at most
+    chunk_size rows, so files larger than memory can be processed in one pass.
+
+    Args:
+        path (str): The path to the data file.
+        chunk_size (int): Maximum rows per chunk.
+        columns (list, optional): Columns to read. Defaults to all columns.
+        dtype (dict, optional): Column dtypes to apply while parsing CSV files.
+    Yields:
+        pd.DataFrame: The next chunk of rows.
+    """
+    if not os.path.exists(path):
+        logger_obj.error(f"Data file not found at path: {path}")
+        raise CustomException(f"Data file not found at path: {path}")
+    
+    if get_data_format(path) == "parquet":
+        import pyarrow.parquet as pq
+        
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size, columns=columns):
+            yield batch.to_pandas()
+    else:
+        if dtype is not None and columns is not None:
+            dtype = {col: col_type for col, col_type in dtype.items() if col in columns}
+        for chunk in pd.read_csv(path, usecols=columns, dtype=dtype, chunksize=chunk_size):
+            yield chunk[columns] if columns is not None else chunk
+    
+# save data
+def save_data(df: pd.DataFrame, path: str) -> None:
+    """_summary_
+    This function saves a DataFrame as Parquet or CSV depending on the file extension.
+
+    Args:
+        df (pd.DataFrame): The data to save.
+        path (str): The destination path (.parquet or .csv).
+    """
+    try:
+        if get_data_format(path) == "parquet":
+            df.to_parquet(path, index=False)
+        else:
+            df.to_csv(path, index=False)
+        logger_obj.info(f"Data saved successfully at {path}")
+    except Exception as e:
+        logger_obj.error(f"Error saving data to {path}: {e}")
+        raise CustomException(f"Data saving failed: {e}")
+    
+# shrink numeric dtypes
+def optimize_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """_summary_
+    This function downcasts integer columns to the smallest integer type that
+    holds their values. Float columns are left as float64 so values are unchanged.
+
+    Args:
+        df (pd.DataFrame): The data to optimize.
+    Returns:
+        pd.DataFrame: The data with compact integer dtypes.
+    """
+    for col in df.select_dtypes(include="integer").columns:
+        df[col] = pd.to_numeric(df[col], downcast="integer")
+    return df
+    
+# append data chunks to one file
+class ChunkedDataWriter:
+    """_summary_
+    This class appends DataFrame chunks to a single CSV or Parquet file, so
+    large datasets can be written without holding them in memory. CSV chunks
+    are appended as text; Parquet chunks become row groups of one file.
+
+    Args:
+        path (str): The destination path (.parquet or .csv).
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.rows_written = 0
+        self.__format = get_data_format(path)
+        self.__parquet_writer = None
+        self.__csv_file = None
+        
+    def write(self, df: pd.DataFrame) -> None:
+        try:
+            if self.__format == "parquet":
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+                
+                if self.__parquet_writer is None:
+                    table = pa.Table.from_pandas(df, preserve_index=False)
+                    self.__parquet_writer = pq.ParquetWriter(self.path, table.schema)
+                else:
+                    table = pa.Table.from_pandas(df, schema=self.__parquet_writer.schema, preserve_index=False)
+                self.__parquet_writer.write_table(table)
+            else:
+                if self.__csv_file is None:
+                    self.__csv_file = open(self.path, "w", newline="")
+                    df.to_csv(self.__csv_file, index=False)
+                else:
+                    df.to_csv(self.__csv_file, index=False, header=False)
+            self.rows_written += len(df)
+        except Exception as e:
+            logger_obj.error(f"Error writing data chunk to {self.path}: {e}")
+            raise CustomException(f"Data chunk writing failed: {e}")
+        
+    def close(self) -> None:
+        if self.__parquet_writer is not None:
+            self.__parquet_writer.close()
+        if self.__csv_file is not None:
+            self.__csv_file.close()
+        logger_obj.info(f"{self.rows_written} rows written to {self.path}")
+        
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        
+# write a dataset as numbered shard files
+class ShardedDataWriter:
+    """_summary_
+    This class writes DataFrame chunks as separate numbered shard files in one
+    directory and, on close, a manifest.json listing every shard and its row
+    count, so readers can size and locate shards without opening them.
+
+    Args:
+        directory (str): The shard directory; existing shards in it are removed.
+        data_format (str): "csv" or "parquet".
+    """
+    MANIFEST_NAME = "manifest.json"
+    
+    def __init__(self, directory: str, data_format: str = "csv"):
+        self.directory = Path(directory)
+        self.data_format = data_format
+        self.shards = []
+        os.makedirs(self.directory, exist_ok=True)
+        for old_file in self.directory.glob("part-*"):
+            old_file.unlink()
+        
+    def write(self, df: pd.DataFrame) -> None:
+        path = self.directory / f"part-{len(self.shards):05d}.{self.data_format}"
+        save_data(df, path)
+        self.shards.append({"file": path.name, "rows": len(df)})
+        
+    def close(self) -> None:
+        with open(self.directory / self.MANIFEST_NAME, "w") as f:
+            json.dump({"shards": self.shards, "rows": sum(shard["rows"] for shard in self.shards)}, f, indent=2)
+        logger_obj.info(f"{len(self.shards)} shards written to {self.directory}")
+        
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+            
+# read a shard manifest
+def read_shard_manifest(directory: str) -> list:
+    """_summary_
+    This function reads the manifest written by ShardedDataWriter.
+
+    Args:
+        directory (str): The shard directory.
+    Returns:
+        list: (shard path, row count) for every shard, in order.
+    """
+    try:
+        with open(Path(directory) / ShardedDataWriter.MANIFEST_NAME) as f:
+            manifest = json.load(f)
+        return [(Path(directory) / shard["file"], shard["rows"]) for shard in manifest["shards"]]
+    except Exception as e:
+        logger_obj.error(f"Error reading shard manifest in {directory}: {e}")
+        raise CustomException(f"Shard manifest loading failed: {e}")